@@ -3,13 +3,28 @@
 AI CLI - Open or create projects in Cursor using natural language.
 """
 
+import time
+
+# Taken before the other imports, for the "imports" stage of --profile
+_IMPORT_START = time.perf_counter()
+
+import bisect
+import json
+import os
 import re
 import subprocess
+import sys
+import threading
+from array import array
+from collections.abc import Sequence
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import typer
-from rapidfuzz import fuzz, process
+
+# Heavier modules (rapidfuzz, socket, socketserver, ...) are imported inside
+# the functions that need them, so each flow only pays for what it uses;
+# see bench_startup.py for the import-time budget
 
 app = typer.Typer()
 
@@ -31,6 +46,162 @@ CREATE_KEYWORDS = {"create", "start", "new", "init", "make"}
 # Confidence threshold for fuzzy matching
 CONFIDENCE_THRESHOLD = 55
 
+# Persistent project index, stored under the XDG cache directory
+INDEX_FILENAME = "project-index.json"
+INDEX_VERSION = 1
+
+# Directory mtimes newer than this (in ns) are not trusted by the index:
+# a change within the same timestamp tick would otherwise go unnoticed
+INDEX_RACY_WINDOW_NS = 2_000_000_000
+
+# Threads used to scan category directories; override with AI_CLI_SCAN_WORKERS
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Frecency store of opened projects (zoxide-style): once the ranks add up
+# to more than FRECENCY_MAX_TOTAL they are aged by FRECENCY_AGING
+FRECENCY_FILENAME = "frecency.json"
+FRECENCY_MAX_TOTAL = 1000
+FRECENCY_AGING = 0.9
+
+# Frecency adds up to FRECENCY_MAX_BONUS points to a fuzzy score (half of it
+# at a frecency of FRECENCY_HALF_BONUS) to re-rank the best FRECENCY_POOL
+# fuzzy results; the score shown and checked against CONFIDENCE_THRESHOLD
+# stays the fuzzy one
+FRECENCY_MAX_BONUS = 15
+FRECENCY_HALF_BONUS = 4.0
+FRECENCY_POOL = 20
+
+# Aliases and the last opened project, resolved without scanning projects;
+# LAST_PROJECT_ALIAS is the built-in alias for the last opened project
+SHORTCUTS_FILENAME = "shortcuts.json"
+LAST_PROJECT_ALIAS = "last"
+
+# Cache of match results by query keywords, valid while the project tree
+# is unchanged: at most QUERY_CACHE_SIZE queries, each for QUERY_CACHE_TTL
+# seconds, least recently used dropped first. AI_CLI_QUERY_CACHE=0 turns it off
+QUERY_CACHE_FILENAME = "query-cache.json"
+QUERY_CACHE_SIZE = 100
+QUERY_CACHE_TTL = 7 * 86400
+
+# Git branch, dirty state and last commit listed next to unconfident
+# matches: queried on up to GIT_INFO_WORKERS threads and cached per repo
+# (at most GIT_INFO_SIZE) until its .git/HEAD or .git/index mtime changes.
+# Editing a tracked file touches neither, so entries also expire after
+# GIT_INFO_TTL seconds. AI_CLI_GIT_INFO=0 turns it off
+GIT_INFO_FILENAME = "git-info.json"
+GIT_INFO_WORKERS = 5
+GIT_INFO_SIZE = 500
+GIT_INFO_TTL = 600
+GIT_INFO_TIMEOUT = 2
+
+# Editor launcher that worked last time, reused while $PATH is unchanged
+LAUNCHER_FILENAME = "launcher.json"
+
+# Catalogs with at least this many projects are prefiltered through a
+# character-trigram index before fuzzy scoring
+TRIGRAM_MIN_PROJECTS = 2000
+
+# Fields fuzzy_match_project() scores and their weights: the project name
+# as is, its segments (camelCase, kebab-case and snake_case split into
+# lowercase words) and, for a query naming words of a project's category
+# ("work dashboard" for DuringWorkHours/dashboard), the rest of the query
+# against the segments. Each project scores its best weighted field; a
+# weight of 0 turns a field off
+FIELD_WEIGHTS = {"name": 1.0, "segments": 1.0, "category": 0.9}
+
+# Short one-word queries that don't start any word of a project name are
+# first tried as abbreviations ("lai" -> local-ai, "vadt" -> voice-audit):
+# every word of the name gives its first letter and maybe more of its
+# letters, in order. A lone match scores ACRONYM_SCORE; several are ranked
+# by fuzzy score and all get ACRONYM_AMBIGUOUS_SCORE, for frecency to settle
+ACRONYM_MAX_LENGTH = 5
+ACRONYM_SCORE = 95
+ACRONYM_AMBIGUOUS_SCORE = 50
+
+# Typo index (a BK-tree over the words of project names and runs of them,
+# "webapi" for web-api), built by the daemon along with the trigram index: a
+# one-word query is looked up within TYPO_MAX_DISTANCE edits (1 for words
+# of up to TYPO_SHORT_WORD letters) and only the projects found are fuzzy
+# scored; without a confident match among them, the full pass runs
+TYPO_MAX_DISTANCE = 2
+TYPO_SHORT_WORD = 4
+
+# With `--deadline-ms`, names are scored this many at a time, checking the
+# deadline in between
+MATCH_CHUNK_SIZE = 20_000
+
+# Query filters (`cat:`, `recent:`, `lang:`, `dirty:`): cat and recent only
+# need the catalog and the frecency store and narrow it before fuzzy
+# scoring; lang and dirty look inside each project, so they are checked on
+# at most FILTER_POOL ranked candidates
+PRE_FILTERS = ("cat", "recent")
+POST_FILTERS = ("lang", "dirty")
+FILTER_POOL = 50
+AGE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+# Files that identify a project's language, for `lang:`
+LANGUAGE_MARKERS = {
+    "Cargo.toml": "rust",
+    "go.mod": "go",
+    "pyproject.toml": "python",
+    "setup.py": "python",
+    "requirements.txt": "python",
+    "package.json": "javascript",
+    "tsconfig.json": "typescript",
+    "Gemfile": "ruby",
+    "pom.xml": "java",
+    "build.gradle": "java",
+    "composer.json": "php",
+    "Package.swift": "swift",
+    "CMakeLists.txt": "c",
+    "mix.exs": "elixir",
+}
+LANGUAGE_ALIASES = {"rs": "rust", "golang": "go", "py": "python", "js": "javascript", "node": "javascript",
+                    "ts": "typescript", "rb": "ruby", "kotlin": "java", "cpp": "c", "c++": "c"}
+
+# Batch mode (`ai --batch`): threads used by process.cdist (-1: all cores),
+# and the most query x project scores held in memory at once
+BATCH_WORKERS = -1
+BATCH_MAX_CELLS = 8_000_000
+
+# Optional SQLite project catalog (AI_CLI_SQLITE=1) with a full-text index
+# over names, READMEs and manifest descriptions/keywords; at most
+# DB_SCAN_TEXT_BATCH projects (files read up to README_MAX_BYTES) are
+# indexed per scan so lookups stay fast, and the daemon indexes the rest in
+# the background, DB_TEXT_BATCH at a time for DB_TEXT_BUDGET seconds
+DB_FILENAME = "projects.db"
+DB_SCHEMA_VERSION = 2
+DB_TEXT_BATCH = 200
+DB_SCAN_TEXT_BATCH = 10
+DB_TEXT_BUDGET = 0.5
+README_MAX_BYTES = 65536
+README_NAMES = ("README.md", "README.rst", "README.txt", "README")
+MANIFEST_NAMES = ("pyproject.toml", "package.json", "Cargo.toml", "composer.json")
+
+# Words that describe any project ("the thing that ..."), left out of
+# full-text searches along with words shorter than TEXT_MIN_WORD
+TEXT_STOPWORDS = {
+    "thing", "things", "one", "that", "which", "what", "where", "who", "with", "for", "from", "of",
+    "to", "in", "is", "are", "does", "do", "my", "me", "some", "stuff", "this", "was", "uses", "using"
+}
+TEXT_MIN_WORD = 3
+
+# An unconfident fuzzy match opens the best full-text match instead if it
+# is the only one, or its BM25 score beats the runner-up by this factor
+TEXT_MATCH_MARGIN = 1.5
+
+# Latency metrics log (one JSON line per invocation, see `ai stats`): rotated
+# to METRICS_FILENAME.1 once it grows past METRICS_MAX_BYTES
+METRICS_FILENAME = "metrics.jsonl"
+METRICS_MAX_BYTES = 1_000_000
+STATS_PERCENTILES = (50, 95, 99)
+
+# Background daemon (`ai daemon`): socket name, client timeout and how often
+# the watcher wakes up, rescanning if inotify is unavailable (seconds)
+DAEMON_SOCKET_NAME = "ai-cli.sock"
+DAEMON_CLIENT_TIMEOUT = 0.5
+DAEMON_POLL_INTERVAL = 2.0
+
 
 def extract_keywords(text: str) -> List[str]:
     """Extract meaningful keywords from text, removing stopwords."""
@@ -94,49 +265,1503 @@ def extract_project_name(text: str) -> Optional[str]:
     return None
 
 
-def get_existing_projects() -> List[Tuple[str, Path]]:
+def get_cache_dir() -> Path:
+    """Return the cache directory for ai-cli (honours $XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "ai-cli"
+
+
+def get_state_dir() -> Path:
+    """Return the state directory for ai-cli (honours $XDG_STATE_HOME)."""
+    base = os.environ.get("XDG_STATE_HOME")
+    return (Path(base) if base else Path.home() / ".local" / "state") / "ai-cli"
+
+
+def _read_json(path: Path, default: Any) -> Any:
+    """Read a JSON file, returning default if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Atomically write data as JSON. Failures are ignored: caches are optional."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per thread too, or concurrent writers share a temp file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def get_scan_workers() -> int:
+    """Return the number of threads used to scan category directories."""
+    try:
+        workers = int(os.environ.get("AI_CLI_SCAN_WORKERS", DEFAULT_SCAN_WORKERS))
+    except ValueError:
+        workers = DEFAULT_SCAN_WORKERS
+    return max(1, workers)
+
+
+class Deadline:
     """
-    Get list of existing projects, searching one level deep.
-    Returns: List of (project_name, project_path) tuples.
-    Searches in ~/Desktop/Projects/*/ for project folders.
+    A time budget for one lookup (`--deadline-ms`).
+    Work that can be cut short checks expired() between steps and calls
+    cut_short() when it stops early, so callers can report an incomplete result.
     """
-    try:
-        if not PROJECTS_DIR.exists():
-            return []
-        
-        projects = []
-        # Search in each subdirectory of PROJECTS_DIR (one level deep)
-        for category_dir in PROJECTS_DIR.iterdir():
+    
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.end = time.perf_counter() + budget_ms / 1000
+        self.exhausted = False
+    
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.end
+    
+    def cut_short(self) -> None:
+        self.exhausted = True
+
+
+def _list_subdirs(directory: Path) -> List[str]:
+    """
+    List the names of non-hidden subdirectories of a directory.
+    Uses os.scandir so the file type cached in each DirEntry (d_type) avoids
+    a stat per entry; only symlinks and unknown types are stat'ed.
+    """
+    names = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
             try:
-                if not category_dir.is_dir() or category_dir.name.startswith('.'):
-                    continue
-                
-                # Look for projects inside this category directory
-                for project_dir in category_dir.iterdir():
-                    try:
-                        if project_dir.is_dir() and not project_dir.name.startswith('.'):
-                            projects.append((project_dir.name, project_dir))
-                    except (OSError, PermissionError):
-                        # Skip directories we can't access
-                        continue
-            except (OSError, PermissionError):
-                # Skip category directories we can't access
+                if not entry.name.startswith('.') and entry.is_dir():
+                    names.append(entry.name)
+            except OSError:
+                # Skip entries we can't access
+                continue
+    return names
+
+
+def _parallel_map(func: Callable[[Any], Any], items: List[Any], workers: int) -> List[Any]:
+    """Map func over items on up to `workers` threads, preserving order."""
+    return list(_parallel_imap(func, items, workers))
+
+
+def _parallel_imap(func: Callable[[Any], Any], items: List[Any], workers: int) -> Iterator[Any]:
+    """
+    Like _parallel_map, but yields each result (in order) as soon as it and
+    the ones before it are ready. Exceptions raised by func are re-raised
+    here; closing the generator early stops the threads from starting on
+    further items.
+    """
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            yield func(item)
+        return
+    results: Dict[int, Any] = {}
+    positions = iter(range(len(items)))
+    ready = threading.Condition()
+    stopped = False
+    
+    def work():
+        while True:
+            with ready:
+                i = None if stopped else next(positions, None)
+            if i is None:
+                return
+            try:
+                outcome = (True, func(items[i]))
+            except Exception as e:
+                outcome = (False, e)
+            with ready:
+                results[i] = outcome
+                ready.notify()
+    
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(min(workers, len(items)))]
+    for thread in threads:
+        thread.start()
+    try:
+        for i in range(len(items)):
+            with ready:
+                ready.wait_for(lambda: i in results)
+                ok, result = results.pop(i)
+            if not ok:
+                # Raised by func in a worker thread
+                raise result
+            yield result
+    finally:
+        with ready:
+            stopped = True
+    for thread in threads:
+        thread.join()
+
+
+def _scan_category(category_dir: Path, cached: Optional[Dict[str, Any]],
+                   now_ns: int) -> Optional[Tuple[Optional[int], List[str], bool]]:
+    """
+    Scan one category directory, reusing the cached listing if its mtime is unchanged.
+    Returns: (mtime to store, project names, relisted), or None if inaccessible.
+    """
+    try:
+        mtime, stored_mtime = _trusted_mtime(category_dir, now_ns)
+        if cached and stored_mtime is not None and cached.get("mtime") == mtime:
+            return stored_mtime, cached["projects"], False
+        # Look for projects inside this category directory
+        return stored_mtime, _list_subdirs(category_dir), True
+    except OSError:
+        # Skip category directories we can't access
+        return None
+
+
+def _trusted_mtime(path: Path, now_ns: int) -> Tuple[int, Optional[int]]:
+    """
+    Stat a directory for the project index.
+    Returns: (mtime_ns, mtime_ns to store), where the stored value is None
+    if the directory changed too recently for its mtime to be trusted.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    if now_ns - mtime < INDEX_RACY_WINDOW_NS:
+        return mtime, None
+    return mtime, mtime
+
+
+class ProjectCatalog(Sequence):
+    """
+    The project list as parallel arrays: names, and an index into the list
+    of category names for each project. Behaves as a sequence of
+    (project_name, project_path) tuples, but paths are only built for the
+    projects that are looked at, so matching works on positions and a
+    million projects cost little more than their names.
+    """
+    
+    def __init__(self, root: Path, categories: List[str], names: List[str], category_ids: "array"):
+        self.root = root
+        self.categories = categories
+        self.names = names
+        self.category_ids = category_ids
+        self._category_dirs = [root / category for category in categories]
+        self._trigram_index: Optional["TrigramIndex"] = None
+        self._fields: Optional["ProjectFields"] = None
+    
+    @classmethod
+    def from_listing(cls, root: Path, listing: List[Tuple[str, List[str]]]) -> "ProjectCatalog":
+        """Build a catalog sorted by project name from (category, project_names) pairs."""
+        categories = []
+        names: List[str] = []
+        category_ids = array('I')
+        for category, project_names in listing:
+            category_ids.extend([len(categories)] * len(project_names))
+            categories.append(category)
+            names.extend(project_names)
+        # Sort by project name (stable, so duplicates keep category order)
+        order = sorted(range(len(names)), key=names.__getitem__)
+        return cls(root, categories, [names[i] for i in order],
+                   array('I', [category_ids[i] for i in order]))
+    
+    @classmethod
+    def from_pairs(cls, root: Path, pairs: List[Tuple[str, str]]) -> "ProjectCatalog":
+        """Build a catalog from (project_name, category) pairs, keeping their order."""
+        ids: Dict[str, int] = {}
+        category_ids = array('I', [ids.setdefault(category, len(ids)) for _, category in pairs])
+        return cls(root, list(ids), [name for name, _ in pairs], category_ids)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.names[index], self.path(index)
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+    
+    __hash__ = None  # type: ignore[assignment]
+    
+    def __repr__(self) -> str:
+        return f"ProjectCatalog({self.root}, {len(self)} projects)"
+    
+    def subset(self, indices: List[int]) -> "ProjectCatalog":
+        """Return a catalog of the projects at indices (kept in the given order)."""
+        names = self.names
+        category_ids = self.category_ids
+        subset = ProjectCatalog.__new__(ProjectCatalog)
+        subset.root = self.root
+        subset.categories = self.categories
+        subset.names = [names[i] for i in indices]
+        subset.category_ids = array('I', [category_ids[i] for i in indices])
+        subset._category_dirs = self._category_dirs
+        subset._trigram_index = None
+        subset._fields = None
+        return subset
+    
+    def category(self, index: int) -> str:
+        return self.categories[self.category_ids[index]]
+    
+    def path(self, index: int) -> Path:
+        return self._category_dirs[self.category_ids[index]] / self.names[index]
+    
+    def pairs(self) -> List[Tuple[str, str]]:
+        """Return (project_name, category) pairs without building any paths."""
+        categories = self.categories
+        return [(name, categories[i]) for name, i in zip(self.names, self.category_ids)]
+    
+    def fields(self) -> "ProjectFields":
+        """Return the match fields of the projects, computed on first use."""
+        if self._fields is None:
+            self._fields = ProjectFields(self.names, self.categories, self.category_ids)
+        return self._fields
+    
+    def trigram_index(self, build: bool = True) -> Optional["TrigramIndex"]:
+        """Return a TrigramIndex over the names, built on first use (or None if not built and not build)."""
+        if self._trigram_index is None and build:
+            self._trigram_index = TrigramIndex(self.names, self.fields().segments)
+        return self._trigram_index
+
+
+def _project_names(projects: Sequence) -> List[str]:
+    """Return the names of a ProjectCatalog or a list of (name, path) tuples."""
+    if isinstance(projects, ProjectCatalog):
+        return projects.names
+    return [name for name, _ in projects]
+
+
+def _iter_scan(deadline: Optional[Deadline] = None) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Scan PROJECTS_DIR one level deep through the persistent project index.
+    Yields: (category_name, project_names) for each category, in listing
+    order, as soon as it has been scanned.
+
+    Results are kept in a persistent index together with the mtimes of the
+    directories they were listed from, so a warm call only stats the root
+    and category directories and re-lists the ones that changed. The index
+    is updated once the generator is exhausted.
+    
+    Categories not reached before the deadline expires keep their indexed
+    (possibly stale) listing, or are left out if they have none; the first
+    category is always scanned.
+    """
+    if not PROJECTS_DIR.exists():
+        return
+    
+    index_path = get_cache_dir() / INDEX_FILENAME
+    index = _read_json(index_path, {})
+    if (not isinstance(index, dict) or index.get("version") != INDEX_VERSION
+            or index.get("root") != str(PROJECTS_DIR)):
+        index = {}
+    cached_categories = index.get("categories", {})
+    
+    now_ns = time.time_ns()
+    root_mtime, stored_root_mtime = _trusted_mtime(PROJECTS_DIR, now_ns)
+    changed = stored_root_mtime is None or root_mtime != index.get("root_mtime")
+    if changed:
+        category_names = _list_subdirs(PROJECTS_DIR)
+    else:
+        category_names = list(cached_categories)
+    
+    skipped = object()
+    
+    def scan(position: int):
+        category_name = category_names[position]
+        if position and deadline and deadline.expired():
+            return skipped
+        return _scan_category(PROJECTS_DIR / category_name,
+                              cached_categories.get(category_name), now_ns)
+    
+    # Search in each subdirectory of PROJECTS_DIR (one level deep). Each
+    # category costs at least one stat, which on network filesystems is a
+    # round trip, so categories are fanned out across a thread pool.
+    results = _parallel_imap(scan, list(range(len(category_names))), get_scan_workers())
+    
+    categories: Dict[str, Dict[str, Any]] = {}
+    reached = 0
+    db = ProjectDB.open()
+    try:
+        db_mtimes = db.category_mtimes(PROJECTS_DIR) if db else {}
+    except Exception:
+        db.close()
+        db = None
+    try:
+        for category_name, result in zip(category_names, results):
+            reached += 1
+            if result is None:
+                changed = True
+                continue
+            if result is skipped:
+                deadline.cut_short()
+                if category_name in cached_categories:
+                    categories[category_name] = cached_categories[category_name]
+                    yield category_name, categories[category_name]["projects"]
+                else:
+                    # Not indexed: make the next scan list the root again
+                    stored_root_mtime = None
+                    changed = True
                 continue
+            stored_mtime, project_names, relisted = result
+            changed = changed or relisted
+            categories[category_name] = {"mtime": stored_mtime, "projects": project_names}
+            if db and (stored_mtime is None or db_mtimes.get(category_name, -1) != stored_mtime):
+                db = _sync_db_category(db, category_name, project_names, stored_mtime)
+            yield category_name, project_names
+        if db and reached == len(category_names) and not (deadline and deadline.exhausted):
+            db = _sync_db_finish(db, list(categories))
+    finally:
+        if db:
+            db.close()
+        results.close()
+        # Stopped early by the caller: the categories not reached are
+        # handled as if skipped by a deadline
+        for category_name in category_names[reached:]:
+            if category_name in cached_categories:
+                categories[category_name] = cached_categories[category_name]
+            else:
+                stored_root_mtime = None
+                changed = True
         
-        # Sort by project name
-        return sorted(projects, key=lambda x: x[0])
+        if changed:
+            _write_json(index_path, {
+                "version": INDEX_VERSION,
+                "root": str(PROJECTS_DIR),
+                "root_mtime": stored_root_mtime,
+                # In listing order, which orders duplicate names
+                "categories": {name: categories[name] for name in category_names if name in categories},
+            })
+
+
+def _sync_db_category(db: "ProjectDB", category_name: str, project_names: List[str],
+                      mtime_ns: Optional[int]) -> Optional["ProjectDB"]:
+    """Mirror one scanned category into the project database; drops the database on errors."""
+    try:
+        db.sync_category(PROJECTS_DIR, category_name, project_names, mtime_ns)
+        return db
+    except db.Error as e:
+        typer.echo(f"⚠️  Warning: Could not update project database: {e}", err=True)
+        db.close()
+        return None
+
+
+def _sync_db_finish(db: "ProjectDB", category_names: List[str]) -> Optional["ProjectDB"]:
+    """After a full scan: drop vanished categories and index a few READMEs (DB_SCAN_TEXT_BATCH)."""
+    try:
+        db.prune_categories(PROJECTS_DIR, category_names)
+        db.index_text(limit=DB_SCAN_TEXT_BATCH)
+        return db
+    except db.Error as e:
+        typer.echo(f"⚠️  Warning: Could not update project database: {e}", err=True)
+        db.close()
+        return None
+
+
+def exact_name_key(query: str) -> str:
+    """Return the project name a query spells out exactly: "open local ai" -> "local-ai"."""
+    return normalize_project_name(' '.join(extract_keywords(query)))
+
+
+def _exact_name_forms(key: str) -> set:
+    """Lowercase directory names that normalize to key with only separators changed."""
+    return {key, key.replace('-', '_'), key.replace('-', ' ')} if key else set()
+
+
+def find_exact_project(key: str, projects: Sequence) -> Optional[int]:
+    """Return the position of the first project named exactly key (see exact_name_key), or None."""
+    forms = _exact_name_forms(key)
+    for i, name in enumerate(_project_names(projects)):
+        if name.lower() in forms:
+            return i
+    return None
+
+
+def _scan_projects(deadline: Optional[Deadline] = None, stop_at: Optional[str] = None) -> ProjectCatalog:
+    """
+    Scan PROJECTS_DIR (see _iter_scan) into a ProjectCatalog sorted by name.
+    With stop_at, scanning stops at the first category holding a project
+    named exactly stop_at (see exact_name_key); the catalog then only has
+    the categories scanned so far.
+    """
+    forms = _exact_name_forms(stop_at) if stop_at else set()
+    listing = []
+    scan = _iter_scan(deadline)
+    for category_name, project_names in scan:
+        listing.append((category_name, project_names))
+        if forms and any(name.lower() in forms for name in project_names):
+            scan.close()
+            break
+    return ProjectCatalog.from_listing(PROJECTS_DIR, listing)
+
+
+def get_existing_projects(deadline: Optional[Deadline] = None,
+                          stop_at: Optional[str] = None) -> ProjectCatalog:
+    """
+    Get list of existing projects, searching one level deep.
+    Returns: ProjectCatalog of (project_name, project_path), sorted by name.
+    Searches in ~/Desktop/Projects/*/ for project folders.
+
+    If an `ai daemon` is running it already holds the list in memory and is
+    asked first; otherwise the persistent project index is used, and with
+    stop_at the scan ends early once a project of that exact name is found.
+    """
+    try:
+        projects = _query_daemon()
+        if projects is not None:
+            return projects
+        return _scan_projects(deadline, stop_at)
     except Exception as e:
         typer.echo(f"❌ Error reading projects directory: {e}", err=True)
+        return ProjectCatalog.from_listing(PROJECTS_DIR, [])
+
+
+def catalog_version() -> Optional[List[Any]]:
+    """
+    Return the version of the project tree the query cache is kept for: the
+    mtimes of PROJECTS_DIR and of each category directory, which change
+    whenever a project or category is added, removed or renamed. Costs a
+    listing and a stat per category, not a scan.
+    Returns None if a directory changed too recently for its mtime to be
+    trusted (or can't be read).
+    """
+    now_ns = time.time_ns()
+    try:
+        version: List[Any] = [str(PROJECTS_DIR), _trusted_mtime(PROJECTS_DIR, now_ns)[1]]
+        for category in sorted(_list_subdirs(PROJECTS_DIR)):
+            version.append([category, _trusted_mtime(PROJECTS_DIR / category, now_ns)[1]])
+    except OSError:
+        return None
+    if version[1] is None or any(mtime is None for _, mtime in version[2:]):
+        return None
+    return version
+
+
+def project_db_enabled() -> bool:
+    return os.environ.get("AI_CLI_SQLITE", "0") not in ("", "0")
+
+
+def read_readme(project_path: Path) -> Optional[str]:
+    """Return the start of a project's README, or None if it has none."""
+    for readme_name in README_NAMES:
+        try:
+            with open(project_path / readme_name, 'rb') as f:
+                return f.read(README_MAX_BYTES).decode('utf-8', errors='replace')
+        except OSError:
+            continue
+    return None
+
+
+# Where parsed manifests keep the project's description and keywords:
+# top level (package.json, composer.json), [project] (pyproject.toml),
+# [package] (Cargo.toml) and [tool.poetry]
+_MANIFEST_TABLES = ((), ("project",), ("package",), ("tool", "poetry"))
+
+# A `description = "..."` / `"keywords": [...]` entry of a TOML or JSON
+# manifest, for files too long to parse (cut at README_MAX_BYTES)
+_MANIFEST_FIELD = re.compile(
+    r'(?:^|[{,])\s*"?(?:description|keywords)"?\s*[=:]\s*("(?:[^"\\\n]|\\.)*"|\[[^\]]*\])', re.MULTILINE
+)
+
+
+def _parse_manifest(manifest_name: str, text: str) -> Optional[Dict[str, Any]]:
+    """Parse a JSON or TOML manifest; None if it can't be (truncated, invalid, or no tomllib)."""
+    try:
+        if manifest_name.endswith(".json"):
+            data = json.loads(text)
+        else:
+            import tomllib
+            data = tomllib.loads(text)
+    except (ImportError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _manifest_values(data: Dict[str, Any]) -> List[str]:
+    """Return the descriptions and keywords in a parsed manifest's _MANIFEST_TABLES."""
+    values = []
+    for table_path in _MANIFEST_TABLES:
+        table: Any = data
+        for key in table_path:
+            table = table.get(key) if isinstance(table, dict) else None
+        if not isinstance(table, dict):
+            continue
+        if isinstance(table.get("description"), str):
+            values.append(table["description"])
+        if isinstance(table.get("keywords"), list):
+            values.extend(keyword for keyword in table["keywords"] if isinstance(keyword, str))
+    return values
+
+
+def _scan_manifest_values(text: str) -> List[str]:
+    """Pick descriptions and keywords out of manifest text that can't be parsed."""
+    values = []
+    for value in _MANIFEST_FIELD.findall(text):
+        for quoted in re.findall(r'"(?:[^"\\]|\\.)*"', value):
+            try:
+                values.append(json.loads(quoted))
+            except ValueError:
+                values.append(quoted[1:-1])
+    return values
+
+
+def read_manifest_text(project_path: Path) -> str:
+    """Return the descriptions and keywords of a project's manifests (MANIFEST_NAMES)."""
+    parts = []
+    for manifest_name in MANIFEST_NAMES:
+        try:
+            with open(project_path / manifest_name, 'rb') as f:
+                text = f.read(README_MAX_BYTES).decode('utf-8', errors='replace')
+        except OSError:
+            continue
+        data = _parse_manifest(manifest_name, text)
+        parts.extend(_manifest_values(data) if data is not None else _scan_manifest_values(text))
+    return '\n'.join(parts)
+
+
+class ProjectDB:
+    """
+    Optional SQLite catalog of projects (AI_CLI_SQLITE=1).
+    Holds name, category, path, git metadata (as last shown by
+    collect_git_info()) and open history per project, plus an FTS5 index
+    over names, README text and manifest descriptions. It is kept in sync
+    incrementally by the scanner (categories whose mtime changed),
+    create_project() and record_project_open(), and uses WAL so several
+    terminals can read and write it at once.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY,
+            root TEXT NOT NULL,
+            category TEXT NOT NULL,
+            name TEXT NOT NULL,
+            path TEXT NOT NULL UNIQUE,
+            text_indexed INTEGER NOT NULL DEFAULT 0,
+            git_branch TEXT,
+            git_dirty INTEGER,
+            git_commit_time REAL,
+            open_count INTEGER NOT NULL DEFAULT 0,
+            last_opened REAL
+        );
+        CREATE INDEX IF NOT EXISTS projects_category ON projects (root, category);
+        CREATE INDEX IF NOT EXISTS projects_text_pending ON projects (id) WHERE text_indexed = 0;
+        CREATE TABLE IF NOT EXISTS categories (
+            root TEXT NOT NULL,
+            name TEXT NOT NULL,
+            mtime_ns INTEGER,
+            PRIMARY KEY (root, name)
+        );
+    """
+    
+    TEXT_SCHEMA = """
+        CREATE VIRTUAL TABLE project_text
+            USING fts5(name, readme, manifest, tokenize = 'porter unicode61');
+    """
+    
+    def __init__(self, path: Path):
+        import sqlite3
+        
+        self.Error = sqlite3.Error
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=5.0, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        if self._schema_version() < DB_SCHEMA_VERSION:
+            self._migrate()
+    
+    def _schema_version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def _migrate(self) -> None:
+        """(Re)create the full-text index in its current layout; its text is indexed again."""
+        with self._transaction():
+            # Another process may have migrated while this one waited for the lock
+            if self._schema_version() >= DB_SCHEMA_VERSION:
+                return
+            self.conn.execute("DROP TABLE IF EXISTS project_text")
+            self.conn.execute(self.TEXT_SCHEMA)
+            self.conn.execute("INSERT INTO project_text (rowid, name, readme, manifest) "
+                              "SELECT id, name, '', '' FROM projects")
+            self.conn.execute("UPDATE projects SET text_indexed = 0")
+            self.conn.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+    
+    @classmethod
+    def open(cls) -> Optional["ProjectDB"]:
+        """Open the database if it is enabled. Returns None if disabled or unusable."""
+        if not project_db_enabled():
+            return None
+        try:
+            return cls(get_cache_dir() / DB_FILENAME)
+        except Exception as e:
+            typer.echo(f"⚠️  Warning: Could not open project database: {e}", err=True)
+            return None
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def _transaction(self):
+        return _SQLiteTransaction(self.conn)
+    
+    def category_mtimes(self, root: Path) -> Dict[str, Optional[int]]:
+        """Return {category: mtime_ns it was last synced at} for root."""
+        rows = self.conn.execute("SELECT name, mtime_ns FROM categories WHERE root = ?", (str(root),))
+        return dict(rows.fetchall())
+    
+    def _insert(self, root: Path, category: str, name: str) -> None:
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO projects (root, category, name, path) VALUES (?, ?, ?, ?)",
+            (str(root), category, name, str(root / category / name))
+        )
+        if cursor.rowcount:
+            self.conn.execute("INSERT INTO project_text (rowid, name, readme, manifest) VALUES (?, ?, '', '')",
+                              (cursor.lastrowid, name))
+    
+    def _delete(self, where: str, args: Tuple) -> None:
+        self.conn.execute(f"DELETE FROM project_text WHERE rowid IN (SELECT id FROM projects WHERE {where})", args)
+        self.conn.execute(f"DELETE FROM projects WHERE {where}", args)
+    
+    def sync_category(self, root: Path, category: str, names: List[str],
+                      mtime_ns: Optional[int]) -> None:
+        """Make the rows of one category match its listing."""
+        with self._transaction():
+            rows = self.conn.execute(
+                "SELECT name FROM projects WHERE root = ? AND category = ?", (str(root), category)
+            )
+            existing = {name for name, in rows}
+            listed = set(names)
+            for name in existing - listed:
+                self._delete("root = ? AND category = ? AND name = ?", (str(root), category, name))
+            for name in listed - existing:
+                self._insert(root, category, name)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO categories (root, name, mtime_ns) VALUES (?, ?, ?)",
+                (str(root), category, mtime_ns)
+            )
+    
+    def prune_categories(self, root: Path, categories: List[str]) -> None:
+        """Drop the rows of categories of root that no longer exist."""
+        with self._transaction():
+            for category in set(self.category_mtimes(root)) - set(categories):
+                self._delete("root = ? AND category = ?", (str(root), category))
+                self.conn.execute("DELETE FROM categories WHERE root = ? AND name = ?", (str(root), category))
+    
+    def add_project(self, project_path: Path) -> None:
+        """Add one project (e.g. just created), indexing its text right away."""
+        root = project_path.parent.parent
+        with self._transaction():
+            self._insert(root, project_path.parent.name, project_path.name)
+        self.index_text(paths=[str(project_path)])
+    
+    def index_text(self, limit: Optional[int] = None, paths: Optional[List[str]] = None) -> int:
+        """
+        Index the README and manifests of up to limit (default DB_TEXT_BATCH)
+        projects not indexed yet. Returns how many were read.
+        """
+        if paths is None:
+            rows = self.conn.execute(
+                "SELECT id, path FROM projects WHERE text_indexed = 0 LIMIT ?", (limit or DB_TEXT_BATCH,)
+            ).fetchall()
+        else:
+            rows = self.conn.execute(
+                f"SELECT id, path FROM projects WHERE path IN ({','.join('?' * len(paths))})", paths
+            ).fetchall()
+        texts = [(project_id, read_readme(Path(path)) or '', read_manifest_text(Path(path)))
+                 for project_id, path in rows]
+        with self._transaction():
+            for project_id, readme, manifest in texts:
+                self.conn.execute("UPDATE project_text SET readme = ?, manifest = ? WHERE rowid = ?",
+                                  (readme, manifest, project_id))
+                self.conn.execute("UPDATE projects SET text_indexed = 1 WHERE id = ?", (project_id,))
+        return len(texts)
+    
+    def record_open(self, project_path: Path) -> None:
+        self.conn.execute(
+            "UPDATE projects SET open_count = open_count + 1, last_opened = ? WHERE path = ?",
+            (time.time(), str(project_path))
+        )
+    
+    def record_git_info(self, infos: List[Tuple[Path, Dict[str, Any]]]) -> None:
+        """Store the query_git_info() results of projects."""
+        with self._transaction():
+            for project_path, info in infos:
+                self.conn.execute(
+                    "UPDATE projects SET git_branch = ?, git_dirty = ?, git_commit_time = ? WHERE path = ?",
+                    (info.get("branch"), info.get("dirty"), info.get("commit_time"), str(project_path))
+                )
+    
+    def search(self, text: str, root: Optional[Path] = None, category: Optional[str] = None,
+               limit: int = 5) -> List[Tuple[str, Path]]:
+        """
+        Full-text search over names, READMEs and manifests (names weigh
+        most), with English stemming so "invoices" finds "invoice".
+        Returns: (project_name, project_path) pairs, best first.
+        """
+        return [(name, path) for name, path, _ in self.search_ranked(text, root, category, limit)]
+    
+    def search_ranked(self, text: str, root: Optional[Path] = None, category: Optional[str] = None,
+                      limit: int = 5) -> List[Tuple[str, Path, float]]:
+        """Like search(), with the BM25 score of each match (negative, lower is better)."""
+        # Filler and short words would prefix-match (and rank) far too much
+        keywords = [keyword for keyword in extract_keywords(text)
+                    if keyword not in TEXT_STOPWORDS and len(keyword) >= TEXT_MIN_WORD]
+        if not keywords:
+            return []
+        # Prefix-match any keyword; quoting keeps FTS5 syntax out of user input
+        match = ' OR '.join(f'"{keyword}"*' for keyword in keywords)
+        sql = ("SELECT p.name, p.path, bm25(project_text, 10.0, 1.0, 2.0) AS rank "
+               "FROM project_text JOIN projects p ON p.id = project_text.rowid WHERE project_text MATCH ?")
+        args: List[Any] = [match]
+        if root is not None:
+            sql += " AND p.root = ?"
+            args.append(str(root))
+        if category is not None:
+            sql += " AND p.category = ?"
+            args.append(category)
+        sql += " ORDER BY rank LIMIT ?"
+        args.append(limit)
+        return [(name, Path(path), rank) for name, path, rank in self.conn.execute(sql, args)]
+
+
+def search_project_text(query: str, limit: int = 5) -> List[Tuple[str, Path, float]]:
+    """Full-text search of the project database, if enabled (else [])."""
+    db = ProjectDB.open()
+    if not db:
         return []
+    try:
+        return db.search_ranked(query, root=PROJECTS_DIR, limit=limit)
+    except db.Error:
+        return []
+    finally:
+        db.close()
+
+
+def filter_text_matches(mentions: List[Tuple[str, Path, float]], projects: Sequence,
+                        accept: Optional[Callable[[List[int]], List[bool]]],
+                        limit: int = 5) -> List[Tuple[str, Path, float]]:
+    """
+    Keep the full-text matches that are among projects (already narrowed by
+    the cheap filters) and that accept() takes (see postfilter_accept()).
+    """
+    results = [(name, rank, i) for name, path, rank in mentions for i in _positions_of(projects, [str(path)])]
+    if accept:
+        results = _accepted(results, accept, limit)
+    return [(name, projects[i][1], rank) for name, rank, i in results[:limit]]
 
 
-def fuzzy_match_project(query: str, projects: List[Tuple[str, Path]]) -> Tuple[Optional[Path], Optional[str], int, List[Tuple[str, int]]]:
+def clear_text_match(mentions: List[Tuple[str, Path, float]]) -> Optional[Tuple[str, Path, float]]:
+    """Return the best full-text match if it stands out (see TEXT_MATCH_MARGIN), else None."""
+    if len(mentions) == 1 or (len(mentions) > 1 and mentions[0][2] <= TEXT_MATCH_MARGIN * mentions[1][2]):
+        return mentions[0]
+    return None
+
+
+def index_project_text(budget: float = DB_TEXT_BUDGET) -> bool:
+    """
+    Index READMEs and manifests of the project database for up to budget
+    seconds, a batch at a time. Returns whether projects are left to index.
+    """
+    db = ProjectDB.open()
+    if not db:
+        return False
+    end = time.monotonic() + budget
+    try:
+        while time.monotonic() < end:
+            if db.index_text() < DB_TEXT_BATCH:
+                return False
+        return True
+    except db.Error:
+        return False
+    finally:
+        db.close()
+
+
+class _SQLiteTransaction:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) on an autocommit connection."""
+    
+    def __init__(self, conn):
+        self.conn = conn
+    
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+    
+    def __exit__(self, exc_type, *exc_info):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def load_frecency() -> Dict[str, Dict[str, float]]:
+    """Load the frecency store: {project_path: {"rank": opens, "last": epoch seconds}}."""
+    data = _read_json(get_state_dir() / FRECENCY_FILENAME, {})
+    return data if isinstance(data, dict) else {}
+
+
+def record_project_open(path: Path) -> None:
+    """Bump the frecency rank of an opened project, aging old entries like zoxide."""
+    entries = load_frecency()
+    entry = entries.setdefault(str(path), {"rank": 0.0, "last": 0.0})
+    entry["rank"] += 1
+    entry["last"] = time.time()
+    
+    if sum(e["rank"] for e in entries.values()) > FRECENCY_MAX_TOTAL:
+        for key in list(entries):
+            entries[key]["rank"] *= FRECENCY_AGING
+            if entries[key]["rank"] < 1:
+                del entries[key]
+    _write_json(get_state_dir() / FRECENCY_FILENAME, entries)
+    
+    db = ProjectDB.open()
+    if db:
+        try:
+            db.record_open(path)
+        except db.Error:
+            pass
+        finally:
+            db.close()
+
+
+def frecency_scores(now: Optional[float] = None) -> Dict[str, float]:
+    """Return {project_path: frecency}, weighting ranks by how recently they were opened."""
+    now = time.time() if now is None else now
+    scores = {}
+    for path, entry in load_frecency().items():
+        age = now - entry.get("last", 0)
+        if age < 3600:
+            weight = 4.0
+        elif age < 86400:
+            weight = 2.0
+        elif age < 7 * 86400:
+            weight = 0.5
+        else:
+            weight = 0.25
+        scores[path] = entry.get("rank", 0) * weight
+    return scores
+
+
+def load_shortcuts() -> Dict[str, Any]:
+    """Load the shortcut store: {"aliases": {alias: project_path}, "last": project_path}."""
+    data = _read_json(get_state_dir() / SHORTCUTS_FILENAME, {})
+    if not isinstance(data, dict):
+        data = {}
+    if not isinstance(data.get("aliases"), dict):
+        data["aliases"] = {}
+    return data
+
+
+def save_shortcuts(shortcuts: Dict[str, Any]) -> None:
+    _write_json(get_state_dir() / SHORTCUTS_FILENAME, shortcuts)
+
+
+def set_last_project(path: Path) -> None:
+    """Remember path as the target of `ai "open last"`."""
+    shortcuts = load_shortcuts()
+    if shortcuts.get("last") != str(path):
+        shortcuts["last"] = str(path)
+        save_shortcuts(shortcuts)
+
+
+def resolve_shortcut(command: str) -> Optional[Tuple[str, Path]]:
+    """
+    Resolve a command naming an alias or "last" without touching the projects tree.
+    Returns: (shortcut, project_path), or None if the command is not a
+    shortcut or its project directory no longer exists.
+    """
+    key = ' '.join(extract_keywords(command))
+    if not key:
+        return None
+    shortcuts = load_shortcuts()
+    if key == LAST_PROJECT_ALIAS:
+        target = shortcuts.get("last")
+    else:
+        target = shortcuts["aliases"].get(key)
+    if not target:
+        return None
+    path = Path(target)
+    # A single stat validates the shortcut
+    if not path.is_dir():
+        return None
+    return key, path
+
+
+def query_cache_enabled() -> bool:
+    return os.environ.get("AI_CLI_QUERY_CACHE", "1") != "0"
+
+
+def load_cached_match(key: str, version: List[Any],
+                      now: Optional[float] = None) -> Optional[List[Tuple[str, float, Path]]]:
+    """
+    Return the cached fuzzy results (before frecency) for a query's
+    keywords, or None if there are none for this version of the project
+    tree or they are older than QUERY_CACHE_TTL. A hit becomes the most
+    recently used entry.
+    """
+    path = get_cache_dir() / QUERY_CACHE_FILENAME
+    now = time.time() if now is None else now
+    data = _read_json(path, {})
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    entry = data.get("entries", {}).get(key)
+    if not isinstance(entry, dict) or now - entry.get("stored", 0) > QUERY_CACHE_TTL:
+        return None
+    entry["used"] = now
+    _write_json(path, data)
+    return [(name, score, PROJECTS_DIR / category / name) for name, score, category in entry["results"]]
+
+
+def cache_match(key: str, version: List[Any], results: List[Tuple[str, float, Path]],
+                now: Optional[float] = None) -> None:
+    """
+    Cache fuzzy results (name, score, path) for a query's keywords, dropping
+    the entries of other versions, expired ones and, past QUERY_CACHE_SIZE,
+    the least recently used.
+    """
+    path = get_cache_dir() / QUERY_CACHE_FILENAME
+    now = time.time() if now is None else now
+    data = _read_json(path, {})
+    entries = data.get("entries") if isinstance(data, dict) and data.get("version") == version else None
+    if not isinstance(entries, dict):
+        entries = {}
+    entries[key] = {
+        "stored": now,
+        "used": now,
+        "results": [[name, score, project_path.parent.name] for name, score, project_path in results],
+    }
+    live = sorted(
+        ((entry_key, entry) for entry_key, entry in entries.items()
+         if isinstance(entry, dict) and now - entry.get("stored", 0) <= QUERY_CACHE_TTL),
+        key=lambda item: item[1].get("used", 0)
+    )
+    _write_json(path, {"version": version, "entries": dict(live[-QUERY_CACHE_SIZE:])})
+
+
+def rank_cached_match(results: List[Tuple[str, float, Path]],
+                      frecency: Optional[Dict[str, float]],
+                      top_paths: Optional[List[Path]] = None) -> Tuple[Optional[Path], Optional[str], int, List[Tuple[str, int]]]:
+    """Turn cached results into fuzzy_match_project()'s return value, with today's frecency."""
+    projects = [(name, project_path) for name, _, project_path in results]
+    return _rank_results([(name, score, i) for i, (name, score, _) in enumerate(results)], projects, frecency,
+                         top_paths)
+
+
+def _frecency_bonus(frecency: float) -> float:
+    """Map a frecency to the points added to a fuzzy score."""
+    return FRECENCY_MAX_BONUS * frecency / (frecency + FRECENCY_HALF_BONUS)
+
+
+def _token_sort_key(text: str) -> str:
+    """Return text as fuzz.token_sort_ratio compares it: whitespace tokens, sorted."""
+    return ' '.join(sorted(text.split()))
+
+
+def _trigrams(text: str) -> set:
+    """Return the set of character trigrams of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Character-trigram inverted index over project names.
+    Names (and, if given, their segments) are indexed in the token-sorted
+    form fuzz.token_sort_ratio scores, so the q-gram lemma bounds the score
+    of every name that shares no trigram with the query; see
+    max_unseen_score().
+    """
+    
+    def __init__(self, names: List[str], segments: Optional[List[str]] = None):
+        self.names = names
+        self.max_length = 0
+        self._postings: Dict[str, List[int]] = {}
+        for i, name in enumerate(names):
+            keys = [_token_sort_key(name)]
+            if segments is not None:
+                keys.append(_token_sort_key(segments[i]))
+            self.max_length = max(self.max_length, *map(len, keys))
+            for gram in set().union(*map(_trigrams, keys)):
+                self._postings.setdefault(gram, []).append(i)
+    
+    def candidates(self, query: str) -> List[int]:
+        """Return the indices of names sharing at least one trigram with query, in order."""
+        ids: set = set()
+        for gram in _trigrams(_token_sort_key(query)):
+            ids.update(self._postings.get(gram, ()))
+        return sorted(ids)
+    
+    def max_unseen_score(self, query: str) -> float:
+        """
+        Upper bound on token_sort_ratio(query, key) for the indexed keys
+        (names and segments) of the names outside candidates().
+        Strings within Levenshtein distance k share at least
+        max(m, n) - 2 - 3k trigrams, so sharing none forces
+        k >= (max(m, n) - 2) / 3; the Indel distance behind the ratio is at
+        least k and at least |m - n|.
+        """
+        m = len(_token_sort_key(query))
+        best = 0.0
+        for n in range(1, self.max_length + 1):
+            distance = max(abs(m - n), -(-(max(m, n) - 2) // 3))
+            best = max(best, 100 * (1 - distance / (m + n)))
+        return best
+
+
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+
+def _split_separators(text: str) -> str:
+    """Turn the usual name separators into spaces."""
+    return text.replace('-', ' ').replace('_', ' ').replace('.', ' ')
+
+
+def _name_segments(names: List[str]) -> List[str]:
+    """
+    Split each name into lowercase words: "LocalAI_v2-app" -> "local ai v2 app".
+    The names are lowercased and split in one pass over their joined text;
+    only names with capitals go through the camelCase regex.
+    """
+    text = '\n'.join(names)
+    lowered = text.lower()
+    segments = _split_separators(lowered).split('\n')
+    if lowered != text:
+        for i, (name, lower) in enumerate(zip(names, lowered.split('\n'))):
+            if name != lower:
+                segments[i] = _split_separators(_CAMEL_BOUNDARY.sub(' ', name).lower())
+    return segments
+
+
+class ProjectFields:
+    """
+    The match fields of a project list, computed once per catalog: the
+    names, their segments (see _name_segments()) and the words of each
+    category, with the positions of the projects filed under it. Segments
+    are only split for all names on first use; a search racing a deadline
+    splits the chunks it gets to (segments_at()).
+    """
+    
+    def __init__(self, names: List[str], categories: List[str], category_ids: Sequence):
+        self.names = names
+        self._segments: Optional[List[str]] = None
+        self.category_words = [set(words.split()) for words in _name_segments(categories)]
+        self._category_ids = category_ids
+        self._members: Dict[int, List[int]] = {}
+        self._segment_text: Optional[str] = None
+        self._acronym_index: Optional["AcronymIndex"] = None
+        self._typo_index: Optional["TypoIndex"] = None
+    
+    @property
+    def segments(self) -> List[str]:
+        if self._segments is None:
+            self._segments = _name_segments(self.names)
+        return self._segments
+    
+    def segments_at(self, indices: Sequence[int]) -> List[str]:
+        """Return the segments of the names at indices, without splitting the others."""
+        if self._segments is not None:
+            return [self._segments[i] for i in indices]
+        return _name_segments([self.names[i] for i in indices])
+    
+    def members(self, category_id: int) -> List[int]:
+        """Return the positions of the projects in a category."""
+        if category_id not in self._members:
+            self._members[category_id] = [i for i, c in enumerate(self._category_ids) if c == category_id]
+        return self._members[category_id]
+    
+    def member_chunks(self, category_id: int, size: int) -> Iterator[List[int]]:
+        """
+        Yield the positions of the projects in a category, a chunk of the
+        positions of up to size projects (of any category) at a time.
+        """
+        if category_id in self._members:
+            members = self._members[category_id]
+            for start in range(0, len(members), size):
+                yield members[start:start + size]
+            return
+        ids = self._category_ids
+        for start in range(0, len(ids), size):
+            chunk = [i for i in range(start, min(start + size, len(ids))) if ids[i] == category_id]
+            if chunk:
+                yield chunk
+    
+    def segment_text(self) -> str:
+        """Return the segments joined by newlines, for regex scans over all of them."""
+        if self._segment_text is None:
+            self._segment_text = '\n'.join(self.segments)
+        return self._segment_text
+    
+    def acronym_index(self, build: bool = True) -> Optional["AcronymIndex"]:
+        """Return an AcronymIndex over the segments, built on first use (or None if not built and not build)."""
+        if self._acronym_index is None and build:
+            self._acronym_index = AcronymIndex(self.segments)
+        return self._acronym_index
+    
+    def typo_index(self, build: bool = True) -> Optional["TypoIndex"]:
+        """Return a TypoIndex over the segments, built on first use (or None if not built and not build)."""
+        if self._typo_index is None and build:
+            self._typo_index = TypoIndex(self.segments)
+        return self._typo_index
+
+
+def _project_fields(projects: Sequence) -> ProjectFields:
+    """Return the match fields of a ProjectCatalog or a list of (name, path) tuples."""
+    if isinstance(projects, ProjectCatalog):
+        return projects.fields()
+    ids: Dict[str, int] = {}
+    category_ids = [ids.setdefault(path.parent.name, len(ids)) for _, path in projects]
+    return ProjectFields([name for name, _ in projects], list(ids), category_ids)
+
+
+def _abbreviation_pattern(query: str) -> "re.Pattern":
+    """
+    Return a regex matching the segments (lines) query abbreviates: at least
+    two words, each starting with the next letter of query and taking any
+    further letters of query it has, in order, with no word left out but
+    trailing numbers ("ai cli 2").
+    """
+    # Some word after the first is not just a number
+    pattern = r'^(?=[^\n]*? (?![0-9]+(?: |$)))' + re.escape(query[0])
+    for char in map(re.escape, query[1:]):
+        # The letter is later in this word, or starts the next one
+        pattern += rf'(?:[^ \n]*?{char}|[^ \n]* {char})'
+    return re.compile(pattern + r'[^ \n]*(?: [0-9]+)*$', re.MULTILINE)
+
+
+class AcronymIndex:
+    """
+    Projects by initialism ("local ai" -> "la", and "ac" as well as "ac2"
+    for "ai cli 2"), with the sorted words of their names. A query of n
+    letters can only abbreviate names whose initialism is one of its
+    2^(n-1) subsequences starting with its first letter, so a lookup costs
+    the same however many projects there are.
+    """
+    
+    def __init__(self, segments: List[str]):
+        self.segments = segments
+        self.words = sorted({word for words in segments for word in words.split()})
+        self._initialisms: Dict[str, List[int]] = {}
+        for i, words in enumerate(segments):
+            parts = words.split()
+            initialism = ''.join(word[0] for word in parts)
+            if len(parts) > 1:
+                self._initialisms.setdefault(initialism, []).append(i)
+            # Trailing numbers may be left out
+            while parts and parts[-1].isdigit():
+                parts.pop()
+            if 1 < len(parts) < len(initialism):
+                self._initialisms.setdefault(initialism[:len(parts)], []).append(i)
+    
+    def starts_a_word(self, query: str) -> bool:
+        """Return whether query is the start of any word of the names."""
+        i = bisect.bisect_left(self.words, query)
+        return i < len(self.words) and self.words[i].startswith(query)
+    
+    def candidates(self, query: str) -> List[int]:
+        """Return the positions of the names query abbreviates, in order."""
+        from itertools import combinations
+        
+        pattern = _abbreviation_pattern(query)
+        found = set()
+        for length in range(1, len(query)):
+            for rest in combinations(query[1:], length):
+                for i in self._initialisms.get(query[0] + ''.join(rest), ()):
+                    if i not in found and pattern.match(self.segments[i]):
+                        found.add(i)
+        return sorted(found)
+
+
+def _abbreviated(query: str, fields: ProjectFields, scan: bool = True) -> Optional[List[int]]:
+    """
+    Return the positions of the projects query abbreviates (see
+    AcronymIndex), or None if it is no abbreviation: not a single word of
+    2 to ACRONYM_MAX_LENGTH letters, the start of a word of some name, or
+    one typo away from a word (or run of words) of a name it would
+    abbreviate ("locl" is local-cli's "local" mistyped, not l-o-c-l).
+    Without a prebuilt index, regex passes over the segments do it (unless
+    not scan, then it gives up).
+    """
+    from rapidfuzz.distance import OSA
+    
+    if not 2 <= len(query) <= ACRONYM_MAX_LENGTH or not query.isalnum():
+        return None
+    index = fields.acronym_index(build=False)
+    if index is None and not scan:
+        return None
+    if index is not None:
+        if index.starts_a_word(query):
+            return None
+        found = index.candidates(query)
+    else:
+        text = fields.segment_text()
+        # query, not preceded by a letter of the same word (a literal first scans fast)
+        if re.search(rf'{re.escape(query)}(?<![^ \n]{"." * len(query)})', text):
+            return None
+        found = []
+        line, position = 0, 0
+        for match in _abbreviation_pattern(query).finditer(text):
+            line += text.count('\n', position, match.start())
+            position = match.start()
+            found.append(line)
+    
+    runs = set()
+    for i in found:
+        words = fields.segments[i].split()
+        runs.update(''.join(words[start:end]) for start in range(len(words))
+                    for end in range(start + 1, len(words) + 1))
+    if any(OSA.distance(query, run, score_cutoff=1) <= 1 for run in runs if len(run) >= max(3, len(query) - 1)):
+        return None
+    return found
+
+
+def _acronym_results(query: str, fields: ProjectFields, limit: int,
+                     scan: bool = True) -> Optional[List[Tuple[str, float, int]]]:
+    """
+    Return process.extract-style results for the projects query
+    abbreviates, or None if there are none (or it is no abbreviation, or
+    without scan, there is no prebuilt index to tell).
+    """
+    from rapidfuzz import fuzz
+    
+    found = _abbreviated(query, fields, scan)
+    if not found:
+        return None
+    names = fields.names
+    if len(found) == 1:
+        return [(names[found[0]], ACRONYM_SCORE, found[0])]
+    # Several: rank them by fuzzy score, as a full pass would
+    ranked = sorted(found, key=lambda i: (-fuzz.token_sort_ratio(query, names[i]), i))[:limit]
+    return [(names[i], ACRONYM_AMBIGUOUS_SCORE, i) for i in ranked]
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of words under Levenshtein distance. Children hang
+    off each node by their distance to it, so by the triangle inequality a
+    search within k edits of a word only descends into the children at
+    d - k .. d + k from a node at distance d, a small part of the tree.
+    """
+    
+    def __init__(self, words: Iterator[str]):
+        from rapidfuzz.distance import Levenshtein
+        
+        self._distance = Levenshtein.distance
+        self._root: Optional[list] = None
+        for word in words:
+            self.add(word)
+    
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = [word, {}]
+            return
+        node = self._root
+        while True:
+            distance = self._distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                return
+            node = child
+    
+    def search(self, word: str, k: int) -> List[Tuple[int, str]]:
+        """Return (distance, found) for every word within k edits of word."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = self._distance(word, node_word)
+            if distance <= k:
+                found.append((distance, node_word))
+            stack.extend(child for child_distance, child in children.items()
+                         if distance - k <= child_distance <= distance + k)
+        return found
+
+
+class TypoIndex:
+    """
+    The words of project names, and runs of consecutive words ("webapi" for
+    web-api), with the positions of the projects they appear in; found
+    within a few edits of a query through a BKTree. Numbers are left out.
+    """
+    
+    def __init__(self, segments: List[str]):
+        self._postings: Dict[str, List[int]] = {}
+        for i, words in enumerate(segments):
+            parts = [word for word in words.split() if not word.isdigit()]
+            for start in range(len(parts)):
+                for end in range(start + 1, len(parts) + 1):
+                    self._postings.setdefault(''.join(parts[start:end]), []).append(i)
+        self._tree = BKTree(iter(self._postings))
+    
+    def candidates(self, query: str, k: int) -> List[int]:
+        """Return the positions of the projects with a word (or run) within k edits of query."""
+        found = set()
+        for _, word in self._tree.search(query, k):
+            found.update(self._postings[word])
+        return sorted(found)
+
+
+def _typo_results(query: str, fields: ProjectFields, limit: int) -> Optional[List[Tuple[str, float, int]]]:
+    """
+    First stage for one-word queries: fuzzy score only the projects the
+    prebuilt TypoIndex finds within a few edits of query.
+    Returns: process.extract-style results, or None without an index, a
+    one-word query or a confident match among them.
+    """
+    index = fields.typo_index(build=False)
+    if index is None or ' ' in query:
+        return None
+    candidates = index.candidates(query, 1 if len(query) <= TYPO_SHORT_WORD else TYPO_MAX_DISTANCE)
+    if not candidates:
+        return None
+    results = _ranked(_field_scores(query, fields, limit, candidates), fields.names, limit)
+    if results[0][1] < CONFIDENCE_THRESHOLD:
+        return None
+    return results
+
+
+def _ranked(scores: Dict[int, float], names: List[str], limit: int) -> List[Tuple[str, float, int]]:
+    """Return process.extract-style results for {position: score}: best score, then earliest position."""
+    best = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:limit]
+    return [(names[i], score, i) for i, score in best]
+
+
+def _merge_scores(scores: Dict[int, float], more: Dict[int, float]) -> Dict[int, float]:
+    """Keep the best score of each position in scores (updated in place)."""
+    for i, score in more.items():
+        if score > scores.get(i, -1):
+            scores[i] = score
+    return scores
+
+
+def _field_scores(query: str, fields: ProjectFields, limit: int,
+                  indices: Optional[Sequence[int]] = None) -> Dict[int, float]:
+    """
+    Score query against the name and segments fields of the projects at
+    indices (all by default), each weighted by FIELD_WEIGHTS.
+    Returns: {position: best weighted score} for the best `limit` projects
+    of each field, which holds the best `limit` projects overall.
+    """
+    from rapidfuzz import fuzz, process
+    
+    scores: Dict[int, float] = {}
+    for field in ("name", "segments"):
+        weight = FIELD_WEIGHTS[field]
+        if not weight:
+            continue
+        if field == "segments":
+            subset = fields.segments if indices is None else fields.segments_at(indices)
+        elif indices is None:
+            subset = fields.names
+        elif isinstance(indices, range):
+            subset = fields.names[indices.start:indices.stop]
+        else:
+            subset = [fields.names[i] for i in indices]
+        results = process.extract(query, subset, scorer=fuzz.token_sort_ratio, limit=limit)
+        _merge_scores(scores, {(i if indices is None else indices[i]): score * weight
+                               for _, score, i in results})
+    return scores
+
+
+def _category_scores(query: str, fields: ProjectFields, limit: int,
+                     deadline: Optional[Deadline] = None) -> Dict[int, float]:
+    """
+    Score the category field: for each category some (not all) of the query
+    words name, the rest of the query against the segments of its projects.
+    With a deadline, projects are scored MATCH_CHUNK_SIZE at a time until it
+    expires (marking it cut short).
+    Returns: {position: weighted score} for the best `limit` projects of each
+    such category.
+    """
+    from rapidfuzz import fuzz, process
+    
+    weight = FIELD_WEIGHTS["category"]
+    keywords = query.split()
+    scores: Dict[int, float] = {}
+    if not weight or len(keywords) < 2:
+        return scores
+    for category_id, words in enumerate(fields.category_words):
+        rest = [keyword for keyword in keywords if keyword not in words]
+        if len(rest) in (0, len(keywords)):
+            continue
+        chunks = (fields.member_chunks(category_id, MATCH_CHUNK_SIZE) if deadline
+                  else [fields.members(category_id)])
+        for chunk in chunks:
+            if deadline and deadline.expired():
+                deadline.cut_short()
+                return scores
+            results = process.extract(' '.join(rest), fields.segments_at(chunk),
+                                      scorer=fuzz.token_sort_ratio, limit=limit)
+            _merge_scores(scores, {chunk[i]: score * weight for _, score, i in results})
+    return scores
+
+
+def _extract_prefiltered(query: str, fields: ProjectFields, index: TrigramIndex, limit: int = 5,
+                         margin: float = 0) -> Optional[List[Tuple[str, float, int]]]:
+    """
+    Score only the names sharing a trigram with query (by name or segments).
+    Returns: process.extract-style results, or None if the best candidate
+    can't be proven to beat every name outside the candidate set by margin.
+    """
+    names = fields.names
+    candidates = index.candidates(query)
+    if not candidates or len(candidates) == len(names):
+        return None
+    
+    results = _ranked(_field_scores(query, fields, limit, candidates), names, limit)
+    bound = index.max_unseen_score(query) * max(FIELD_WEIGHTS["name"], FIELD_WEIGHTS["segments"])
+    if not results or results[0][1] <= bound + margin:
+        return None
+    return results
+
+
+def _extract_until(query: str, fields: ProjectFields, limit: int,
+                   deadline: Deadline) -> List[Tuple[str, float, int]]:
+    """
+    Score names MATCH_CHUNK_SIZE at a time until done or deadline expires
+    (at least one chunk is always scored).
+    Returns: process.extract-style results for the names scored so far.
+    """
+    names = fields.names
+    scores: Dict[int, float] = {}
+    for start in range(0, len(names), MATCH_CHUNK_SIZE):
+        if start and deadline.expired():
+            deadline.cut_short()
+            break
+        chunk = range(start, min(start + MATCH_CHUNK_SIZE, len(names)))
+        _merge_scores(scores, _field_scores(query, fields, limit, chunk))
+        # Only the best `limit` so far can make the final results
+        scores = {i: score for _, score, i in _ranked(scores, names, limit)}
+    return _ranked(scores, names, limit)
+
+
+def fuzzy_match_project(query: str, projects: Sequence,
+                        frecency: Optional[Dict[str, float]] = None,
+                        deadline: Optional[Deadline] = None,
+                        accept: Optional[Callable[[List[int]], List[bool]]] = None,
+                        pool: Optional[List[Tuple[str, float, Path]]] = None,
+                        top_paths: Optional[List[Path]] = None) -> Tuple[Optional[Path], Optional[str], int, List[Tuple[str, int]]]:
     """
     Fuzzy match query against projects.
     Args:
         query: Search query
-        projects: List of (project_name, project_path) tuples
+        projects: ProjectCatalog, or list of (project_name, project_path) tuples
+        frecency: Optional {project_path: frecency} from frecency_scores();
+            the best fuzzy matches are re-ranked with a bonus for projects
+            opened often and recently
+        deadline: Optional Deadline; names are then scored MATCH_CHUNK_SIZE at
+            a time and the best match so far is returned once it expires
+            (with deadline.exhausted set)
+        accept: Optional predicate on batches of positions in projects
+            (see postfilter_accept()); only the best FILTER_POOL matches are
+            checked, best first, until enough are accepted
+        pool: Optional list, filled with the (name, score, path) fuzzy
+            results frecency re-ranks, for the query cache
+        top_paths: Optional list, filled with the paths of the top 5
+            matches (names alone are ambiguous across categories)
     Returns: (best_match_path, best_match_name, best_score, top_5_matches)
+    
+    Each project scores its best field in FIELD_WEIGHTS (name, segments,
+    category). Large catalogs with a prebuilt TrigramIndex (the daemon's) are
+    prefiltered through it; the best match is always the one a full scan
+    would find.
     """
     try:
         if not projects:
@@ -149,40 +1774,544 @@ def fuzzy_match_project(query: str, projects: List[Tuple[str, Path]]) -> Tuple[O
         if not query_normalized:
             return None, None, 0, []
         
-        # Extract just the project names for matching
-        project_names = [name for name, _ in projects]
+        # Precomputed per catalog: names, segments and category words
+        fields = _project_fields(projects)
+        project_names = fields.names
+        
+        wanted = FRECENCY_POOL if frecency else 5
+        limit = max(wanted, FILTER_POOL) if accept else wanted
+        
+        # Large catalogs: score only names sharing a trigram with the query
+        # (not with accept, which may reject the best match the prefilter proves)
+        # Abbreviations ("lai" for local-ai) resolve without a full pass (with
+        # a deadline only through a prebuilt index, as a scan can't be cut
+        # short), and so do one-word queries with a close word in the
+        # daemon's typo index
+        results = _acronym_results(query_normalized, fields, limit, scan=deadline is None)
+        if results is None and deadline is None and not accept:
+            results = _typo_results(query_normalized, fields, limit)
+        if results is None and deadline is not None:
+            results = _extract_until(query_normalized, fields, limit, deadline)
+        elif results is None and len(project_names) >= TRIGRAM_MIN_PROJECTS and not accept:
+            # Building an index costs far more than one full pass, so only a
+            # catalog that already has one (the daemon's) is prefiltered
+            index = projects.trigram_index(build=False) if isinstance(projects, ProjectCatalog) else None
+            if index is not None:
+                results = _extract_prefiltered(query_normalized, fields, limit=limit,
+                                               margin=FRECENCY_MAX_BONUS if frecency else 0,
+                                               index=index)
         
-        # Use token_sort_ratio for fuzzy matching
-        results = process.extract(
-            query_normalized,
-            project_names,
-            scorer=fuzz.token_sort_ratio,
-            limit=5
+        # Score each field with token_sort_ratio and keep every project's best
+        if results is None:
+            results = _ranked(_field_scores(query_normalized, fields, limit), project_names, limit)
+        category_scores = _category_scores(query_normalized, fields, limit, deadline)
+        if category_scores:
+            scores = {i: score for _, score, i in results}
+            results = _ranked(_merge_scores(scores, category_scores), project_names, limit)
+        
+        if accept:
+            results = _accepted(results, accept, wanted)
+        
+        if pool is not None:
+            pool.extend((name, score, projects[i][1]) for name, score, i in results)
+        return _rank_results(results, projects, frecency, top_paths)
+    except Exception as e:
+        typer.echo(f"❌ Error during fuzzy matching: {e}", err=True)
+        return None, None, 0, []
+
+
+def best_project_match(query: str, projects: Sequence,
+                       frecency: Optional[Dict[str, float]] = None,
+                       deadline: Optional[Deadline] = None,
+                       accept: Optional[Callable[[List[int]], List[bool]]] = None,
+                       pool: Optional[List[Tuple[str, float, Path]]] = None,
+                       top_paths: Optional[List[Path]] = None) -> Tuple[Optional[Path], Optional[str], int, List[Tuple[str, int]], bool]:
+    """
+    Find the project a query opens: one named exactly as asked (see
+    exact_name_key) wins outright, otherwise the best fuzzy match.
+    Takes the arguments of fuzzy_match_project().
+    Returns: (best_match_path, best_match_name, best_score, top_5_matches, exact)
+    """
+    exact = find_exact_project(exact_name_key(query), projects)
+    if exact is not None and (accept is None or accept([exact])[0]):
+        name, path = projects[exact]
+        if pool is not None:
+            pool.append((name, 100, path))
+        if top_paths is not None:
+            top_paths.append(path)
+        return path, name, 100, [(name, 100)], True
+    return (*fuzzy_match_project(query, projects, frecency=frecency, deadline=deadline, accept=accept,
+                                 pool=pool, top_paths=top_paths), False)
+
+
+def _accepted(results: List[Tuple[str, float, int]], accept: Callable[[List[int]], List[bool]],
+              wanted: int) -> List[Tuple[str, float, int]]:
+    """
+    Return the first `wanted` results accept() takes. Results are checked
+    `wanted` at a time, best first, so accept() can batch its slow checks
+    (git) without checking many more projects than needed.
+    """
+    accepted = []
+    batch_size = max(1, wanted)
+    for start in range(0, len(results), batch_size):
+        batch = results[start:start + batch_size]
+        for result, ok in zip(batch, accept([i for _, _, i in batch])):
+            if ok:
+                accepted.append(result)
+                if len(accepted) == wanted:
+                    return accepted
+    return accepted
+
+
+def _rank_results(results: List[Tuple[str, float, int]], projects: Sequence,
+                  frecency: Optional[Dict[str, float]],
+                  top_paths: Optional[List[Path]] = None) -> Tuple[Optional[Path], Optional[str], int, List[Tuple[str, int]]]:
+    """Turn process.extract-style results into fuzzy_match_project()'s return value."""
+    if not results:
+        return None, None, 0, []
+    
+    if frecency:
+        # Frecency only reorders the matches (the stable sort keeps fuzzy
+        # order among equals): the scores reported and held against
+        # CONFIDENCE_THRESHOLD stay the fuzzy ones, so a weak match is
+        # never opened just for being opened often
+        results = sorted(
+            results, key=lambda result: -(result[1] + _frecency_bonus(frecency.get(str(projects[result[2]][1]), 0)))
+        )
+    # Weighted fields leave scores like 9.999999999999998
+    results = [(name, round(score), i) for name, score, i in results[:5]]
+    
+    best_match_name, best_score, best_index = results[0]
+    # Take the path by position, so duplicate names resolve correctly
+    best_match_path = projects[best_index][1]
+    
+    # Build top 5 matches with names and scores
+    top_5 = [(name, score) for name, score, _ in results[:5]]
+    if top_paths is not None:
+        top_paths.extend(projects[i][1] for _, _, i in results[:5])
+    
+    return best_match_path, best_match_name, best_score, top_5
+
+
+_FILTER_PATTERN = re.compile(r'(?<!\S)(cat|lang|recent|dirty):(\S+)', re.IGNORECASE)
+
+
+def parse_query(command: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Split filters out of a command: "open api cat:work lang:go" ->
+    ("open api", [("cat", "work"), ("lang", "go")]).
+    Raises ValueError for a filter value that can't be understood.
+    """
+    filters = [(key.lower(), value) for key, value in _FILTER_PATTERN.findall(command)]
+    for key, value in filters:
+        if key == "recent":
+            parse_age(value)
+        elif key == "dirty" and value.lower() not in ("yes", "no", "true", "false", "1", "0"):
+            raise ValueError(f"dirty: takes yes or no, not '{value}'")
+    return ' '.join(_FILTER_PATTERN.sub(' ', command).split()), filters
+
+
+def parse_age(value: str) -> float:
+    """Parse an age like 30m, 12h, 7d or 2w into seconds."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([mhdw])', value.lower())
+    if not match:
+        raise ValueError(f"recent: takes an age like 12h, 7d or 2w, not '{value}'")
+    return float(match.group(1)) * AGE_UNITS[match.group(2)]
+
+
+def project_languages(project_path: Path) -> set:
+    """Return the languages whose marker files (LANGUAGE_MARKERS) are in a project's top directory."""
+    try:
+        entries = os.listdir(project_path)
+    except OSError:
+        return set()
+    return {LANGUAGE_MARKERS[entry] for entry in entries if entry in LANGUAGE_MARKERS}
+
+
+def git_info_enabled() -> bool:
+    return os.environ.get("AI_CLI_GIT_INFO", "1") != "0"
+
+
+def _git_dir(project_path: Path) -> Optional[Path]:
+    """Return a project's git directory (following the `gitdir:` file of worktrees), or None."""
+    git_path = project_path / ".git"
+    if git_path.is_dir():
+        return git_path
+    try:
+        with open(git_path) as f:
+            line = f.readline()
+    except OSError:
+        return None
+    if not line.startswith("gitdir:"):
+        return None
+    return project_path / line[len("gitdir:"):].strip()
+
+
+def _git_info_key(git_dir: Path, now_ns: int) -> Optional[List[int]]:
+    """
+    Return the mtimes of HEAD and the index of a git directory (0 for no
+    index yet), or None if either changed too recently to be trusted.
+    """
+    try:
+        head = _trusted_mtime(git_dir / "HEAD", now_ns)[1]
+    except OSError:
+        return None
+    try:
+        index = _trusted_mtime(git_dir / "index", now_ns)[1]
+    except OSError:
+        index = 0
+    if head is None or index is None:
+        return None
+    return [head, index]
+
+
+def query_git_info(project_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Ask git for a project's branch (None if detached), whether it has
+    uncommitted changes and when it was last committed to.
+    Returns: {"branch", "dirty", "commit_time"}, or None if git can't tell.
+    """
+    # --no-optional-locks: status must not refresh the index (and its mtime)
+    git = ["git", "--no-optional-locks"]
+    try:
+        status = subprocess.run(git + ["status", "--porcelain=v2", "--branch"], cwd=project_path,
+                                capture_output=True, text=True, timeout=GIT_INFO_TIMEOUT)
+        log = subprocess.run(git + ["log", "-1", "--format=%ct"], cwd=project_path,
+                             capture_output=True, text=True, timeout=GIT_INFO_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if status.returncode != 0:
+        return None
+    branch = None
+    dirty = False
+    for line in status.stdout.splitlines():
+        if line.startswith("# branch.head "):
+            branch = line[len("# branch.head "):]
+        elif not line.startswith("#"):
+            dirty = True
+    commit_time = log.stdout.strip()
+    return {
+        "branch": None if branch == "(detached)" else branch,
+        "dirty": dirty,
+        "commit_time": int(commit_time) if log.returncode == 0 and commit_time.isdigit() else None,
+    }
+
+
+def collect_git_info(paths: List[Path], now: Optional[float] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Return query_git_info() for each of paths (None for folders that aren't
+    git repos). Repos are only queried if their HEAD or index changed since
+    they were cached, several at a time; fresh results are also stored in
+    the project database.
+    """
+    cache_path = get_cache_dir() / GIT_INFO_FILENAME
+    now = time.time() if now is None else now
+    now_ns = time.time_ns()
+    entries = _read_json(cache_path, {})
+    if not isinstance(entries, dict):
+        entries = {}
+    
+    infos: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+    keys: List[Optional[List[int]]] = [None] * len(paths)
+    stale = []
+    for i, project_path in enumerate(paths):
+        git_dir = _git_dir(project_path)
+        if git_dir is None:
+            continue
+        keys[i] = _git_info_key(git_dir, now_ns)
+        entry = entries.get(str(project_path))
+        if (keys[i] is not None and isinstance(entry, dict) and entry.get("key") == keys[i]
+                and now - entry.get("checked", 0) <= GIT_INFO_TTL):
+            infos[i] = entry.get("info")
+        else:
+            stale.append(i)
+    if not stale:
+        return infos
+    
+    for i, info in zip(stale, _parallel_map(lambda i: query_git_info(paths[i]), stale, GIT_INFO_WORKERS)):
+        infos[i] = info
+        if info is not None and keys[i] is not None:
+            entries[str(paths[i])] = {"key": keys[i], "checked": now, "info": info}
+    # Past GIT_INFO_SIZE, the repos checked longest ago are dropped
+    live = sorted(((key, entry) for key, entry in entries.items() if isinstance(entry, dict)),
+                  key=lambda item: item[1].get("checked", 0))
+    _write_json(cache_path, dict(live[-GIT_INFO_SIZE:]))
+    
+    fresh = [(paths[i], infos[i]) for i in stale if infos[i] is not None]
+    db = ProjectDB.open() if fresh else None
+    if db:
+        try:
+            db.record_git_info(fresh)
+        except db.Error:
+            pass
+        finally:
+            db.close()
+    return infos
+
+
+def format_age(seconds: float) -> str:
+    """Describe an age in the largest AGE_UNITS it fills: "3d ago", "5m ago" or "just now"."""
+    for unit, unit_seconds in sorted(AGE_UNITS.items(), key=lambda item: -item[1]):
+        if seconds >= unit_seconds:
+            return f"{int(seconds // unit_seconds)}{unit} ago"
+    return "just now"
+
+
+def format_git_info(info: Dict[str, Any], now: Optional[float] = None) -> str:
+    """Describe query_git_info() results: "main, uncommitted changes, last commit 3d ago"."""
+    now = time.time() if now is None else now
+    parts = [info.get("branch") or "detached HEAD"]
+    if info.get("dirty"):
+        parts.append("uncommitted changes")
+    if info.get("commit_time") is not None:
+        parts.append(f"last commit {format_age(now - info['commit_time'])}")
+    return ', '.join(parts)
+
+
+def prefilter_projects(projects: Sequence, filters: List[Tuple[str, str]],
+                       now: Optional[float] = None) -> Sequence:
+    """
+    Apply the cheap filters (PRE_FILTERS) to projects, keeping their order.
+    cat: matches category names by case-insensitive prefix (several cat:
+    filters are alternatives); recent: keeps projects opened within an age.
+    """
+    categories = [value.lower() for key, value in filters if key == "cat"]
+    ages = [parse_age(value) for key, value in filters if key == "recent"]
+    if not categories and not ages:
+        return projects
+    
+    def category_ok(category: str) -> bool:
+        return not categories or any(category.lower().startswith(prefix) for prefix in categories)
+    
+    recent = None
+    if ages:
+        cutoff = (time.time() if now is None else now) - min(ages)
+        recent = {path for path, entry in load_frecency().items() if entry.get("last", 0) >= cutoff}
+    
+    if isinstance(projects, ProjectCatalog):
+        allowed = {i for i, category in enumerate(projects.categories) if category_ok(category)}
+        if recent is None:
+            indices = [i for i, category_id in enumerate(projects.category_ids) if category_id in allowed]
+        else:
+            # Few projects are recent: look them up rather than test every project
+            indices = sorted(i for i in _positions_of(projects, recent)
+                             if projects.category_ids[i] in allowed)
+        return projects.subset(indices)
+    return [(name, path) for name, path in projects
+            if category_ok(Path(path).parent.name) and (recent is None or str(path) in recent)]
+
+
+def _positions_of(projects: Sequence, paths: Any) -> List[int]:
+    """Return the positions of the given project paths (strings) in projects."""
+    if not isinstance(projects, ProjectCatalog):
+        wanted = set(paths)
+        return [i for i, (_, path) in enumerate(projects) if str(path) in wanted]
+    # The catalog is sorted by name: binary search each path's name
+    names = projects.names
+    positions = []
+    for path in map(Path, paths):
+        i = bisect.bisect_left(names, path.name)
+        while i < len(names) and names[i] == path.name:
+            if projects.path(i) == path:
+                positions.append(i)
+            i += 1
+    return positions
+
+
+def rank_filtered(projects: Sequence, accept: Optional[Callable[[List[int]], List[bool]]],
+                  frecency: Dict[str, float], limit: int = 5) -> Tuple[List[Tuple[str, Path]], bool]:
+    """
+    For a query made only of filters: the projects that passed them, most
+    frecent first, then in catalog order.
+    Returns: (up to limit (name, path) pairs, whether that is all of them)
+    """
+    frecent = sorted(_positions_of(projects, frecency), key=lambda i: -frecency[str(projects[i][1])])
+    seen = set(frecent)
+    order = frecent + [i for i in range(min(len(projects), FILTER_POOL + len(seen))) if i not in seen]
+    order = order[:FILTER_POOL]
+    results = [(projects[i][0], 0.0, i) for i in order]
+    if accept:
+        accepted = _accepted(results, accept, limit + 1)
+    else:
+        accepted = results[:limit + 1]
+    complete = len(accepted) <= limit and len(order) == len(projects)
+    return [projects[i][:2] for _, _, i in accepted[:limit]], complete
+
+
+def postfilter_accept(projects: Sequence, filters: List[Tuple[str, str]]) -> Optional[Callable[[List[int]], List[bool]]]:
+    """
+    Return a predicate for the filters that look inside each project
+    (POST_FILTERS), or None if there are none. It takes a batch of
+    positions in projects and returns whether each passes.
+    """
+    languages = {LANGUAGE_ALIASES.get(value.lower(), value.lower()) for key, value in filters if key == "lang"}
+    dirty = [value.lower() in ("yes", "true", "1") for key, value in filters if key == "dirty"]
+    if not languages and not dirty:
+        return None
+    
+    def accept(indices: List[int]) -> List[bool]:
+        paths = [projects[i][1] for i in indices]
+        # Cheapest check first: one listdir per project, then one git
+        # lookup (see collect_git_info()) for those left
+        ok = [True] * len(paths)
+        if languages:
+            found = _parallel_map(project_languages, paths, get_scan_workers())
+            ok = [bool(languages & project_langs) for project_langs in found]
+        if dirty:
+            left = [k for k, passed in enumerate(ok) if passed]
+            for k, info in zip(left, collect_git_info([paths[k] for k in left])):
+                ok[k] = bool(info and info["dirty"]) == dirty[-1]
+        return ok
+    return accept
+
+
+def batch_match_projects(queries: List[str], projects: Sequence,
+                         frecency: Optional[Dict[str, float]] = None,
+                         workers: int = BATCH_WORKERS) -> Iterator[Tuple[Optional[Path], Optional[str], int, List[Tuple[str, int]]]]:
+    """
+    Fuzzy match many queries against the same projects.
+    Yields one fuzzy_match_project() result per query, in order. Queries are
+    scored against all names with process.cdist on `workers` threads, a
+    chunk of queries at a time so the score matrix stays within
+    BATCH_MAX_CELLS; without numpy (which cdist needs) each query goes
+    through fuzzy_match_project().
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        for query in queries:
+            yield fuzzy_match_project(query, projects, frecency)
+        return
+    from rapidfuzz import fuzz, process
+    
+    fields = _project_fields(projects)
+    project_names = fields.names
+    limit = min(FRECENCY_POOL if frecency else 5, len(project_names))
+    weighted = [(choices, FIELD_WEIGHTS[field])
+                for field, choices in (("name", project_names), ("segments", fields.segments))
+                if FIELD_WEIGHTS[field]]
+    # Worth building for many queries (see _abbreviated())
+    fields.acronym_index()
+    normalized = [' '.join(extract_keywords(query)) for query in queries]
+    chunk_size = max(1, BATCH_MAX_CELLS // max(1, len(project_names)))
+    
+    for start in range(0, len(normalized), chunk_size):
+        chunk = normalized[start:start + chunk_size]
+        acronyms = [_acronym_results(query, fields, limit) if query and project_names else None
+                    for query in chunk]
+        scored = [query for query, acronym in zip(chunk, acronyms) if query and acronym is None]
+        if scored and project_names:
+            # Best weighted field of each project, as in fuzzy_match_project()
+            matrix = None
+            for choices, weight in weighted:
+                field = process.cdist(scored, choices, scorer=fuzz.token_sort_ratio,
+                                      dtype=np.float64, workers=workers) * weight
+                matrix = field if matrix is None else np.maximum(matrix, field)
+        rows = iter(range(len(scored)))
+        for query, acronym in zip(chunk, acronyms):
+            if not query or not project_names:
+                yield None, None, 0, []
+                continue
+            if acronym is not None:
+                yield _rank_results(acronym, projects, frecency)
+                continue
+            scores = matrix[next(rows)]
+            for i, score in _category_scores(query, fields, limit).items():
+                scores[i] = max(scores[i], score)
+            # Everything scoring at least the limit-th best score, ranked by
+            # score and then catalog order, as process.extract ranks ties
+            top = np.flatnonzero(scores >= np.partition(scores, -limit)[-limit])
+            top = top[np.lexsort((top, -scores[top]))][:limit]
+            results = [(project_names[i], float(scores[i]), int(i)) for i in top]
+            yield _rank_results(results, projects, frecency)
+
+
+def editor_launch_detached() -> bool:
+    """Return whether the editor is launched detached (AI_CLI_LAUNCH=wait disables it)."""
+    return os.environ.get("AI_CLI_LAUNCH", "detach").lower() != "wait"
+
+
+def _launch_editor(argv: List[str], detach: bool) -> None:
+    """
+    Run an editor launcher command.
+    Detached, the editor gets its own session and no pipes, and this returns
+    as soon as it has been exec'ed (exec failures still raise). Otherwise
+    waits for the launcher to exit, raising CalledProcessError on failure.
+    """
+    if detach:
+        subprocess.Popen(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True
         )
-        
-        if not results:
-            return None, None, 0, []
-        
-        best_match_name, best_score, _ = results[0]
-        # Find the corresponding path for the best match
-        best_match_path = next((path for name, path in projects if name == best_match_name), None)
-        
-        # Build top 5 matches with names and scores
-        top_5 = [(name, score) for name, score, _ in results]
-        
-        return best_match_path, best_match_name, best_score, top_5
-    except Exception as e:
-        typer.echo(f"❌ Error during fuzzy matching: {e}", err=True)
-        return None, None, 0, []
+    else:
+        subprocess.run(
+            argv,
+            check=True,
+            capture_output=True,
+            timeout=10
+        )
+
+
+def load_cached_launcher() -> Optional[List[str]]:
+    """
+    Return the launcher command (without the path argument) that last opened
+    Cursor, or None if $PATH changed or its executable disappeared.
+    """
+    data = _read_json(get_state_dir() / LAUNCHER_FILENAME, None)
+    if not isinstance(data, dict) or data.get("path_env") != os.environ.get("PATH", ""):
+        return None
+    argv = data.get("argv")
+    if not isinstance(argv, list) or not argv or not os.access(argv[0], os.X_OK):
+        return None
+    return argv
+
+
+def cache_launcher(method: str, argv: List[str]) -> None:
+    """Remember a working launcher command, with its executable resolved to an absolute path."""
+    import shutil
+    
+    executable = shutil.which(argv[0])
+    if not executable:
+        return
+    _write_json(get_state_dir() / LAUNCHER_FILENAME, {
+        "path_env": os.environ.get("PATH", ""),
+        "method": method,
+        "argv": [os.path.abspath(executable), *argv[1:]],
+    })
+
+
+def forget_cached_launcher() -> None:
+    try:
+        (get_state_dir() / LAUNCHER_FILENAME).unlink()
+    except OSError:
+        pass
 
 
-def open_in_cursor(path: Path) -> bool:
-    """Open a path in Cursor."""
+def open_in_cursor(path: Path, detach: bool = False) -> bool:
+    """
+    Open a path in Cursor.
+    With detach=True, returns right after spawning the editor instead of
+    waiting for the launcher to exit.
+    """
     try:
         if not path.exists():
             typer.echo(f"❌ Error: Path does not exist: {path}", err=True)
             return False
         
+        # Go straight to the launcher that worked last time
+        cached_launcher = load_cached_launcher()
+        if cached_launcher:
+            try:
+                _launch_editor([*cached_launcher, str(path)], detach)
+                return True
+            except (OSError, subprocess.CalledProcessError):
+                # Stale cache: forget it and discover a working method again
+                forget_cached_launcher()
+        
         # Try different methods to open Cursor
         import platform
         
@@ -201,12 +2330,8 @@ def open_in_cursor(path: Path) -> bool:
         last_error = None
         for cmd in cursor_commands:
             try:
-                subprocess.run(
-                    [cmd, str(path)],
-                    check=True,
-                    capture_output=True,
-                    timeout=10
-                )
+                _launch_editor([cmd, str(path)], detach)
+                cache_launcher("cursor" if cmd == "cursor" else "app-bundle", [cmd])
                 return True
             except FileNotFoundError:
                 last_error = "FileNotFoundError"
@@ -218,12 +2343,8 @@ def open_in_cursor(path: Path) -> bool:
         # Fallback to macOS 'open' command
         if use_open_command:
             try:
-                subprocess.run(
-                    ["open", "-a", "Cursor", str(path)],
-                    check=True,
-                    capture_output=True,
-                    timeout=10
-                )
+                _launch_editor(["open", "-a", "Cursor", str(path)], detach)
+                cache_launcher("open", ["open", "-a", "Cursor"])
                 return True
             except FileNotFoundError:
                 typer.echo("❌ Error: Cursor is not installed or not found.", err=True)
@@ -298,15 +2419,863 @@ def create_project(project_name: str, base_dir: Optional[Path] = None) -> Path:
             except (IOError, OSError) as e:
                 raise Exception(f"Failed to create README.md: {e}")
         
+        db = ProjectDB.open()
+        if db:
+            try:
+                db.add_project(project_path)
+            except db.Error as e:
+                typer.echo(f"⚠️  Warning: Could not add project to database: {e}", err=True)
+            finally:
+                db.close()
+        
         return project_path
     except Exception as e:
         typer.echo(f"❌ Error creating project: {e}", err=True)
         raise
 
 
+def get_runtime_dir() -> Path:
+    """Return the directory for runtime files such as sockets (honours $XDG_RUNTIME_DIR)."""
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    return Path(base) / "ai-cli" if base else get_cache_dir()
+
+
+def get_daemon_socket_path() -> Path:
+    """Return the Unix socket path the `ai daemon` listens on."""
+    return get_runtime_dir() / DAEMON_SOCKET_NAME
+
+
+def _daemon_request(message: Dict[str, Any], timeout: float = DAEMON_CLIENT_TIMEOUT) -> Dict[str, Any]:
+    """Send one JSON request to the daemon and return its JSON reply."""
+    import socket
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(get_daemon_socket_path()))
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def _query_daemon() -> Optional[ProjectCatalog]:
+    """Ask a running `ai daemon` for the project list. Returns None if no daemon answers."""
+    if _ACTIVE_WATCHER is not None and _ACTIVE_WATCHER.root == PROJECTS_DIR:
+        # We are the daemon: commands sent by ai_client.py run in-process
+        return _ACTIVE_WATCHER.catalog()
+    if not get_daemon_socket_path().exists():
+        return None
+    try:
+        reply = _daemon_request({"op": "projects", "root": str(PROJECTS_DIR)})
+    except (OSError, ValueError):
+        # No daemon listening (stale socket) or a garbled reply
+        return None
+    if not reply.get("ok"):
+        return None
+    return ProjectCatalog.from_pairs(PROJECTS_DIR, reply["projects"])
+
+
+def _match_in_daemon(query: str, frecency: Dict[str, float],
+                     deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+    """
+    Ask a running `ai daemon` for the best matches of query among the
+    projects it holds (see _daemon_match), so they are found with the
+    indexes it keeps instead of shipping the list over. Returns its reply,
+    or None if no daemon answers (or this process is the daemon).
+    """
+    if _ACTIVE_WATCHER is not None or not get_daemon_socket_path().exists():
+        return None
+    request: Dict[str, Any] = {"op": "match", "root": str(PROJECTS_DIR), "query": query, "frecency": frecency}
+    if deadline:
+        request["deadline_ms"] = max(0.0, (deadline.end - time.perf_counter()) * 1000)
+    try:
+        reply = _daemon_request(request)
+    except (OSError, ValueError):
+        return None
+    return reply if reply.get("ok") else None
+
+
+class _Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+    
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    
+    ADDED = IN_CREATE | IN_MOVED_TO
+    REMOVED = IN_DELETE | IN_MOVED_FROM
+    SELF_GONE = IN_DELETE_SELF | IN_MOVE_SELF
+    
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        import struct
+        
+        self._event_header = struct.Struct("iIII")
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        """Return an inotify instance, or None where inotify is unavailable."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return cls()
+        except (OSError, AttributeError):
+            return None
+    
+    def add_watch(self, path: Path, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(self._ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+    
+    def rm_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+    
+    def read_events(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """Wait up to timeout seconds and return pending (wd, mask, name) events."""
+        import select
+        
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        header_size = self._event_header.size
+        while offset + header_size <= len(data):
+            wd, mask, _cookie, length = self._event_header.unpack_from(data, offset)
+            raw_name = data[offset + header_size:offset + header_size + length]
+            events.append((wd, mask, os.fsdecode(raw_name.rstrip(b"\0"))))
+            offset += header_size + length
+        return events
+    
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ProjectWatcher:
+    """
+    Keeps the project list of PROJECTS_DIR in memory.
+    Updated incrementally from inotify events on the root and category
+    directories, or by rescanning every DAEMON_POLL_INTERVAL seconds where
+    inotify is unavailable. With the project database enabled, it also
+    keeps the database in sync and indexes project text in the background.
+    """
+    
+    _WATCH_MASK = _Inotify.ADDED | _Inotify.REMOVED | _Inotify.IN_ONLYDIR
+    _ROOT_WATCH_MASK = _WATCH_MASK | _Inotify.SELF_GONE
+    
+    def __init__(self):
+        self.root = PROJECTS_DIR
+        self._lock = threading.Lock()
+        self._categories: Dict[str, set] = {}
+        self._sorted: Optional[List[Tuple[str, str]]] = None
+        self._catalog: Optional[ProjectCatalog] = None
+        self._catalog_pairs: Optional[List[Tuple[str, str]]] = None
+        self._inotify = _Inotify.create()
+        self._watches: Dict[int, Optional[str]] = {}
+        self._root_watched = False
+        self._db_stale = False
+        self.mode = "inotify" if self._inotify else "polling"
+    
+    def projects(self) -> List[Tuple[str, str]]:
+        """Return (project_name, category) pairs, sorted by project name."""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(
+                    ((name, category) for category, names in self._categories.items() for name in names),
+                    key=lambda x: x[0]
+                )
+            return self._sorted
+    
+    def catalog(self) -> ProjectCatalog:
+        """Return the projects as a ProjectCatalog, reused until the list changes."""
+        pairs = self.projects()
+        with self._lock:
+            # Built from this exact list (projects() returns a new one after changes)
+            if self._catalog is None or self._catalog_pairs is not pairs:
+                self._catalog = ProjectCatalog.from_pairs(self.root, pairs)
+                self._catalog_pairs = pairs
+                # Long-lived, so worth indexing (see fuzzy_match_project)
+                self._catalog.fields().acronym_index()
+                if len(pairs) >= TRIGRAM_MIN_PROJECTS:
+                    self._catalog.trigram_index()
+                    self._catalog.fields().typo_index()
+            return self._catalog
+    
+    def _watch(self, path: Path, category: Optional[str]) -> None:
+        mask = self._ROOT_WATCH_MASK if category is None else self._WATCH_MASK
+        try:
+            self._watches[self._inotify.add_watch(path, mask)] = category
+        except OSError:
+            # Unreadable or vanished directory; the next rescan picks it up
+            pass
+    
+    def rescan(self) -> None:
+        """Rebuild the in-memory list (and the inotify watches) from scratch."""
+        if self._inotify:
+            for wd in list(self._watches):
+                self._inotify.rm_watch(wd)
+            self._watches.clear()
+            self._watch(self.root, None)
+            self._root_watched = None in self._watches.values()
+        
+        categories: Dict[str, set] = {}
+        if self.root.exists():
+            for category in _list_subdirs(self.root):
+                categories[category] = set()
+                if self._inotify:
+                    self._watch(self.root / category, category)
+        for name, category in _scan_projects().pairs():
+            categories.setdefault(category, set()).add(name)
+        
+        with self._lock:
+            self._categories = categories
+            self._sorted = None
+    
+    def _apply_event(self, wd: int, mask: int, name: str) -> None:
+        """Update the in-memory list for one inotify event."""
+        if mask & _Inotify.IN_Q_OVERFLOW:
+            self.rescan()
+            return
+        if wd not in self._watches:
+            return
+        category = self._watches[wd]
+        if mask & _Inotify.IN_IGNORED:
+            del self._watches[wd]
+            return
+        if category is None and mask & _Inotify.SELF_GONE:
+            # The projects directory itself went away; poll until it is back
+            self._root_watched = False
+            return
+        if not name or name.startswith('.'):
+            return
+        
+        if category is None:
+            # A category directory was added or removed
+            if mask & _Inotify.ADDED and (self.root / name).is_dir():
+                self._watch(self.root / name, name)
+                names = set(_list_subdirs(self.root / name))
+                with self._lock:
+                    self._categories[name] = names
+                    self._sorted = None
+                    self._db_stale = True
+            elif mask & _Inotify.REMOVED:
+                for category_wd, watched in list(self._watches.items()):
+                    if watched == name:
+                        self._inotify.rm_watch(category_wd)
+                with self._lock:
+                    self._categories.pop(name, None)
+                    self._sorted = None
+                    self._db_stale = True
+        else:
+            # A project was added to or removed from a category
+            with self._lock:
+                names = self._categories.setdefault(category, set())
+                if mask & _Inotify.ADDED and (self.root / category / name).is_dir():
+                    names.add(name)
+                elif mask & _Inotify.REMOVED:
+                    names.discard(name)
+                self._sorted = None
+                self._db_stale = True
+    
+    def index_text(self) -> bool:
+        """
+        Bring the project database up to date after changes (which inotify
+        events alone don't do) and index project text for a while.
+        Returns whether projects are left to index.
+        """
+        if not project_db_enabled():
+            return False
+        if self._db_stale:
+            self._db_stale = False
+            # Only categories whose mtime changed are listed and synced
+            _scan_projects()
+        return index_project_text()
+    
+    def run(self, stop: threading.Event) -> None:
+        """Process filesystem changes until stop is set."""
+        needs_rescan = False
+        while not stop.is_set():
+            try:
+                if needs_rescan:
+                    needs_rescan = False
+                    self.rescan()
+                # Keep indexing between events while text is left
+                timeout = 0 if self.index_text() else DAEMON_POLL_INTERVAL
+                if self._inotify and self._root_watched:
+                    for wd, mask, name in self._inotify.read_events(timeout=timeout):
+                        self._apply_event(wd, mask, name)
+                else:
+                    stop.wait(DAEMON_POLL_INTERVAL)
+                    self.rescan()
+            except Exception as e:
+                # A directory that vanished or turned unreadable mid-update (or
+                # a database error) must not end the updates: start over from
+                # a fresh scan, pausing in case the error persists
+                typer.echo(f"⚠️  Warning: project watcher error, rescanning: {e}", err=True)
+                needs_rescan = True
+                stop.wait(DAEMON_POLL_INTERVAL)
+    
+    def close(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+
+
+# Watcher of the daemon running in this process, if any
+_ACTIVE_WATCHER: Optional[ProjectWatcher] = None
+
+
+def _run_command_in_process(argv: List[str]) -> Dict[str, Any]:
+    """Run the CLI in this process with captured output (for ai_client.py)."""
+    import contextlib
+    import io
+    
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            # Standalone mode prints usage errors and always ends in SystemExit
+            app(argv, prog_name="ai")
+            exit_code = 0
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return {"ok": True, "stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+
+class _CommandForker:
+    """
+    Helper process the daemon forks its command runners from (see run()).
+    It is started before the daemon starts any thread and stays single
+    threaded, so a runner never inherits a lock some other thread held at
+    fork time; runners get the projects from the daemon like any client.
+    """
+    
+    def __init__(self):
+        import socket
+        
+        control, helper_end = socket.socketpair()
+        self.pid = os.fork()
+        if self.pid == 0:
+            control.close()
+            self._serve(helper_end)
+        helper_end.close()
+        self._control = control
+        self._lock = threading.Lock()
+    
+    def run(self, argv: List[str], cwd: Optional[str], env: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Run the CLI in a fresh runner, in the client's working directory and
+        environment (if given). The runner starts out with the modules
+        already loaded and never changes the daemon's own cwd, environment
+        or output, so the commands of several clients run side by side (one
+        waiting on an editor blocks no other).
+        """
+        import array
+        import socket
+        
+        conn, runner_end = socket.socketpair()
+        with conn:
+            try:
+                with self._lock:
+                    self._control.sendmsg([b"r"], [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                                                     array.array("i", [runner_end.fileno()]))])
+            finally:
+                runner_end.close()
+            conn.sendall(json.dumps({"argv": argv, "cwd": cwd, "env": env}).encode() + b"\n")
+            conn.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        try:
+            return json.loads(b"".join(chunks))
+        except ValueError:
+            return {"ok": False, "error": "the command died without replying"}
+    
+    @staticmethod
+    def _serve(control) -> None:
+        """Fork a runner for each connection sent over control, until the daemon closes it."""
+        import array
+        import signal
+        import socket
+        
+        # Runners are never waited for, and Ctrl-C is the daemon's to handle
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            while True:
+                fds = array.array("i")
+                message, ancdata, _, _ = control.recvmsg(1, socket.CMSG_LEN(fds.itemsize))
+                if not message:
+                    break
+                for _, _, data in ancdata:
+                    fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+                for fd in fds:
+                    if os.fork() == 0:
+                        control.close()
+                        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                        signal.signal(signal.SIGINT, signal.default_int_handler)
+                        _run_forked_command(fd)
+                    os.close(fd)
+        finally:
+            os._exit(0)
+    
+    def close(self) -> None:
+        self._control.close()
+        os.waitpid(self.pid, 0)
+
+
+def _run_forked_command(conn_fd: int) -> None:
+    """Body of a _CommandForker runner: reads one request from conn_fd, runs it, replies and exits."""
+    import socket
+    
+    try:
+        with socket.socket(fileno=conn_fd) as conn, conn.makefile('rb') as requests:
+            request = json.loads(requests.readline())
+            cwd, env = request["cwd"], request["env"]
+            try:
+                if cwd is not None:
+                    os.chdir(cwd)
+                if env is not None:
+                    os.environ.clear()
+                    os.environ.update(env)
+                reply = _run_command_in_process(request["argv"])
+            except OSError as e:
+                reply = {"ok": False, "error": f"cannot run in {cwd}: {e}"}
+            conn.sendall(json.dumps(reply).encode())
+    finally:
+        os._exit(0)
+
+
+def _daemon_match(watcher: ProjectWatcher, query: str, frecency: Dict[str, float],
+                  deadline_ms: Optional[float]) -> Dict[str, Any]:
+    """Match query against the watcher's catalog (see best_project_match) for _match_in_daemon."""
+    projects = watcher.catalog()
+    deadline = Deadline(deadline_ms) if deadline_ms is not None else None
+    pool: List[Tuple[str, float, Path]] = []
+    top_paths: List[Path] = []
+    path, name, score, top_5, exact = best_project_match(query, projects, frecency=frecency, deadline=deadline,
+                                                         pool=pool, top_paths=top_paths)
+    return {"ok": True, "project_count": len(projects), "path": str(path) if path else None, "name": name,
+            "score": score, "top_5": top_5, "top_paths": [str(p) for p in top_paths],
+            "pool": [[n, s, str(p)] for n, s, p in pool], "exact": exact,
+            "exhausted": bool(deadline and deadline.exhausted)}
+
+
+def _handle_daemon_request(watcher: ProjectWatcher, request: Dict[str, Any],
+                           forker: Optional[_CommandForker] = None) -> Dict[str, Any]:
+    """Answer one daemon request."""
+    op = request.get("op")
+    if op == "ping":
+        return {"ok": True, "root": str(watcher.root)}
+    if op == "projects":
+        if request.get("root") != str(watcher.root):
+            return {"ok": False, "error": "daemon watches a different projects directory"}
+        return {"ok": True, "projects": watcher.projects()}
+    if op == "match":
+        if request.get("root") != str(watcher.root):
+            return {"ok": False, "error": "daemon watches a different projects directory"}
+        query = request.get("query")
+        frecency = request.get("frecency", {})
+        deadline_ms = request.get("deadline_ms")
+        if not isinstance(query, str) or not isinstance(frecency, dict):
+            return {"ok": False, "error": "match expects a query string and a frecency map"}
+        if deadline_ms is not None and not isinstance(deadline_ms, (int, float)):
+            return {"ok": False, "error": "match expects deadline_ms to be a number"}
+        return _daemon_match(watcher, query, frecency, deadline_ms)
+    if op == "run":
+        argv = request.get("argv")
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            return {"ok": False, "error": "run expects an argv list"}
+        cwd = request.get("cwd")
+        env = request.get("env")
+        if cwd is not None and not isinstance(cwd, str):
+            return {"ok": False, "error": "run expects cwd to be a string"}
+        if env is not None and not (isinstance(env, dict) and
+                                    all(isinstance(v, str) for v in env.values())):
+            return {"ok": False, "error": "run expects env to map names to strings"}
+        if forker is None:
+            return {"ok": False, "error": "this daemon does not run commands"}
+        return forker.run(argv, cwd, env)
+    return {"ok": False, "error": f"unknown request: {op}"}
+
+
+def _make_daemon_server(socket_path: Path, watcher: ProjectWatcher,
+                        forker: Optional[_CommandForker] = None):
+    """Create the threaded Unix socket server answering daemon requests."""
+    import socketserver
+    
+    class DaemonRequestHandler(socketserver.StreamRequestHandler):
+        """Reads one JSON request line per connection and writes one JSON reply."""
+        
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+                reply = _handle_daemon_request(watcher, request, forker)
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+    
+    class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+    
+    return DaemonServer(str(socket_path), DaemonRequestHandler)
+
+
+def _preload_modules() -> None:
+    """Import the modules commands need up front, so the daemon answers its first request fast."""
+    # What _run_command_in_process imports lazily, then the matcher
+    import contextlib
+    import io
+    import rapidfuzz.fuzz
+    import rapidfuzz.process
+
+
+def run_daemon() -> None:
+    """
+    Watch PROJECTS_DIR and serve requests over a Unix socket until interrupted.
+    Besides the project list, the daemon runs whole commands sent by
+    ai_client.py (each in a forked child, in the client's working directory
+    and environment), so typer, rapidfuzz and the project list stay loaded.
+    The children are forked from a _CommandForker started before any thread.
+    """
+    global _ACTIVE_WATCHER
+    socket_path = get_daemon_socket_path()
+    socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    if socket_path.exists():
+        try:
+            _daemon_request({"op": "ping"})
+            typer.echo(f"❌ Error: A daemon is already listening on {socket_path}", err=True)
+            raise typer.Exit(1)
+        except (OSError, ValueError):
+            # Stale socket left behind by a daemon that did not shut down cleanly
+            socket_path.unlink()
+    
+    _preload_modules()
+    forker = _CommandForker()
+    watcher = ProjectWatcher()
+    watcher.rescan()
+    _ACTIVE_WATCHER = watcher
+    server = _make_daemon_server(socket_path, watcher, forker)
+    os.chmod(socket_path, 0o600)
+    stop = threading.Event()
+    threading.Thread(target=watcher.run, args=(stop,), daemon=True).start()
+    
+    typer.echo(f"✅ Watching {PROJECTS_DIR} ({watcher.mode}): {len(watcher.projects())} projects")
+    typer.echo(f"✅ Listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        typer.echo("\n✅ Daemon stopped")
+    finally:
+        stop.set()
+        _ACTIVE_WATCHER = None
+        server.server_close()
+        watcher.close()
+        forker.close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+
+
+class StageTimer:
+    """
+    Records monotonic start/end times of the stages of one invocation.
+    Stages are opened with `with timer.stage("scan"):`; annotate() attaches
+    facts such as the flow taken or the chosen match.
+    """
+    
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages: List[Tuple[str, float, float]] = []
+        self.info: Dict[str, Any] = {}
+    
+    class _Stage:
+        def __init__(self, timer: "StageTimer", name: str):
+            self.timer = timer
+            self.name = name
+        
+        def __enter__(self):
+            self.start = time.perf_counter()
+            return self
+        
+        def __exit__(self, *exc_info):
+            self.timer.record(self.name, self.start, time.perf_counter())
+            return False
+    
+    def stage(self, name: str) -> "StageTimer._Stage":
+        return self._Stage(self, name)
+    
+    def record(self, name: str, start: float, end: float) -> None:
+        self.stages.append((name, start, end))
+    
+    def annotate(self, **info: Any) -> None:
+        self.info.update(info)
+    
+    def durations_ms(self) -> Dict[str, float]:
+        """Return {stage: milliseconds}, summing repeated stages."""
+        durations: Dict[str, float] = {}
+        for name, start, end in self.stages:
+            durations[name] = durations.get(name, 0.0) + (end - start) * 1000
+        return durations
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Return the trace as {"stages": [...], "total_ms": ..., "info": {...}}."""
+        first = min([self.origin] + [start for _, start, _ in self.stages])
+        last = max([time.perf_counter()] + [end for _, _, end in self.stages])
+        return {
+            "stages": [
+                {"name": name, "start_ms": (start - first) * 1000, "duration_ms": (end - start) * 1000}
+                for name, start, end in self.stages
+            ],
+            "total_ms": (last - first) * 1000,
+            "info": self.info,
+        }
+    
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Return the trace in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        first = min([self.origin] + [start for _, start, _ in self.stages])
+        events = [
+            {"name": name, "cat": "ai", "ph": "X", "pid": os.getpid(), "tid": 0,
+             "ts": (start - first) * 1e6, "dur": (end - start) * 1e6}
+            for name, start, end in self.stages
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.info}
+
+
+# Set once the first invocation of this process has recorded the import stage
+_imports_recorded = False
+
+
+def write_profile(timer: StageTimer, trace_format: str, output: Optional[Path]) -> None:
+    """Write the stage trace as JSON (or Chrome trace events) to output, or stderr."""
+    trace = timer.to_chrome_trace() if trace_format == "chrome" else timer.to_json()
+    text = json.dumps(trace, indent=2)
+    if output:
+        try:
+            output.write_text(text + "\n")
+        except OSError as e:
+            typer.echo(f"⚠️  Warning: Could not write profile to {output}: {e}", err=True)
+    else:
+        typer.echo(text, err=True)
+
+
+def metrics_enabled() -> bool:
+    return os.environ.get("AI_CLI_METRICS", "1") != "0"
+
+
+def record_metrics(timer: StageTimer, exit_code: int) -> None:
+    """
+    Append one compact record of this invocation to the metrics log, rotating
+    it when it gets too large. Best-effort, like the other state files.
+    """
+    path = get_state_dir() / METRICS_FILENAME
+    trace = timer.to_json()
+    record = {
+        "ts": round(time.time(), 3),
+        "flow": timer.info.get("flow"),
+        "exit": exit_code,
+        "total_ms": round(trace["total_ms"], 3),
+        "stages": {name: round(ms, 3) for name, ms in timer.durations_ms().items()},
+    }
+    for key in ("project_count", "filtered_count", "cached", "match", "score", "text_match"):
+        if key in timer.info:
+            record[key] = timer.info[key]
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size > METRICS_MAX_BYTES:
+            os.replace(path, path.with_name(path.name + ".1"))
+        with open(path, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + "\n")
+    except OSError:
+        pass
+
+
+def load_metrics() -> List[Dict[str, Any]]:
+    """Return the logged records, oldest first, skipping unreadable lines."""
+    path = get_state_dir() / METRICS_FILENAME
+    records = []
+    for log_path in (path.with_name(path.name + ".1"), path):
+        try:
+            with open(log_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and isinstance(record.get("stages"), dict):
+                        records.append(record)
+        except OSError:
+            continue
+    return records
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Return the p-th percentile of sorted_values, interpolating linearly."""
+    if not sorted_values:
+        raise ValueError("percentile of an empty list")
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _project_count_bucket(count: int) -> str:
+    """Bucket project counts by order of magnitude: '<10', '<100', ..."""
+    bound = 10
+    while count >= bound:
+        bound *= 10
+    return f"<{bound:,}"
+
+
+def compute_stats(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Compute latency percentiles from metrics records.
+    Returns: {group: {stage: {"count": n, "p50": ms, "p95": ms, "p99": ms}}}
+    Groups are "all", "flow:<flow>" and, for the open flow,
+    "projects:<bucket>" so scan and match costs can be compared as the tree grows.
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for record in records:
+        groups = ["all"]
+        if record.get("flow"):
+            groups.append(f"flow:{record['flow']}")
+        if record.get("flow") == "open" and isinstance(record.get("project_count"), int):
+            groups.append(f"projects:{_project_count_bucket(record['project_count'])}")
+        timings = dict(record["stages"])
+        if isinstance(record.get("total_ms"), (int, float)):
+            timings["total"] = record["total_ms"]
+        for group in groups:
+            for stage, ms in timings.items():
+                if isinstance(ms, (int, float)):
+                    samples.setdefault(group, {}).setdefault(stage, []).append(ms)
+    
+    stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for group, stages in samples.items():
+        for stage, values in stages.items():
+            values.sort()
+            summary: Dict[str, float] = {"count": len(values)}
+            for p in STATS_PERCENTILES:
+                summary[f"p{p}"] = percentile(values, p)
+            stats.setdefault(group, {})[stage] = summary
+    return stats
+
+
+def show_stats() -> None:
+    """Print per-flow and per-stage latency percentiles from the metrics log."""
+    records = load_metrics()
+    if not records:
+        typer.echo(f"No metrics recorded yet in {get_state_dir() / METRICS_FILENAME}")
+        return
+    stats = compute_stats(records)
+    header = "".join(f"{f'p{p}':>10}" for p in STATS_PERCENTILES)
+    typer.echo(f"📊 {len(records)} invocations")
+    for group in sorted(stats, key=lambda g: (g != "all", g)):
+        typer.echo(f"\n{group}")
+        typer.echo(f"   {'stage':<14}{'count':>7}{header}")
+        # Stages in the order they were first seen, total last
+        stages = sorted(stats[group], key=lambda stage: stage == "total")
+        for stage in stages:
+            summary = stats[group][stage]
+            values = "".join(f"{summary[f'p{p}']:>8.1f}ms" for p in STATS_PERCENTILES)
+            typer.echo(f"   {stage:<14}{int(summary['count']):>7}{values}")
+
+
+def manage_aliases(command: str) -> bool:
+    """
+    Handle alias management commands. Returns False if command is not one.
+    - alias NAME PATH-OR-QUERY: point NAME at a directory or the project QUERY matches
+    - unalias NAME: remove an alias
+    - aliases: list aliases
+    """
+    words = command.split()
+    if not words or words[0].lower() not in ("alias", "unalias", "aliases"):
+        return False
+    verb = words[0].lower()
+    shortcuts = load_shortcuts()
+    aliases = shortcuts["aliases"]
+    
+    if verb == "aliases":
+        if not aliases:
+            typer.echo("No aliases defined. Add one with: ai \"alias NAME PROJECT\"")
+        for name, target in sorted(aliases.items()):
+            typer.echo(f"   {name} → {target}")
+        return True
+    
+    if len(words) < 2 or (verb == "alias" and len(words) < 3):
+        typer.echo(f"❌ Usage: ai \"alias NAME PROJECT\" or ai \"unalias NAME\"", err=True)
+        raise typer.Exit(1)
+    name = words[1].lower()
+    
+    if verb == "unalias":
+        if aliases.pop(name, None) is None:
+            typer.echo(f"❌ No alias named '{name}'", err=True)
+            raise typer.Exit(1)
+        save_shortcuts(shortcuts)
+        typer.echo(f"✅ Removed alias '{name}'")
+        return True
+    
+    if name == LAST_PROJECT_ALIAS or extract_keywords(name) != [name]:
+        typer.echo(f"❌ Error: '{name}' can't be used as an alias name", err=True)
+        raise typer.Exit(1)
+    target_text = ' '.join(words[2:])
+    target = Path(target_text).expanduser()
+    if not target.is_dir():
+        # Not a directory: treat the rest of the command as a project query
+        best_match_path, best_match_name, score, _ = fuzzy_match_project(target_text, get_existing_projects())
+        if not best_match_path or score < CONFIDENCE_THRESHOLD:
+            typer.echo(f"❌ Error: No directory or project matches '{target_text}'", err=True)
+            raise typer.Exit(1)
+        target = best_match_path
+    aliases[name] = str(target.resolve())
+    save_shortcuts(shortcuts)
+    typer.echo(f"✅ Alias '{name}' → {aliases[name]}")
+    return True
+
+
 @app.command()
 def main(
-    command: str = typer.Argument(..., help="Natural language command to open or create a project")
+    command: Optional[str] = typer.Argument(
+        None, help="Natural language command to open or create a project (with --batch: a query file)"
+    ),
+    batch: bool = typer.Option(
+        False, "--batch", help="Match queries read from stdin or a file, one per line, printing JSON lines"
+    ),
+    deadline_ms: Optional[float] = typer.Option(
+        None, "--deadline-ms", help="Open the best match found within this many milliseconds"
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Print a JSON timing trace of each stage (or set AI_CLI_PROFILE=1)"
+    ),
+    profile_format: str = typer.Option(
+        "json", "--profile-format", help="Trace format: json, or chrome for chrome://tracing"
+    ),
+    profile_output: Optional[Path] = typer.Option(
+        None, "--profile-output", help="Write the trace to this file instead of stderr"
+    ),
 ):
     """
     AI CLI - Open or create projects in Cursor using natural language.
@@ -314,11 +3283,185 @@ def main(
     Examples:
     - ai "open local ai"
     - ai "create a project called voice-audit and open it"
+    - ai "open last"   (reopen the last project)
+    - ai "alias dash work dashboard"   (then: ai dash)
+    - ai daemon   (keep the project list in memory for faster lookups)
+    - ai --profile "open local ai"   (show where the time goes)
+    - ai --deadline-ms 50 "open local ai"   (best match within 50 ms on huge trees)
+    - ai "open api cat:work lang:go recent:7d dirty:yes"   (narrow with filters)
+    - ai stats   (latency percentiles of past invocations)
+    - ai --batch queries.jsonl   (or queries on stdin; prints one JSON match per line)
+    """
+    global _imports_recorded
+    timer = StageTimer()
+    deadline = Deadline(deadline_ms) if deadline_ms is not None else None
+    if not _imports_recorded:
+        # Module imports, then typer parsing the command line
+        timer.record("imports", _IMPORT_START, _IMPORT_END)
+        timer.record("cli", _IMPORT_END, timer.origin)
+        _imports_recorded = True
+    
+    env_profile = os.environ.get("AI_CLI_PROFILE", "")
+    if env_profile == "0":
+        env_profile = ""
+    exit_code = 0
+    try:
+        if batch:
+            run_batch(command, timer)
+        elif command is None:
+            typer.echo("❌ Error: Missing command. Try: ai \"open local ai\"", err=True)
+            raise typer.Exit(1)
+        else:
+            run_command(command, timer, deadline)
+    except typer.Exit as e:
+        exit_code = e.exit_code
+        raise
+    finally:
+        # Only project lookups (open, create, shortcut, batch) are recorded
+        if timer.info.get("flow") and metrics_enabled():
+            record_metrics(timer, exit_code)
+        if profile or env_profile:
+            trace_format = "chrome" if env_profile == "chrome" else profile_format
+            output = profile_output or (Path(os.environ["AI_CLI_PROFILE_OUTPUT"])
+                                        if os.environ.get("AI_CLI_PROFILE_OUTPUT") else None)
+            write_profile(timer, trace_format, output)
+
+
+def read_batch_queries(lines: Iterator[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse batch input: each non-blank line is a query, either plain text, a
+    JSON string or a JSON object with a "query" key (other keys, such as an
+    "id", are echoed back in the result).
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        item: Any = line
+        if line[0] in '{"':
+            try:
+                item = json.loads(line)
+            except ValueError:
+                pass
+        if isinstance(item, dict):
+            if not isinstance(item.get("query"), str):
+                yield {**item, "query": None, "error": "missing \"query\""}
+                continue
+            yield item
+        else:
+            yield {"query": str(item)}
+
+
+def run_batch(source: Optional[str], timer: StageTimer) -> None:
+    """
+    Match every query from source (a file, or stdin if None or "-") against
+    one scan of the projects, streaming one JSON result per line to stdout.
+    """
+    timer.annotate(flow="batch")
+    try:
+        stream = sys.stdin if source in (None, "-") else open(source)
+    except OSError as e:
+        typer.echo(f"❌ Error: Cannot read queries: {e}", err=True)
+        raise typer.Exit(1)
+    
+    with stream:
+        items = list(read_batch_queries(stream))
+    
+    try:
+        with timer.stage("scan"):
+            projects = get_existing_projects()
+    except Exception as e:
+        typer.echo(f"❌ Error getting projects list: {e}", err=True)
+        raise typer.Exit(1)
+    timer.annotate(project_count=len(projects), queries=len(items))
+    
+    queries = [item["query"] or "" for item in items]
+    with timer.stage("match"):
+        matches = batch_match_projects(queries, projects, frecency=frecency_scores())
+        for item, (path, name, score, top_5) in zip(items, matches):
+            result = dict(item)
+            if "error" not in item:
+                result.update({
+                    "match": name,
+                    "path": str(path) if path else None,
+                    "score": score,
+                    "confident": bool(path) and score >= CONFIDENCE_THRESHOLD,
+                    "candidates": [{"name": n, "score": s} for n, s in top_5],
+                })
+            typer.echo(json.dumps(result))
+
+
+def show_filtered(projects: Sequence, accept: Optional[Callable[[List[int]], List[bool]]], timer: StageTimer) -> None:
+    """Handle a query made only of filters: open the one project left, or list them."""
+    with timer.stage("match"):
+        matches, complete = rank_filtered(projects, accept, frecency_scores())
+    if len(matches) == 1 and complete:
+        name, path = matches[0]
+        timer.annotate(match=name)
+        typer.echo(f"✅ Opening project '{name}' (the only one matching the filters)")
+        with timer.stage("open"):
+            opened = open_in_cursor(path, detach=editor_launch_detached())
+        if not opened:
+            raise typer.Exit(1)
+        record_project_open(path)
+        set_last_project(path)
+        typer.echo(f"✅ Opened '{name}' in Cursor")
+        return
+    if not matches:
+        typer.echo("❌ No projects match the filters", err=True)
+        raise typer.Exit(1)
+    typer.echo("🔎 Projects matching the filters (most used first):")
+    for i, (name, path) in enumerate(matches, 1):
+        typer.echo(f"   {i}. {name} ({path.parent.name})")
+    if not complete:
+        typer.echo("   ...")
+    typer.echo("\n💡 Add part of a name to pick one.")
+
+
+def run_command(command: str, timer: StageTimer, deadline: Optional[Deadline] = None) -> None:
+    """
+    Run one natural language command, recording its stages in timer.
+    With a deadline, the open flow settles for the best match found in time.
     """
     try:
+        if command.strip().lower() == "daemon":
+            run_daemon()
+            return
+        
+        if command.strip().lower() == "stats":
+            show_stats()
+            return
+        
+        if manage_aliases(command):
+            return
+        
+        # Filters (cat:work, lang:go, ...) are split off the text
+        try:
+            text, filters = parse_query(command)
+        except ValueError as e:
+            typer.echo(f"❌ Error: {e}", err=True)
+            raise typer.Exit(1)
+        
+        # Fast path: aliases and "last" never touch the projects tree
+        with timer.stage("shortcut"):
+            shortcut = None if filters or detect_create_intent(command) else resolve_shortcut(command)
+        if shortcut:
+            shortcut_name, shortcut_path = shortcut
+            timer.annotate(flow="shortcut", match=shortcut_name)
+            typer.echo(f"✅ Opening project '{shortcut_path.name}' (shortcut: {shortcut_name})")
+            with timer.stage("open"):
+                opened = open_in_cursor(shortcut_path, detach=editor_launch_detached())
+            if not opened:
+                raise typer.Exit(1)
+            record_project_open(shortcut_path)
+            set_last_project(shortcut_path)
+            typer.echo(f"✅ Opened '{shortcut_path.name}' in Cursor")
+            return
+        
         # Ensure projects directory exists
         try:
-            PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
+            with timer.stage("mkdir"):
+                PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
         except (OSError, PermissionError) as e:
             typer.echo(f"❌ Error: Cannot access or create projects directory: {e}", err=True)
             typer.echo(f"   Path: {PROJECTS_DIR}", err=True)
@@ -326,15 +3469,23 @@ def main(
         
         # Detect intent
         try:
-            is_create = detect_create_intent(command)
+            with timer.stage("intent"):
+                is_create = detect_create_intent(text)
         except Exception as e:
             typer.echo(f"❌ Error detecting intent: {e}", err=True)
             raise typer.Exit(1)
         
         if is_create:
             # Create project flow
+            timer.annotate(flow="create")
+            if filters:
+                # They would otherwise end up in the name ("foo-cat-work")
+                typer.echo("❌ Error: Filters like cat: only apply when opening projects.", err=True)
+                typer.echo(f"   Command: {command}", err=True)
+                raise typer.Exit(1)
             try:
-                project_name = extract_project_name(command)
+                with timer.stage("extract_name"):
+                    project_name = extract_project_name(text)
             except Exception as e:
                 typer.echo(f"❌ Error extracting project name: {e}", err=True)
                 raise typer.Exit(1)
@@ -344,6 +3495,7 @@ def main(
                 typer.echo(f"   Command: {command}", err=True)
                 raise typer.Exit(1)
             
+            timer.annotate(match=project_name)
             project_root = PROJECTS_DIR / CREATE_CATEGORY
             project_path = project_root / project_name
             
@@ -352,48 +3504,163 @@ def main(
             else:
                 typer.echo(f"✅ Creating project '{project_name}'...")
                 try:
-                    project_path = create_project(project_name, base_dir=PROJECTS_DIR)
+                    with timer.stage("create"):
+                        project_path = create_project(project_name, base_dir=PROJECTS_DIR)
                     typer.echo(f"✅ Project created at {project_path}")
                 except Exception as e:
                     typer.echo(f"❌ Failed to create project: {e}", err=True)
                     raise typer.Exit(1)
             
             typer.echo(f"✅ Opening project in Cursor...")
-            if not open_in_cursor(project_path):
+            with timer.stage("open"):
+                opened = open_in_cursor(project_path, detach=editor_launch_detached())
+            if not opened:
                 raise typer.Exit(1)
+            record_project_open(project_path)
+            set_last_project(project_path)
             typer.echo(f"✅ Opened '{project_name}' in Cursor")
         
         else:
             # Open existing project flow
-            try:
-                projects = get_existing_projects()
-            except Exception as e:
-                typer.echo(f"❌ Error getting projects list: {e}", err=True)
-                raise typer.Exit(1)
+            timer.annotate(flow="open")
             
-            if not projects:
-                typer.echo(f"❌ No projects found in {PROJECTS_DIR}", err=True)
-                raise typer.Exit(1)
+            # A repeated query reuses its results while the project tree is unchanged
+            cache_key = ' '.join(extract_keywords(text))
+            version = None
+            cached = None
+            top_paths: List[Path] = []
+            if cache_key and not filters and query_cache_enabled():
+                with timer.stage("cache"):
+                    version = catalog_version()
+                    cached = load_cached_match(cache_key, version) if version else None
             
-            try:
-                best_match_path, best_match_name, score, top_5 = fuzzy_match_project(command, projects)
-            except Exception as e:
-                typer.echo(f"❌ Error during fuzzy matching: {e}", err=True)
-                raise typer.Exit(1)
+            if cached:
+                timer.annotate(cached=True)
+                best_match_path, best_match_name, score, top_5 = rank_cached_match(cached, frecency_scores(),
+                                                                                   top_paths)
+            else:
+                # A running daemon matches with the indexes it keeps; filters
+                # need the catalog here
+                remote = None
+                if not filters:
+                    with timer.stage("match"):
+                        remote = _match_in_daemon(text, frecency_scores(), deadline)
+                pool: List[Tuple[str, float, Path]] = []
+                if remote is not None:
+                    timer.annotate(project_count=remote["project_count"], daemon=True)
+                    if not remote["project_count"]:
+                        typer.echo(f"❌ No projects found in {PROJECTS_DIR}", err=True)
+                        raise typer.Exit(1)
+                    best_match_path = Path(remote["path"]) if remote["path"] else None
+                    best_match_name, score = remote["name"], remote["score"]
+                    top_5 = [(name, match_score) for name, match_score in remote["top_5"]]
+                    top_paths.extend(Path(path) for path in remote["top_paths"])
+                    pool = [(name, match_score, Path(path)) for name, match_score, path in remote["pool"]]
+                    if remote["exact"]:
+                        timer.annotate(exact=True)
+                    if deadline and remote["exhausted"]:
+                        deadline.cut_short()
+                else:
+                    try:
+                        # Stop scanning at a project named exactly as asked (unless
+                        # filters might rule it out)
+                        exact_key = exact_name_key(text)
+                        with timer.stage("scan"):
+                            projects = get_existing_projects(deadline=deadline,
+                                                             stop_at=None if filters else exact_key)
+                    except Exception as e:
+                        typer.echo(f"❌ Error getting projects list: {e}", err=True)
+                        raise typer.Exit(1)
+                    
+                    timer.annotate(project_count=len(projects))
+                    if not projects and deadline and deadline.exhausted:
+                        typer.echo(f"❌ Search incomplete: {deadline.budget_ms:g} ms deadline reached before "
+                                   f"any project in {PROJECTS_DIR} was found", err=True)
+                        raise typer.Exit(1)
+                    if not projects:
+                        typer.echo(f"❌ No projects found in {PROJECTS_DIR}", err=True)
+                        raise typer.Exit(1)
+                    
+                    # Query plan: cheap filters narrow the catalog before scoring;
+                    # per-project ones only check the best-ranked candidates
+                    accept = None
+                    if filters:
+                        with timer.stage("filter"):
+                            projects = prefilter_projects(projects, filters)
+                            accept = postfilter_accept(projects, filters)
+                        timer.annotate(filtered_count=len(projects))
+                        if not projects:
+                            typer.echo("❌ No projects match the filters", err=True)
+                            raise typer.Exit(1)
+                        if not extract_keywords(text):
+                            show_filtered(projects, accept, timer)
+                            return
+                    
+                    try:
+                        with timer.stage("match"):
+                            best_match_path, best_match_name, score, top_5, exact = best_project_match(
+                                text, projects, frecency=frecency_scores(), deadline=deadline, accept=accept,
+                                pool=pool, top_paths=top_paths
+                            )
+                        if exact:
+                            timer.annotate(exact=True)
+                    except Exception as e:
+                        typer.echo(f"❌ Error during fuzzy matching: {e}", err=True)
+                        raise typer.Exit(1)
+                
+                # Only complete results are worth keeping
+                if version and pool and not (deadline and deadline.exhausted):
+                    cache_match(cache_key, version, pool)
             
+            timer.annotate(match=best_match_name, score=score)
+            if deadline:
+                timer.annotate(complete=not deadline.exhausted)
+                if deadline.exhausted:
+                    typer.echo(f"⚠️  Warning: {deadline.budget_ms:g} ms deadline reached before all projects "
+                               f"were searched; showing the best match so far", err=True)
+            target = None
             if best_match_path and best_match_name and score >= CONFIDENCE_THRESHOLD:
                 typer.echo(f"✅ Opening project '{best_match_name}' (confidence: {score}%)")
-                if not open_in_cursor(best_match_path):
-                    raise typer.Exit(1)
-                typer.echo(f"✅ Opened '{best_match_name}' in Cursor")
+                target = (best_match_name, best_match_path)
             else:
-                typer.echo("🤔 Not confident about the match. Top matches:")
-                if top_5:
-                    for i, (name, match_score) in enumerate(top_5, 1):
-                        typer.echo(f"   {i}. {name} (confidence: {match_score}%)")
+                # Described rather than named ("the thing that parses invoices")?
+                with timer.stage("text"):
+                    mentions = search_project_text(text, limit=FILTER_POOL if filters else 5)
+                    if filters:
+                        mentions = filter_text_matches(mentions, projects, accept)
+                    text_match = clear_text_match(mentions)
+                if text_match:
+                    typer.echo(f"📄 Opening project '{text_match[0]}' (its name, README or manifest match best)")
+                    target = text_match[:2]
+                    timer.annotate(match=text_match[0], text_match=True)
                 else:
-                    typer.echo("   No matches found.")
-                typer.echo("\n💡 Try being more specific or use one of the suggestions above.")
+                    typer.echo("🤔 Not confident about the match. Top matches:")
+                    if top_5:
+                        # Only the listed candidates are worth asking git about
+                        git_infos: List[Optional[Dict[str, Any]]] = [None] * len(top_5)
+                        if git_info_enabled() and len(top_paths) == len(top_5):
+                            with timer.stage("git"):
+                                git_infos = collect_git_info(top_paths)
+                        for i, ((name, match_score), info) in enumerate(zip(top_5, git_infos), 1):
+                            details = f" [{format_git_info(info)}]" if info else ""
+                            typer.echo(f"   {i}. {name} (confidence: {match_score}%){details}")
+                    else:
+                        typer.echo("   No matches found.")
+                    if mentions:
+                        typer.echo("📄 Projects whose name, README or manifest mention it:")
+                        for name, path, _ in mentions:
+                            typer.echo(f"   - {name} ({path})")
+                    typer.echo("\n💡 Try being more specific or use one of the suggestions above.")
+            
+            if target:
+                target_name, target_path = target
+                with timer.stage("open"):
+                    opened = open_in_cursor(target_path, detach=editor_launch_detached())
+                if not opened:
+                    raise typer.Exit(1)
+                record_project_open(target_path)
+                set_last_project(target_path)
+                typer.echo(f"✅ Opened '{target_name}' in Cursor")
     
     except typer.Exit:
         raise
@@ -405,6 +3672,9 @@ def main(
         raise typer.Exit(1)
 
 
+# End of the "imports" stage of --profile
+_IMPORT_END = time.perf_counter()
+
+
 if __name__ == "__main__":
     app()
-
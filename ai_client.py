@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+AI CLI thin client - runs commands inside a running `ai daemon`.
+
+Only the standard library is imported, so a call costs a bare interpreter
+start instead of importing typer and rapidfuzz. When no daemon is listening
+it falls back to running ai.py directly; once a daemon took the command it
+never does, so a command can't run twice.
+"""
+
+import json
+import os
+import socket
+import sys
+
+# Must match DAEMON_SOCKET_NAME and get_daemon_socket_path() in ai.py
+SOCKET_NAME = "ai-cli.sock"
+
+# Commands run inside the daemon, which may wait on the editor launch
+TIMEOUT = 30.0
+
+# Arguments that must not run inside the daemon; --batch reads stdin, which
+# is not forwarded to it
+DIRECT_COMMANDS = {"daemon", "--batch"}
+
+
+def socket_path() -> str:
+    """Return the daemon socket path (see get_daemon_socket_path() in ai.py)."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "ai-cli", SOCKET_NAME)
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "ai-cli", SOCKET_NAME)
+
+
+class DaemonError(Exception):
+    """The daemon took the command but gave no usable reply."""
+
+
+def run_remote(argv):
+    """
+    Send argv to the daemon, which runs it in this process's working
+    directory and environment. Returns its reply, or None if no daemon is
+    listening. Raises DaemonError once the request was sent: the command
+    may have run already, so it must not be run again locally.
+    """
+    request = {"op": "run", "argv": argv, "env": dict(os.environ)}
+    try:
+        request["cwd"] = os.getcwd()
+    except OSError:
+        # Working directory deleted: relative paths can't work anyway
+        pass
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(TIMEOUT)
+        try:
+            sock.connect(socket_path())
+        except OSError:
+            return None
+        try:
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            reply = json.loads(b"".join(chunks))
+        except (OSError, ValueError) as e:
+            raise DaemonError(f"no reply ({e})")
+    if not reply.get("ok"):
+        raise DaemonError(reply.get("error", "unknown error"))
+    return reply
+
+
+def run_local(argv):
+    """Replace this process with ai.py."""
+    ai_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai.py")
+    os.execv(sys.executable, [sys.executable, ai_path, *argv])
+
+
+def main(argv) -> int:
+    if any(arg.strip().lower() in DIRECT_COMMANDS for arg in argv):
+        run_local(argv)
+    try:
+        reply = run_remote(argv)
+    except DaemonError as e:
+        sys.stderr.write(f"❌ Error: ai daemon: {e}\n")
+        return 1
+    if reply is None:
+        run_local(argv)
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["exit_code"]
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
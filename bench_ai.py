@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for AI CLI on synthetic project trees.
+
+Generates PROJECTS_DIR layouts of various sizes and category counts, times
+get_existing_projects() (cold and warm index), fuzzy_match_project(),
+batch_match_projects(), extract_project_name() and the full main() open and
+create flows with a stub editor, and writes the results as JSON so runs can
+be compared.
+
+Usage: python bench_ai.py [--sizes 10,1000,100000] [--categories 1,10,100]
+                          [--runs 5] [--output bench_results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import ai
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+DEFAULT_CATEGORY_COUNTS = [1, 10, 100]
+
+WORDS = ["local", "ai", "voice", "audit", "credit", "agent", "web", "dashboard", "api",
+         "server", "client", "game", "engine", "parser", "invoice", "blog", "todo",
+         "cli", "bot", "data", "pipeline", "ml", "model", "notes", "site", "app"]
+
+CREATE_COMMANDS = [
+    "create a project called voice-audit",
+    "start new project todo-app",
+    "make a project called My Test App and open it",
+]
+
+
+def synthetic_names(count: int, seed: int = 0) -> List[str]:
+    """Generate count unique, plausible project names."""
+    rng = random.Random(seed)
+    return [f"{'-'.join(rng.sample(WORDS, rng.randint(1, 3)))}-{i}" for i in range(count)]
+
+
+def build_tree(root: Path, names: List[str], categories: int) -> None:
+    """Create root/<category>/<name> directories, spreading names over categories."""
+    for c in range(categories):
+        (root / f"Category{c}").mkdir(parents=True)
+    for i, name in enumerate(names):
+        os.mkdir(root / f"Category{i % categories}" / name)
+    # Backdate mtimes so the project index trusts them, as on a real tree
+    past = time.time() - 3600
+    for path in [root, *root.iterdir()]:
+        os.utime(path, (past, past))
+
+
+def make_queries(names: List[str], seed: int = 0, count: int = 10) -> List[str]:
+    """Build open queries: exact names, names with a typo, and reordered words."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(names).rsplit("-", 1)[0].split("-")
+        if rng.random() < 0.5:
+            i = rng.randrange(len(words))
+            words[i] = words[i][:-1] or words[i]
+        rng.shuffle(words)
+        queries.append("open " + " ".join(words))
+    return queries
+
+
+def time_call(func: Callable[[], Any], runs: int) -> Dict[str, float]:
+    """Time func over runs calls; returns min/median/mean/max in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": runs,
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "max_ms": max(samples),
+    }
+
+
+def run_cli(command: str) -> None:
+    """Run the CLI in-process with its output discarded."""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        try:
+            ai.app([command], prog_name="ai")
+        except SystemExit:
+            pass
+
+
+def stub_editor(bin_dir: Path) -> None:
+    """Install a `cursor` command that exits immediately."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    cursor = bin_dir / "cursor"
+    cursor.write_text("#!/bin/sh\nexit 0\n")
+    cursor.chmod(0o755)
+
+
+def bench_layout(workdir: Path, size: int, categories: int, runs: int) -> List[Dict[str, Any]]:
+    """Build one synthetic tree and run every benchmark against it."""
+    root = workdir / f"projects-{size}-{categories}"
+    names = synthetic_names(size)
+    start = time.perf_counter()
+    build_tree(root, names, categories)
+    build_ms = (time.perf_counter() - start) * 1000
+    queries = make_queries(names)
+    index_path = ai.get_cache_dir() / ai.INDEX_FILENAME
+
+    def cold_scan():
+        index_path.unlink(missing_ok=True)
+        ai.get_existing_projects()
+
+    results = {}
+    previous_projects_dir = ai.PROJECTS_DIR
+    ai.PROJECTS_DIR = root
+    try:
+        results["get_existing_projects_cold"] = time_call(cold_scan, runs)
+        projects = ai.get_existing_projects()
+        results["get_existing_projects_warm"] = time_call(ai.get_existing_projects, runs)
+        results["fuzzy_match_project"] = time_call(
+            lambda: [ai.fuzzy_match_project(query, projects) for query in queries], runs
+        )
+        results["batch_match_projects"] = time_call(
+            lambda: list(ai.batch_match_projects(queries, projects)), runs
+        )
+        results["extract_project_name"] = time_call(
+            lambda: [ai.extract_project_name(command) for command in CREATE_COMMANDS], runs
+        )
+        results["main_open"] = time_call(lambda: run_cli(queries[0]), runs)
+        # A fresh name each run, or every run after the first finds it exists
+        created = itertools.count()
+        results["main_create"] = time_call(
+            lambda: run_cli(f"create a project called bench-create-{next(created)}"), runs
+        )
+    finally:
+        ai.PROJECTS_DIR = previous_projects_dir
+
+    return [
+        {"benchmark": name, "projects": size, "categories": categories, "tree_build_ms": build_ms, **timing}
+        for name, timing in results.items()
+    ]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmarks(sizes: List[int], category_counts: List[int], runs: int,
+                   workdir: Path) -> Dict[str, Any]:
+    """Run all benchmarks in an isolated environment; returns the results document."""
+    # Keep the index, state and daemon socket of the real user out of the way
+    for var in ("XDG_CACHE_HOME", "XDG_STATE_HOME", "XDG_RUNTIME_DIR"):
+        os.environ[var] = str(workdir / var.lower())
+    stub_editor(workdir / "bin")
+    os.environ["PATH"] = f"{workdir / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ["AI_CLI_LAUNCH"] = "wait"
+    # Time the lookups themselves, not query cache hits or metrics writes
+    os.environ["AI_CLI_QUERY_CACHE"] = "0"
+    os.environ["AI_CLI_METRICS"] = "0"
+
+    results = []
+    for size in sizes:
+        for categories in category_counts:
+            if categories > size:
+                continue
+            print(f"📊 {size} projects in {categories} categories...", file=sys.stderr)
+            results.extend(bench_layout(workdir, size, categories, runs))
+    return {
+        "timestamp": time.time(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(part.replace("_", "")) for part in text.split(",") if part]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=_int_list, default=DEFAULT_SIZES,
+                        help="Comma-separated project counts, e.g. 10,1000,100000,1000000")
+    parser.add_argument("--categories", type=_int_list, default=DEFAULT_CATEGORY_COUNTS,
+                        help="Comma-separated category counts")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"),
+                        help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ai-cli-bench-") as workdir:
+        document = run_benchmarks(args.sizes, args.categories, args.runs, Path(workdir))
+    args.output.write_text(json.dumps(document, indent=2))
+
+    for row in document["results"]:
+        print(f"{row['projects']:>9} {row['categories']:>5}  {row['benchmark']:<28} "
+              f"median {row['median_ms']:9.2f} ms")
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for AI CLI.
+
+Imports ai.py in fresh interpreters under `python -X importtime`, checks the
+cumulative import time against STARTUP_BUDGET_MS and checks that modules
+only some flows need are not imported at startup.
+
+Usage: python bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Budget for `import ai` (cumulative, best of several runs), in milliseconds.
+# Most of it is typer; ai.py itself should stay in the low milliseconds.
+STARTUP_BUDGET_MS = 150
+
+# Modules that must only be imported by the code paths that need them
+LAZY_MODULES = ["rapidfuzz", "numpy", "socket", "socketserver", "concurrent.futures", "sqlite3"]
+
+REPO_DIR = Path(__file__).resolve().parent
+
+
+def measure_imports(module: str = "ai", pycache_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    Import module in a fresh interpreter with -X importtime.
+    Returns: {imported_module: cumulative_microseconds}
+    """
+    env = dict(os.environ)
+    # Measure with bytecode caching as in normal use, outside the source tree
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPYCACHEPREFIX"] = pycache_dir or os.path.join(tempfile.gettempdir(), "ai-cli-bench-pycache")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        # Format: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def lazy_modules_imported(imports: Dict[str, int]) -> List[str]:
+    """Return the LAZY_MODULES (or their submodules) present in imports."""
+    return sorted(
+        name for name in imports
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+
+
+def startup_ms(runs: int = 5) -> float:
+    """Return the best cumulative `import ai` time over runs, in milliseconds."""
+    with tempfile.TemporaryDirectory() as pycache_dir:
+        # The first run writes bytecode; it is not counted
+        measure_imports(pycache_dir=pycache_dir)
+        return min(measure_imports(pycache_dir=pycache_dir)["ai"] for _ in range(runs)) / 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    args = parser.parse_args()
+
+    elapsed = startup_ms(args.runs)
+    eager = lazy_modules_imported(measure_imports())
+    print(f"import ai: {elapsed:.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    if eager:
+        print(f"imported at startup but should be lazy: {', '.join(eager)}")
+    return 0 if elapsed <= STARTUP_BUDGET_MS and not eager else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
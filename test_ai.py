@@ -3,16 +3,29 @@
 Tests for AI CLI
 """
 
+import json
+import os
+import random
+import sqlite3
 import subprocess
 import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Levenshtein
 from typer.testing import CliRunner
 
+import ai
+import ai_client
+import bench_ai
+import bench_startup
 from ai import (
     CONFIDENCE_THRESHOLD,
+    INDEX_FILENAME,
     extract_keywords,
     normalize_project_name,
     detect_create_intent,
@@ -21,6 +34,7 @@ from ai import (
     fuzzy_match_project,
     open_in_cursor,
     create_project,
+    get_cache_dir,
     app,
 )
 
@@ -32,6 +46,22 @@ def temp_projects_dir():
         yield Path(tmpdir)
 
 
+@pytest.fixture(autouse=True)
+def isolated_xdg_dirs(tmp_path, monkeypatch):
+    """Keep caches and state written by the CLI out of the real home directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+
+
+def age_tree(root, seconds=60):
+    """Backdate directory mtimes so the project index trusts them."""
+    past = ai.time.time() - seconds
+    for path in [root, *root.iterdir()]:
+        if path.is_dir():
+            os.utime(path, (past, past))
+
+
 @pytest.fixture
 def runner():
     """CLI test runner."""
@@ -191,6 +221,614 @@ class TestGetExistingProjects:
             assert path == category / "test-project"
 
 
+class TestProjectIndex:
+    """Tests for the persistent project index behind get_existing_projects."""
+    
+    def _make_tree(self, root):
+        for category, names in {"work": ["dashboard", "api"], "fun": ["game"]}.items():
+            for name in names:
+                (root / category / name).mkdir(parents=True)
+        age_tree(root)
+    
+    def test_index_written_to_cache_dir(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            self._make_tree(temp_projects_dir)
+            get_existing_projects()
+            index = json.loads((get_cache_dir() / INDEX_FILENAME).read_text())
+            assert index["root"] == str(temp_projects_dir)
+            assert sorted(index["categories"]["work"]["projects"]) == ["api", "dashboard"]
+            assert index["categories"]["work"]["mtime"] is not None
+    
+    def test_warm_call_skips_listing(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            self._make_tree(temp_projects_dir)
+            cold = get_existing_projects()
+            with patch('ai._list_subdirs') as mock_list:
+                warm = get_existing_projects()
+            mock_list.assert_not_called()
+            assert warm == cold
+    
+    def test_changed_category_is_relisted(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            self._make_tree(temp_projects_dir)
+            get_existing_projects()
+            (temp_projects_dir / "fun" / "puzzle").mkdir()
+            (temp_projects_dir / "work" / "api").rmdir()
+            names = [name for name, _ in get_existing_projects()]
+            assert names == ["dashboard", "game", "puzzle"]
+    
+    def test_new_category_is_found(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            self._make_tree(temp_projects_dir)
+            get_existing_projects()
+            (temp_projects_dir / "archive" / "old-site").mkdir(parents=True)
+            projects = get_existing_projects()
+            assert ("old-site", temp_projects_dir / "archive" / "old-site") in projects
+    
+    def test_corrupt_index_is_ignored(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            self._make_tree(temp_projects_dir)
+            index_path = get_cache_dir() / INDEX_FILENAME
+            index_path.parent.mkdir(parents=True)
+            index_path.write_text("{not json")
+            names = [name for name, _ in get_existing_projects()]
+            assert names == ["api", "dashboard", "game"]
+
+
+class TestScanner:
+    """Tests for the scandir-based category scanner."""
+    
+    def _make_tree(self, root, categories=8, per_category=5):
+        for c in range(categories):
+            for p in range(per_category):
+                (root / f"cat{c}" / f"proj-{c}-{p}").mkdir(parents=True)
+            (root / f"cat{c}" / "notes.txt").write_text("not a project")
+    
+    def test_files_are_skipped(self, temp_projects_dir):
+        (temp_projects_dir / "project").mkdir()
+        (temp_projects_dir / "file.txt").write_text("x")
+        (temp_projects_dir / ".hidden").mkdir()
+        assert ai._list_subdirs(temp_projects_dir) == ["project"]
+    
+    def test_symlinked_project_is_followed(self, temp_projects_dir):
+        (temp_projects_dir / "real").mkdir()
+        (temp_projects_dir / "link").symlink_to(temp_projects_dir / "real")
+        assert sorted(ai._list_subdirs(temp_projects_dir)) == ["link", "real"]
+    
+    @pytest.mark.parametrize("workers", ["1", "4"])
+    def test_worker_count_does_not_change_results(self, workers, temp_projects_dir, monkeypatch):
+        monkeypatch.setenv("AI_CLI_SCAN_WORKERS", workers)
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            self._make_tree(temp_projects_dir)
+            projects = get_existing_projects()
+            assert len(projects) == 40
+            assert ("proj-3-2", temp_projects_dir / "cat3" / "proj-3-2") in projects
+    
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_parallel_imap_keeps_order(self, workers):
+        def slow_square(x):
+            time.sleep(0.001 * (x % 3))
+            return x * x
+        assert list(ai._parallel_imap(slow_square, list(range(20)), workers)) == [x * x for x in range(20)]
+    
+    def test_parallel_imap_raises_and_stops(self):
+        calls = []
+        
+        def func(x):
+            calls.append(x)
+            time.sleep(0.005)
+            if x == 2:
+                raise ValueError(x)
+            return x
+        
+        with pytest.raises(ValueError):
+            list(ai._parallel_imap(func, list(range(100)), 2))
+        assert len(calls) < 100
+        calls.clear()
+        results = ai._parallel_imap(func, list(range(100)), 2)
+        assert next(results) == 0
+        results.close()
+        assert len(calls) < 100
+    
+    def test_stops_at_exact_name(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            self._make_tree(temp_projects_dir)
+            age_tree(temp_projects_dir)
+            listed = ai._list_subdirs(temp_projects_dir)
+            projects = get_existing_projects(stop_at="proj-2-1")
+            scanned = {category for _, category in projects.pairs()}
+            assert scanned == set(listed[:listed.index("cat2") + 1])
+            assert ai.find_exact_project("proj-2-1", projects) is not None
+            # Stopping early must not lose the other categories
+            assert len(get_existing_projects()) == 40
+            assert len(get_existing_projects(stop_at="missing")) == 40
+    
+    def test_exact_name_lookup(self):
+        assert ai.exact_name_key("open the Local AI project") == "local-ai"
+        projects = [("ai-local", None), ("Local_AI", None), ("local-ai", None)]
+        assert ai.find_exact_project("local-ai", projects) == 1
+        assert ai.find_exact_project("local", projects) is None
+        assert ai.find_exact_project("", projects) is None
+    
+    def test_invalid_worker_count_falls_back(self, monkeypatch):
+        monkeypatch.setenv("AI_CLI_SCAN_WORKERS", "lots")
+        assert ai.get_scan_workers() == ai.DEFAULT_SCAN_WORKERS
+        monkeypatch.setenv("AI_CLI_SCAN_WORKERS", "0")
+        assert ai.get_scan_workers() == 1
+
+
+class TestDeadline:
+    """Tests for deadline-bounded scanning and matching (--deadline-ms)."""
+    
+    def test_expiry(self):
+        assert not ai.Deadline(10_000).expired()
+        deadline = ai.Deadline(0)
+        assert deadline.expired()
+        assert not deadline.exhausted
+    
+    def test_scan_without_index_leaves_out_categories(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            (temp_projects_dir / "fun" / "game").mkdir(parents=True)
+            age_tree(temp_projects_dir)
+            deadline = ai.Deadline(0)
+            # The first category listed is always scanned
+            assert len(get_existing_projects(deadline=deadline)) == 1
+            assert deadline.exhausted
+            # The root is listed again next time, so nothing is lost
+            assert get_existing_projects().pairs() == [("dashboard", "work"), ("game", "fun")]
+    
+    def test_scan_falls_back_to_indexed_listing(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            (temp_projects_dir / "fun" / "game").mkdir(parents=True)
+            age_tree(temp_projects_dir)
+            get_existing_projects()
+            index = json.loads((get_cache_dir() / ai.INDEX_FILENAME).read_text())
+            first, second = index["categories"]
+            (temp_projects_dir / second / "new").mkdir()
+            
+            deadline = ai.Deadline(0)
+            assert ("new", second) not in get_existing_projects(deadline=deadline).pairs()
+            assert deadline.exhausted
+            assert len(get_existing_projects()) == 3
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_cold_index_tiny_deadline(self, mock_open, runner, temp_projects_dir, monkeypatch):
+        monkeypatch.setenv("AI_CLI_QUERY_CACHE", "0")
+        list_subdirs = ai._list_subdirs
+        monkeypatch.setattr('ai._list_subdirs', lambda directory: sorted(list_subdirs(directory)))
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "b" / "dashboard").mkdir(parents=True)
+            age_tree(temp_projects_dir)
+            result = runner.invoke(app, ["--deadline-ms", "0", "open dashboard"])
+            assert result.exit_code == 0
+            assert mock_open.call_count == 1
+            
+            # Only an empty category was reached: not the same as no projects
+            (get_cache_dir() / ai.INDEX_FILENAME).unlink()
+            (temp_projects_dir / "a").mkdir()
+            age_tree(temp_projects_dir)
+            result = runner.invoke(app, ["--deadline-ms", "0", "open dashboard"])
+        assert result.exit_code == 1
+        assert "Search incomplete" in result.output
+        assert "No projects found" not in result.output
+    
+    def test_match_stops_after_first_chunk(self, tmp_path):
+        projects = [(name, tmp_path / name) for name in ["api", "dashboard", "local-ai", "voice-audit"]]
+        with patch('ai.MATCH_CHUNK_SIZE', 2):
+            deadline = ai.Deadline(0)
+            path, name, _, top_5 = fuzzy_match_project("voice audit", projects, deadline=deadline)
+        assert deadline.exhausted
+        assert name in ("api", "dashboard")
+        assert len(top_5) == 2
+    
+    def test_match_splits_and_scores_only_chunks_in_time(self, tmp_path):
+        names = ["api", "dashboard", "local-ai", "voice-audit"]
+        catalog = ai.ProjectCatalog.from_pairs(tmp_path, sorted((name, "work") for name in names))
+        with patch('ai.MATCH_CHUNK_SIZE', 2):
+            deadline = ai.Deadline(0)
+            fuzzy_match_project("work voice", catalog, deadline=deadline)
+        assert deadline.exhausted
+        # Neither the segments of every name nor the category pass were computed
+        assert catalog.fields()._segments is None
+        assert catalog.fields()._members == {}
+    
+    def test_match_in_time_is_complete(self, tmp_path):
+        rng = random.Random(5)
+        names = synthetic_project_names(500)
+        projects = [(name, tmp_path / name) for name in names]
+        with patch('ai.MATCH_CHUNK_SIZE', 37):
+            for query in [make_typo(rng.choice(names), rng) for _ in range(20)]:
+                deadline = ai.Deadline(60_000)
+                assert fuzzy_match_project(query, projects, deadline=deadline) == fuzzy_match_project(query, projects)
+                assert not deadline.exhausted
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_reports_incomplete_search(self, mock_open, runner, temp_projects_dir, tmp_path, monkeypatch):
+        output = tmp_path / "trace.json"
+        # Search again rather than reuse the first run's results
+        monkeypatch.setenv("AI_CLI_QUERY_CACHE", "0")
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            (temp_projects_dir / "fun" / "game").mkdir(parents=True)
+            age_tree(temp_projects_dir)
+            assert runner.invoke(app, ["--deadline-ms", "60000", "open dashboard"]).exit_code == 0
+            mock_open.assert_called_once()
+            
+            result = runner.invoke(app, ["--deadline-ms", "0", "--profile", "--profile-output", str(output),
+                                         "open dashboard"])
+        # The index from the first run still finds the project
+        assert result.exit_code == 0
+        assert mock_open.call_count == 2
+        assert "deadline reached" in result.output
+        assert json.loads(output.read_text())["info"]["complete"] is False
+
+
+def wait_for(predicate, timeout=5.0):
+    """Poll predicate until it is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class TestProjectCatalog:
+    """Tests for ProjectCatalog, the parallel-array project list."""
+    
+    def test_from_listing_sorts_by_name(self, tmp_path):
+        catalog = ai.ProjectCatalog.from_listing(tmp_path, [("b", ["zeta", "api"]), ("a", ["api", "mid"])])
+        assert catalog.names == ["api", "api", "mid", "zeta"]
+        # Duplicate names keep the order of their categories
+        assert [catalog.category(i) for i in range(4)] == ["b", "a", "a", "b"]
+        assert catalog.path(1) == tmp_path / "a" / "api"
+    
+    def test_behaves_like_a_list_of_tuples(self, tmp_path):
+        catalog = ai.ProjectCatalog.from_listing(tmp_path, [("work", ["dashboard", "api"])])
+        expected = [("api", tmp_path / "work" / "api"), ("dashboard", tmp_path / "work" / "dashboard")]
+        assert catalog == expected
+        assert list(catalog) == expected
+        assert catalog[-1] == expected[-1]
+        assert catalog[:1] == expected[:1]
+        assert len(catalog) == 2
+        assert catalog != expected[:1]
+        with pytest.raises(IndexError):
+            catalog[2]
+    
+    def test_pairs_round_trip(self, tmp_path):
+        catalog = ai.ProjectCatalog.from_listing(tmp_path, [("b", ["x", "y"]), ("a", ["x"])])
+        assert catalog.pairs() == [("x", "b"), ("x", "a"), ("y", "b")]
+        assert ai.ProjectCatalog.from_pairs(tmp_path, catalog.pairs()) == catalog
+    
+    def test_duplicate_names_resolve_by_index(self, tmp_path):
+        catalog = ai.ProjectCatalog.from_listing(tmp_path, [("work", ["dashboard"]), ("fun", ["dashboard"])])
+        frecency = {str(tmp_path / "fun" / "dashboard"): 10.0}
+        path, name, score, _ = fuzzy_match_project("dashboard", catalog, frecency)
+        assert path == tmp_path / "fun" / "dashboard"
+        path, _, _, _ = fuzzy_match_project("dashboard", catalog)
+        assert path == tmp_path / "work" / "dashboard"
+    
+    def test_matches_like_a_list(self, tmp_path):
+        rng = random.Random(4)
+        names = synthetic_project_names(3000)
+        catalog = ai.ProjectCatalog.from_listing(tmp_path, [("a", names[::2]), ("b", names[1::2])])
+        projects = list(catalog)
+        queries = [make_typo(rng.choice(names), rng) for _ in range(20)]
+        for query in queries:
+            assert fuzzy_match_project(query, catalog) == fuzzy_match_project(query, projects)
+        # A one-off catalog is not worth indexing; a prebuilt index is used
+        assert catalog.trigram_index(build=False) is None
+        index = catalog.trigram_index()
+        with patch('ai._extract_prefiltered', wraps=ai._extract_prefiltered) as mock_prefilter:
+            for query in queries:
+                assert fuzzy_match_project(query, catalog)[:3] == fuzzy_match_project(query, projects)[:3]
+        assert any(call.kwargs["index"] is index for call in mock_prefilter.call_args_list)
+    
+    def test_scan_returns_catalog(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            projects = get_existing_projects()
+        assert isinstance(projects, ai.ProjectCatalog)
+        assert projects.pairs() == [("dashboard", "work")]
+
+
+class TestProjectWatcher:
+    """Tests for the in-memory project list kept by `ai daemon`."""
+    
+    @pytest.fixture(params=["inotify", "polling"])
+    def watcher(self, request, temp_projects_dir, monkeypatch):
+        monkeypatch.setattr('ai.PROJECTS_DIR', temp_projects_dir)
+        monkeypatch.setattr('ai.DAEMON_POLL_INTERVAL', 0.05)
+        if request.param == "polling":
+            monkeypatch.setattr('ai._Inotify.create', classmethod(lambda cls: None))
+        (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+        watcher = ai.ProjectWatcher()
+        if request.param == "inotify" and watcher.mode != "inotify":
+            pytest.skip("inotify is not available")
+        watcher.rescan()
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,), daemon=True)
+        thread.start()
+        yield watcher
+        stop.set()
+        thread.join()
+        watcher.close()
+    
+    def test_initial_scan(self, watcher):
+        assert watcher.projects() == [("dashboard", "work")]
+    
+    def test_catalog_reused_until_change(self, watcher, temp_projects_dir):
+        catalog = watcher.catalog()
+        assert watcher.catalog() is catalog
+        assert catalog == [("dashboard", temp_projects_dir / "work" / "dashboard")]
+        assert catalog.fields().acronym_index(build=False) is not None
+        (temp_projects_dir / "work" / "api").mkdir()
+        assert wait_for(lambda: len(watcher.catalog()) == 2)
+    
+    def test_tracks_new_and_removed_projects(self, watcher, temp_projects_dir):
+        (temp_projects_dir / "work" / "api").mkdir()
+        assert wait_for(lambda: ("api", "work") in watcher.projects())
+        (temp_projects_dir / "work" / "dashboard").rmdir()
+        assert wait_for(lambda: watcher.projects() == [("api", "work")])
+    
+    def test_tracks_new_categories(self, watcher, temp_projects_dir):
+        (temp_projects_dir / "fun").mkdir()
+        assert wait_for(lambda: "fun" in watcher._categories)
+        (temp_projects_dir / "fun" / "game").mkdir()
+        assert wait_for(lambda: ("game", "fun") in watcher.projects())
+    
+    def test_indexes_new_projects_text(self, watcher, temp_projects_dir, monkeypatch):
+        monkeypatch.setenv("AI_CLI_SQLITE", "1")
+        (temp_projects_dir / "work" / "ledger").mkdir()
+        (temp_projects_dir / "work" / "ledger" / "README.md").write_text("Parses invoices.\n")
+        
+        def found():
+            db = ai.ProjectDB.open()
+            try:
+                return db.search("invoices") == [("ledger", temp_projects_dir / "work" / "ledger")]
+            finally:
+                db.close()
+        assert wait_for(found)
+    
+    def test_survives_errors(self, watcher, temp_projects_dir, monkeypatch):
+        list_subdirs = ai._list_subdirs
+        calls = []
+        
+        def failing_once(directory):
+            calls.append(directory)
+            if len(calls) == 1:
+                raise PermissionError("unreadable")
+            return list_subdirs(directory)
+        monkeypatch.setattr('ai._list_subdirs', failing_once)
+        (temp_projects_dir / "fun").mkdir()
+        (temp_projects_dir / "fun" / "game").mkdir()
+        assert wait_for(lambda: ("game", "fun") in watcher.projects())
+        (temp_projects_dir / "work" / "api").mkdir()
+        assert wait_for(lambda: ("api", "work") in watcher.projects())
+    
+    def test_ignores_files_and_hidden_dirs(self, watcher, temp_projects_dir):
+        (temp_projects_dir / "work" / "notes.txt").write_text("x")
+        (temp_projects_dir / "work" / ".cache").mkdir()
+        (temp_projects_dir / "work" / "api").mkdir()
+        assert wait_for(lambda: ("api", "work") in watcher.projects())
+        assert watcher.projects() == [("api", "work"), ("dashboard", "work")]
+
+
+class TestDaemonClient:
+    """Tests for get_existing_projects talking to a running daemon."""
+    
+    @pytest.fixture
+    def server(self, temp_projects_dir, monkeypatch):
+        monkeypatch.setattr('ai.PROJECTS_DIR', temp_projects_dir)
+        (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+        forker = ai._CommandForker()
+        watcher = ai.ProjectWatcher()
+        watcher.rescan()
+        monkeypatch.setattr('ai._ACTIVE_WATCHER', watcher)
+        socket_path = ai.get_daemon_socket_path()
+        socket_path.parent.mkdir(parents=True)
+        server = ai._make_daemon_server(socket_path, watcher, forker)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield server
+        server.shutdown()
+        server.server_close()
+        watcher.close()
+        forker.close()
+    
+    def editor_env(self, tmp_path, script="exit 0"):
+        """An environment whose `cursor` runs script, launched in the foreground."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir(exist_ok=True)
+        (bin_dir / "cursor").write_text(f"#!/bin/sh\n{script}\n")
+        (bin_dir / "cursor").chmod(0o755)
+        return {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}", "AI_CLI_LAUNCH": "wait"}
+    
+    def test_projects_come_from_daemon(self, server, temp_projects_dir, monkeypatch):
+        monkeypatch.setattr('ai._ACTIVE_WATCHER', None)
+        with patch('ai._scan_projects') as mock_scan:
+            projects = get_existing_projects()
+        mock_scan.assert_not_called()
+        assert projects == [("dashboard", temp_projects_dir / "work" / "dashboard")]
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_lookup_matches_in_daemon(self, mock_open, server, runner, temp_projects_dir, monkeypatch):
+        ai._ACTIVE_WATCHER.catalog()
+        monkeypatch.setattr('ai._ACTIVE_WATCHER', None)
+        with patch('ai._scan_projects', side_effect=AssertionError("scanned")), \
+             patch('ai.ProjectCatalog.from_pairs', side_effect=AssertionError("list shipped")):
+            result = runner.invoke(ai.app, ["open dashbord"])
+        assert result.exit_code == 0
+        assert mock_open.call_args[0][0] == temp_projects_dir / "work" / "dashboard"
+    
+    def test_match_reply(self, server, temp_projects_dir):
+        reply = ai._daemon_request({"op": "match", "root": str(temp_projects_dir),
+                                    "query": "open dashboard", "frecency": {}})
+        assert reply["ok"] is True
+        assert (reply["name"], reply["score"], reply["exact"]) == ("dashboard", 100, True)
+        assert reply["top_paths"] == [str(temp_projects_dir / "work" / "dashboard")]
+        assert ai._daemon_request({"op": "match", "root": str(temp_projects_dir), "query": 1})["ok"] is False
+    
+    # Commands run in children of a helper forked when the daemon starts:
+    # mocks set up later don't reach them, and only what they write
+    # (reply, files) makes it back
+    def test_run_command_in_daemon(self, server, temp_projects_dir, tmp_path):
+        with patch('ai._scan_projects', side_effect=AssertionError("scanned")):
+            reply = ai._daemon_request({"op": "run", "argv": ["open dashboard"],
+                                        "env": self.editor_env(tmp_path)})
+        assert reply["exit_code"] == 0
+        assert "Opened 'dashboard'" in reply["stdout"]
+        assert ai.load_shortcuts()["last"] == str(temp_projects_dir / "work" / "dashboard")
+    
+    def test_run_uses_client_cwd_and_env(self, server, tmp_path):
+        (tmp_path / "client" / "proj").mkdir(parents=True)
+        env = {**os.environ, "XDG_STATE_HOME": str(tmp_path / "client-state")}
+        reply = ai._daemon_request({"op": "run", "argv": ["alias pj ./proj"],
+                                    "cwd": str(tmp_path / "client"), "env": env})
+        assert reply["exit_code"] == 0
+        assert os.getcwd() != str(tmp_path / "client")
+        data = json.loads((tmp_path / "client-state" / "ai-cli" / ai.SHORTCUTS_FILENAME).read_text())
+        assert data["aliases"]["pj"] == str(tmp_path / "client" / "proj")
+        
+        reply = ai._daemon_request({"op": "run", "argv": ["aliases"], "cwd": str(tmp_path / "missing")})
+        assert reply["ok"] is False
+        assert ai._daemon_request({"op": "run", "argv": [], "env": {"A": 1}})["ok"] is False
+    
+    def test_runs_commands_side_by_side(self, server, temp_projects_dir, tmp_path):
+        slow = threading.Thread(target=ai._daemon_request, args=(
+            {"op": "run", "argv": ["open dashboard"], "env": self.editor_env(tmp_path, "sleep 2")}, 5.0
+        ))
+        slow.start()
+        time.sleep(0.2)
+        start = time.monotonic()
+        reply = ai._daemon_request({"op": "run", "argv": ["aliases"]}, timeout=5.0)
+        assert time.monotonic() - start < 1.5
+        slow.join()
+        assert reply["exit_code"] == 0
+    
+    def test_command_forker(self, tmp_path):
+        forker = ai._CommandForker()
+        try:
+            reply = forker.run(["--help"], str(tmp_path), None)
+            assert reply["exit_code"] == 0
+            assert "Usage" in reply["stdout"]
+        finally:
+            forker.close()
+        watcher = Mock(root=tmp_path)
+        assert ai._handle_daemon_request(watcher, {"op": "run", "argv": []})["ok"] is False
+    
+    def test_run_reports_usage_errors(self, server):
+        reply = ai._daemon_request({"op": "run", "argv": ["--no-such-option"]})
+        assert reply["exit_code"] == 2
+        assert "No such option" in reply["stderr"]
+    
+    def test_other_root_falls_back_to_scan(self, server, tmp_path):
+        other_root = tmp_path / "other"
+        (other_root / "fun" / "game").mkdir(parents=True)
+        with patch('ai.PROJECTS_DIR', other_root):
+            assert get_existing_projects() == [("game", other_root / "fun" / "game")]
+    
+    def test_stale_socket_falls_back_to_scan(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            socket_path = ai.get_daemon_socket_path()
+            socket_path.parent.mkdir(parents=True)
+            socket_path.write_text("")
+            assert [name for name, _ in get_existing_projects()] == ["dashboard"]
+
+
+class TestThinClient:
+    """Tests for ai_client.py, the stdlib-only client of the daemon."""
+    
+    def test_socket_path_matches_daemon(self, monkeypatch):
+        assert ai_client.socket_path() == str(ai.get_daemon_socket_path())
+        monkeypatch.delenv("XDG_RUNTIME_DIR")
+        assert ai_client.socket_path() == str(ai.get_daemon_socket_path())
+    
+    def test_prints_daemon_reply(self, capsys):
+        reply = {"ok": True, "stdout": "✅ Opened\n", "stderr": "warn\n", "exit_code": 3}
+        with patch('ai_client.run_remote', return_value=reply):
+            assert ai_client.main(["open x"]) == 3
+        captured = capsys.readouterr()
+        assert captured.out == "✅ Opened\n"
+        assert captured.err == "warn\n"
+    
+    def test_sends_cwd_and_env(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("AI_CLI_LAUNCH", "wait")
+        sent = []
+        
+        class FakeSocket:
+            replies = iter([b'{"ok": true}', b""])
+            settimeout = connect = shutdown = lambda self, *args: None
+            
+            def __init__(self, *args):
+                pass
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc_info):
+                pass
+            
+            def sendall(self, data):
+                sent.append(json.loads(data))
+            
+            def recv(self, size):
+                return next(self.replies)
+        
+        with patch('ai_client.socket.socket', FakeSocket):
+            assert ai_client.run_remote(["open x"]) == {"ok": True}
+        assert sent[0]["cwd"] == str(tmp_path)
+        assert sent[0]["env"]["AI_CLI_LAUNCH"] == "wait"
+    
+    def test_falls_back_without_daemon(self):
+        with patch('ai_client.run_local', side_effect=SystemExit(0)) as mock_local:
+            with pytest.raises(SystemExit):
+                ai_client.main(["open x"])
+        mock_local.assert_called_once_with(["open x"])
+    
+    @pytest.mark.parametrize("response", [b"", b'{"ok": tr', b'{"ok": false, "error": "boom"}'])
+    def test_sent_command_never_reruns_locally(self, response, capsys):
+        import socket
+        path = ai_client.socket_path()
+        os.makedirs(os.path.dirname(path))
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(1)
+        
+        def answer():
+            conn, _ = listener.accept()
+            with conn:
+                conn.makefile('rb').readline()
+                conn.sendall(response)
+        thread = threading.Thread(target=answer)
+        thread.start()
+        try:
+            with patch('ai_client.run_local') as mock_local:
+                assert ai_client.main(["open x"]) == 1
+        finally:
+            thread.join()
+            listener.close()
+        mock_local.assert_not_called()
+        assert "ai daemon" in capsys.readouterr().err
+    
+    def test_daemon_command_runs_locally(self):
+        with patch('ai_client.run_remote') as mock_remote, \
+                patch('ai_client.run_local', side_effect=SystemExit(0)):
+            with pytest.raises(SystemExit):
+                ai_client.main(["daemon"])
+        mock_remote.assert_not_called()
+    
+    def test_batch_runs_locally(self):
+        with patch('ai_client.run_remote') as mock_remote, \
+                patch('ai_client.run_local', side_effect=SystemExit(0)):
+            with pytest.raises(SystemExit):
+                ai_client.main(["--batch"])
+        mock_remote.assert_not_called()
+
+
 class TestFuzzyMatchProject:
     """Tests for fuzzy_match_project function."""
     
@@ -248,6 +886,922 @@ class TestFuzzyMatchProject:
         assert len(top_5) <= 5
 
 
+def synthetic_project_names(count, seed=0):
+    """Generate a reproducible list of plausible project names."""
+    words = ["local", "ai", "voice", "audit", "credit", "agent", "web", "dashboard", "api",
+             "server", "client", "game", "engine", "parser", "invoice", "blog", "todo",
+             "cli", "bot", "data", "pipeline", "ml", "model", "notes", "site", "app"]
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        parts = rng.sample(words, rng.randint(1, 3))
+        if rng.random() < 0.5:
+            parts.append(str(rng.randint(1, 999)))
+        names.add(rng.choice(["-", "_", ""]).join(parts))
+    return sorted(names)
+
+
+def make_typo(text, rng):
+    """Apply one random character edit to text."""
+    i = rng.randrange(len(text))
+    edit = rng.choice(["drop", "swap", "add"])
+    if edit == "drop":
+        return text[:i] + text[i + 1:]
+    if edit == "swap" and i + 1 < len(text):
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + text[i:]
+
+
+class TestTrigramIndex:
+    """Tests for the trigram prefilter used by fuzzy_match_project."""
+    
+    def test_candidates_share_a_trigram(self):
+        index = ai.TrigramIndex(["local-ai", "voice-audit", "credit-agent"])
+        assert index.candidates("local") == [0]
+        assert index.candidates("audit agent") == [1, 2]
+        assert index.candidates("xyz") == []
+    
+    def test_unseen_score_bound_holds(self):
+        rng = random.Random(1)
+        names = synthetic_project_names(300)
+        index = ai.TrigramIndex(names)
+        for _ in range(200):
+            query = rng.choice(["zq", "xylophone", "mmm kkk", make_typo(rng.choice(names), rng)])
+            bound = index.max_unseen_score(query)
+            candidates = set(index.candidates(query))
+            for i, name in enumerate(names):
+                if i not in candidates:
+                    assert fuzz.token_sort_ratio(query, name) <= bound
+    
+    def test_recall_matches_brute_force(self, tmp_path):
+        rng = random.Random(2)
+        names = synthetic_project_names(4000)
+        catalog = ai.ProjectCatalog.from_listing(tmp_path, [("c0", names[::2]), ("c1", names[1::2])])
+        index = catalog.trigram_index()
+        queries = [make_typo(rng.choice(names).replace("-", " "), rng) for _ in range(400)]
+        queries += ["local ai", "voice audit", "invoice parser", "zzz", "dashbord"]
+        segments = catalog.fields().segments
+        extract_prefiltered = ai._extract_prefiltered
+        proven = []
+        
+        def prefilter(*args, **kwargs):
+            assert kwargs["index"] is index
+            results = extract_prefiltered(*args, **kwargs)
+            proven.append(results is not None)
+            return results
+        # Only the trigram path: abbreviations and typos have their own
+        with patch('ai._extract_prefiltered', side_effect=prefilter), \
+             patch('ai._acronym_results', return_value=None), patch('ai._typo_results', return_value=None):
+            for query in queries:
+                keywords = ' '.join(extract_keywords(query))
+                if not keywords:
+                    continue
+                expected = max(process.extractOne(keywords, choices, scorer=fuzz.token_sort_ratio)[1]
+                               for choices in (catalog.names, segments))
+                _, match_name, score, _ = fuzzy_match_project(query, catalog)
+                assert score == round(expected), query
+                assert max(fuzz.token_sort_ratio(keywords, match_name),
+                           fuzz.token_sort_ratio(keywords, *ai._name_segments([match_name]))) == expected
+        # The prefilter must actually be taken (and proven) for most typo queries
+        assert sum(proven) > len(queries) // 2
+    
+    def test_list_is_not_indexed(self, tmp_path):
+        projects = [(name, tmp_path / name) for name in synthetic_project_names(ai.TRIGRAM_MIN_PROJECTS)]
+        with patch('ai.TrigramIndex') as mock_index, patch('ai._extract_prefiltered') as mock_prefilter:
+            fuzzy_match_project("voice audit", projects)
+        mock_index.assert_not_called()
+        mock_prefilter.assert_not_called()
+    
+    def test_small_catalog_skips_index(self, tmp_path):
+        projects = [(name, tmp_path / name) for name in synthetic_project_names(50)]
+        with patch('ai._extract_prefiltered') as mock_prefilter:
+            fuzzy_match_project("voice audit", projects)
+        mock_prefilter.assert_not_called()
+
+
+class TestFieldMatching:
+    """Tests for multi-field scoring (name, segments, category)."""
+    
+    @pytest.fixture
+    def catalog(self, tmp_path):
+        return ai.ProjectCatalog.from_listing(tmp_path, [
+            ("Personal", ["dashboard", "notes"]),
+            ("DuringWorkHours", ["dashboard", "LocalAI", "voice_audit"]),
+        ])
+    
+    def test_name_segments(self):
+        assert ai._name_segments(["LocalAI_v2-app", "HTTPServer", "plain", "my.site"]) == [
+            "local ai v2 app", "http server", "plain", "my site"]
+    
+    def test_segments_field(self, catalog):
+        path, name, score, _ = fuzzy_match_project("open local ai", catalog)
+        assert (name, score) == ("LocalAI", 100)
+        assert fuzzy_match_project("voice audit", catalog)[1:3] == ("voice_audit", 100)
+    
+    def test_category_disambiguates(self, catalog, tmp_path):
+        path, name, score, top_5 = fuzzy_match_project("open work dashboard", catalog)
+        assert path == tmp_path / "DuringWorkHours" / "dashboard"
+        assert score == 90
+        assert top_5[1] == ("dashboard", round(fuzz.token_sort_ratio("work dashboard", "dashboard")))
+        assert fuzzy_match_project("personal dashboard", catalog)[0] == tmp_path / "Personal" / "dashboard"
+        # Naming only the category says nothing about the project
+        assert fuzzy_match_project("during work hours", catalog)[2] < ai.CONFIDENCE_THRESHOLD
+        assert fuzzy_match_project("work dashboard", list(catalog)) == fuzzy_match_project("work dashboard", catalog)
+    
+    def test_batch_scores_fields_too(self, catalog):
+        queries = ["work dashboard", "local ai", "voice audit", "notes"]
+        expected = [fuzzy_match_project(query, catalog) for query in queries]
+        assert list(ai.batch_match_projects(queries, catalog)) == expected
+    
+    def test_weights(self, catalog):
+        with patch.dict('ai.FIELD_WEIGHTS', {"segments": 0, "category": 0}):
+            assert fuzzy_match_project("local ai", catalog)[2] == round(fuzz.token_sort_ratio("local ai", "LocalAI"))
+            assert fuzzy_match_project("work dashboard", catalog)[0].parent.name == "Personal"
+    
+    def test_fields_computed_once(self, catalog):
+        with patch('ai._name_segments', wraps=ai._name_segments) as mock_segments:
+            fuzzy_match_project("local ai", catalog)
+            fuzzy_match_project("work dashboard", catalog)
+        assert mock_segments.call_count == 2  # names and categories, once
+        assert catalog.fields() is catalog.fields()
+        assert catalog.subset([0, 1]).fields() is not catalog.fields()
+
+
+class TestAcronyms:
+    """Tests for abbreviation lookups ahead of the fuzzy pass."""
+    
+    @pytest.fixture
+    def projects(self, tmp_path):
+        names = ["local-ai", "voice-audit", "video_app", "lambda", "local-cli", "dashboard"]
+        return [(name, tmp_path / "work" / name) for name in names]
+    
+    def test_index_candidates(self, projects):
+        fields = ai._project_fields(projects)
+        index = fields.acronym_index()
+        assert [fields.names[i] for i in index.candidates("lai")] == ["local-ai"]
+        assert [fields.names[i] for i in index.candidates("vadt")] == ["voice-audit"]
+        assert [fields.names[i] for i in index.candidates("va")] == ["voice-audit", "video_app"]
+        assert index.candidates("dshb") == []  # one-word names are left to fuzzy matching
+        assert index.starts_a_word("lam") and not index.starts_a_word("lai")
+    
+    def test_resolves_without_full_pass(self, projects):
+        with patch('ai._field_scores') as mock_scores:
+            path, name, score, top_5 = fuzzy_match_project("open lai", projects)
+            assert (name, score) == ("local-ai", ai.ACRONYM_SCORE)
+            assert fuzzy_match_project("vadt", projects)[1] == "voice-audit"
+        mock_scores.assert_not_called()
+    
+    def test_words_and_typos_are_not_abbreviations(self, projects):
+        fields = ai._project_fields(projects)
+        assert ai._abbreviated("lam", fields) is None  # starts "lambda"
+        assert ai._abbreviated("locl", fields) is None  # "local" mistyped, not l-o-c-l
+        assert ai._abbreviated("localai", fields) is None  # too close to "local" + "ai"
+        assert ai._abbreviated("local ai", fields) is None
+        assert fuzzy_match_project("locl", projects)[1] == "local-ai"
+    
+    def test_deadline_uses_only_a_prebuilt_index(self, tmp_path):
+        catalog = ai.ProjectCatalog.from_pairs(tmp_path, [("local-ai", "work"), ("voice-audit", "work")])
+        fields = catalog.fields()
+        assert ai._abbreviated("lai", fields, scan=False) is None
+        assert fields._segments is None
+        assert fuzzy_match_project("lai", catalog, deadline=ai.Deadline(60_000))[2] != ai.ACRONYM_SCORE
+        fields.acronym_index()
+        assert fuzzy_match_project("lai", catalog, deadline=ai.Deadline(60_000))[1:3] == ("local-ai", ai.ACRONYM_SCORE)
+    
+    def test_ambiguous_left_to_frecency(self, projects):
+        _, _, score, top_5 = fuzzy_match_project("va", projects)
+        assert score == ai.ACRONYM_AMBIGUOUS_SCORE < ai.CONFIDENCE_THRESHOLD
+        assert {name for name, _ in top_5} == {"voice-audit", "video_app"}
+        frecency = {str(projects[2][1]): 50.0}
+        _, name, score, _ = fuzzy_match_project("va", projects, frecency)
+        # Frecency picks one, but doesn't make the match any more certain
+        assert name == "video_app" and score == ai.ACRONYM_AMBIGUOUS_SCORE
+    
+    def test_index_and_scan_agree(self, tmp_path):
+        rng = random.Random(5)
+        names = synthetic_project_names(2000)
+        scan = ai.ProjectCatalog.from_listing(tmp_path, [("a", names)])
+        indexed = ai.ProjectCatalog.from_listing(tmp_path, [("a", names)])
+        indexed.fields().acronym_index()
+        queries = ["".join(word[:rng.randint(1, 2)] for word in rng.choice(names).split("-")[:3])
+                   for _ in range(100)]
+        for query in queries:
+            assert ai._abbreviated(query, scan.fields()) == ai._abbreviated(query, indexed.fields()), query
+        assert any(ai._abbreviated(query, scan.fields()) for query in queries)
+
+
+class TestTypoIndex:
+    """Tests for the BK-tree first stage of one-word queries."""
+    
+    def test_bk_tree_matches_brute_force(self):
+        rng = random.Random(6)
+        words = sorted({word for name in synthetic_project_names(3000) for word in name.replace("_", "-").split("-")})
+        tree = ai.BKTree(iter(words))
+        calls = []
+        distance = tree._distance
+        tree._distance = lambda a, b: calls.append(1) or distance(a, b)
+        for query in [make_typo(rng.choice(words), rng) for _ in range(30)] + ["zzzz", ""]:
+            for k in (1, 2):
+                expected = sorted((Levenshtein.distance(query, word), word) for word in words
+                                  if Levenshtein.distance(query, word) <= k)
+                assert sorted(tree.search(query, k)) == expected
+        # Far fewer distances than words per search
+        assert len(calls) < 64 * len(words) / 2
+    
+    def test_candidates_include_runs(self, tmp_path):
+        fields = ai._project_fields([(name, tmp_path / name) for name in ["web-api", "webapp", "api-2", "blog"]])
+        index = fields.typo_index()
+        assert index.candidates("webapi", 1) == [0, 1]
+        assert index.candidates("ap", 1) == [0, 2]
+        assert index.candidates("2", 1) == []  # numbers are left out
+    
+    def test_first_stage(self, tmp_path):
+        rng = random.Random(7)
+        names = synthetic_project_names(3000)
+        plain = ai.ProjectCatalog.from_listing(tmp_path, [("c", names)])
+        indexed = ai.ProjectCatalog.from_listing(tmp_path, [("c", names)])
+        indexed.fields().typo_index()
+        words = sorted({word for segments in indexed.fields().segments for word in segments.split()
+                        if not word.isdigit()})
+        for query in [make_typo(rng.choice(words), rng) for _ in range(100)]:
+            # Same best match; the list behind it only holds the close projects
+            assert fuzzy_match_project(query, indexed)[:3] == fuzzy_match_project(query, plain)[:3], query
+        
+        with patch('ai._field_scores', wraps=ai._field_scores) as mock_scores:
+            assert fuzzy_match_project("dashbord", indexed)[1].startswith("dashboard")
+        assert all(len(call.args[3]) < len(names) for call in mock_scores.call_args_list)
+        # Nothing close: the full pass runs
+        with patch('ai._field_scores', wraps=ai._field_scores) as mock_scores:
+            assert fuzzy_match_project("zzzz", indexed) == fuzzy_match_project("zzzz", plain)
+        assert mock_scores.call_args_list[-1].args[3:] == ()
+
+
+class TestQueryCache:
+    """Tests for the on-disk cache of match results."""
+    
+    @pytest.fixture
+    def tree(self, temp_projects_dir, monkeypatch):
+        monkeypatch.setattr('ai.PROJECTS_DIR', temp_projects_dir)
+        for name in ("dashboard-web", "dashboard-api"):
+            (temp_projects_dir / "work" / name).mkdir(parents=True)
+        age_tree(temp_projects_dir)
+        return temp_projects_dir
+    
+    def test_catalog_version(self, tree):
+        version = ai.catalog_version()
+        assert version is not None and ai.catalog_version() == version
+        (tree / "work" / "blog").mkdir()
+        assert ai.catalog_version() is None  # too recent to trust
+        age_tree(tree, seconds=30)
+        assert ai.catalog_version() not in (None, version)
+    
+    def test_roundtrip_ttl_and_lru(self, tree, monkeypatch):
+        version = ai.catalog_version()
+        results = [("dashboard-web", 90.0, tree / "work" / "dashboard-web")]
+        ai.cache_match("dashboard", version, results, now=1000)
+        assert ai.load_cached_match("dashboard", version, now=1001) == results
+        assert ai.load_cached_match("dashboard", ["other"], now=1001) is None
+        assert ai.load_cached_match("dashboard", version, now=1000 + ai.QUERY_CACHE_TTL + 1) is None
+        
+        monkeypatch.setattr('ai.QUERY_CACHE_SIZE', 2)
+        ai.cache_match("api", version, results, now=1002)
+        ai.load_cached_match("dashboard", version, now=1003)  # now more recent than "api"
+        ai.cache_match("blog", version, results, now=1004)
+        assert ai.load_cached_match("api", version, now=1005) is None
+        assert ai.load_cached_match("dashboard", version, now=1005) == results
+        # Another version of the tree drops everything
+        ai.cache_match("blog", ["other"], results, now=1006)
+        assert ai.load_cached_match("dashboard", version, now=1007) is None
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_skips_scan_and_match(self, mock_open, runner, tree):
+        assert runner.invoke(app, ["open dashbord"]).exit_code == 0
+        with patch('ai.get_existing_projects') as mock_scan, patch('ai.fuzzy_match_project') as mock_match:
+            result = runner.invoke(app, ["open dashbord"])
+        assert result.exit_code == 0
+        mock_scan.assert_not_called()
+        mock_match.assert_not_called()
+        assert mock_open.call_args_list[0] == mock_open.call_args_list[1]
+        assert ai.load_metrics()[-1]["cached"] is True
+        
+        # A new project invalidates the cache
+        (tree / "work" / "dashbord").mkdir()
+        age_tree(tree)
+        assert runner.invoke(app, ["open dashbord"]).exit_code == 0
+        assert mock_open.call_args.args[0] == tree / "work" / "dashbord"
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_reranks_with_frecency(self, mock_open, runner, tree):
+        assert runner.invoke(app, ["open dashboard"]).exit_code == 0
+        assert ai.load_metrics()[-1]["match"] == "dashboard-api"  # a tie, the first one wins
+        for _ in range(3):
+            ai.record_project_open(tree / "work" / "dashboard-web")
+        runner.invoke(app, ["open dashboard"])
+        assert ai.load_metrics()[-1]["cached"] is True
+        _, expected_name, _, _ = fuzzy_match_project("dashboard", get_existing_projects(), ai.frecency_scores())
+        assert ai.load_metrics()[-1]["match"] == expected_name == "dashboard-web"
+    
+    def test_disabled(self, runner, tree, monkeypatch):
+        monkeypatch.setenv("AI_CLI_QUERY_CACHE", "0")
+        with patch('ai.open_in_cursor', return_value=True):
+            runner.invoke(app, ["open dashboard"])
+        assert not (ai.get_cache_dir() / ai.QUERY_CACHE_FILENAME).exists()
+
+
+class TestQueryFilters:
+    """Tests for cat:/recent:/lang:/dirty: filters and their query plan."""
+    
+    @pytest.fixture
+    def tree(self, temp_projects_dir, monkeypatch):
+        monkeypatch.setattr('ai.PROJECTS_DIR', temp_projects_dir)
+        for category, name, marker in [("work", "api-server", "go.mod"), ("work", "api-client", "package.json"),
+                                       ("fun", "api-game", "Cargo.toml"), ("fun", "blog", None)]:
+            (temp_projects_dir / category / name).mkdir(parents=True)
+            if marker:
+                (temp_projects_dir / category / name / marker).write_text("")
+        return temp_projects_dir
+    
+    def test_parse_query(self):
+        assert ai.parse_query("open api CAT:work lang:go") == ("open api", [("cat", "work"), ("lang", "go")])
+        assert ai.parse_query("open http://x:80 recent:7d") == ("open http://x:80", [("recent", "7d")])
+        assert ai.parse_age("12h") == 12 * 3600
+        assert ai.parse_age("1.5w") == 1.5 * 7 * 86400
+        with pytest.raises(ValueError):
+            ai.parse_query("open recent:soon")
+        with pytest.raises(ValueError):
+            ai.parse_query("open dirty:maybe")
+    
+    def test_prefilter_category(self, tree):
+        projects = get_existing_projects()
+        filtered = ai.prefilter_projects(projects, [("cat", "WO")])
+        assert isinstance(filtered, ai.ProjectCatalog)
+        assert filtered.pairs() == [("api-client", "work"), ("api-server", "work")]
+        assert ai.prefilter_projects(list(projects), [("cat", "WO")]) == list(filtered)
+        both = ai.prefilter_projects(projects, [("cat", "work"), ("cat", "fun")])
+        assert len(both) == 4
+    
+    def test_prefilter_recent(self, tree):
+        ai.record_project_open(tree / "fun" / "blog")
+        entries = ai.load_frecency()
+        entries[str(tree / "work" / "api-server")] = {"rank": 1.0, "last": time.time() - 3 * 86400}
+        ai._write_json(ai.get_state_dir() / ai.FRECENCY_FILENAME, entries)
+        projects = get_existing_projects()
+        
+        assert ai.prefilter_projects(projects, [("recent", "1d")]).pairs() == [("blog", "fun")]
+        assert len(ai.prefilter_projects(projects, [("recent", "1w")])) == 2
+        assert ai.prefilter_projects(projects, [("recent", "1w"), ("cat", "work")]).pairs() == [("api-server", "work")]
+        assert ai.prefilter_projects(list(projects), [("recent", "1d")]) == [("blog", tree / "fun" / "blog")]
+    
+    def test_languages(self, tree):
+        assert ai.project_languages(tree / "work" / "api-server") == {"go"}
+        assert ai.project_languages(tree / "fun" / "blog") == set()
+        assert ai.project_languages(tree / "missing") == set()
+    
+    def test_git_dirty(self, tmp_path):
+        projects = [("plain", tmp_path / "plain"), ("repo", tmp_path / "repo")]
+        for _, path in projects:
+            path.mkdir()
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path / "repo", check=True)
+        dirty, clean = (ai.postfilter_accept(projects, [("dirty", value)]) for value in ("yes", "no"))
+        assert dirty([0, 1]) == [False, False]
+        assert clean([0, 1]) == [True, True]
+        (tmp_path / "repo" / "file.txt").write_text("x")
+        assert (dirty([1]), clean([1])) == ([True], [False])
+    
+    def test_dirty_checks_are_batched(self, tmp_path):
+        projects = [(f"repo{i}", tmp_path / f"repo{i}") for i in range(12)]
+        for _, path in projects:
+            path.mkdir()
+            subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+            (path / "file.txt").write_text("x")
+            past = ai.time.time() - 60
+            os.utime(path / ".git" / "HEAD", (past, past))
+        accept = ai.postfilter_accept(projects, [("dirty", "yes")])
+        results = [(name, 50, i) for i, (name, _) in enumerate(projects)]
+        with patch('ai.collect_git_info', wraps=ai.collect_git_info) as mock_collect:
+            assert len(ai._accepted(results, accept, 20)) == 12
+        mock_collect.assert_called_once()
+        # Every result made it into the cache
+        assert len(json.loads((get_cache_dir() / ai.GIT_INFO_FILENAME).read_text())) == 12
+    
+    @patch('ai.create_project')
+    def test_create_rejects_filters(self, mock_create, runner, tree):
+        for command in ["create a project called foo cat:work", "create project bar recent:7d"]:
+            result = runner.invoke(app, [command])
+            assert result.exit_code == 1
+            assert "only apply when opening" in result.output
+        mock_create.assert_not_called()
+        assert not (tree / ai.CREATE_CATEGORY).exists()
+    
+    def test_postfilter_accept(self, tree):
+        projects = get_existing_projects()
+        accept = ai.postfilter_accept(projects, [("lang", "rs")])
+        _, name, _, top_5 = fuzzy_match_project("api", projects, accept=accept)
+        assert name == "api-game"
+        assert [n for n, _ in top_5] == ["api-game"]
+        
+        with patch('ai.collect_git_info', side_effect=lambda paths: [{"dirty": path.name == "api-client"}
+                                                                     for path in paths]):
+            accept = ai.postfilter_accept(projects, [("dirty", "yes")])
+            assert [n for n, _ in fuzzy_match_project("api", projects, accept=accept)[3]] == ["api-client"]
+        assert ai.postfilter_accept(projects, [("cat", "work")]) is None
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_filters(self, mock_open, runner, tree):
+        result = runner.invoke(app, ["open api server cat:work lang:golang"])
+        assert result.exit_code == 0
+        mock_open.assert_called_once_with(tree / "work" / "api-server", detach=True)
+        metrics = ai.load_metrics()[-1]
+        assert metrics["filtered_count"] == 2
+        assert "filter" in metrics["stages"]
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_filters_only(self, mock_open, runner, tree):
+        result = runner.invoke(app, ["open cat:fun"])
+        assert result.exit_code == 0
+        assert "api-game" in result.stdout and "blog" in result.stdout
+        mock_open.assert_not_called()
+        
+        result = runner.invoke(app, ["open lang:rust"])
+        assert result.exit_code == 0
+        mock_open.assert_called_once_with(tree / "fun" / "api-game", detach=True)
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_exact_name_must_pass_filters(self, mock_open, runner, tree):
+        result = runner.invoke(app, ["open blog cat:work"])
+        assert result.exit_code == 0
+        mock_open.assert_not_called()
+        
+        result = runner.invoke(app, ["open blog lang:rust"])
+        assert result.exit_code == 0
+        mock_open.assert_not_called()
+    
+    def test_cli_no_match_and_bad_filter(self, runner, tree):
+        assert runner.invoke(app, ["open api cat:nothing"]).exit_code == 1
+        assert runner.invoke(app, ["open api recent:tomorrow"]).exit_code == 1
+
+
+class TestGitInfo:
+    """Tests for the branch/dirty/last commit details listed with unconfident matches."""
+    
+    COMMIT_TIME = 1_700_000_000
+    
+    def make_repo(self, path, branch="main"):
+        """Create a repo with one commit at COMMIT_TIME, old enough for its HEAD and index to be trusted."""
+        path.mkdir(parents=True)
+        env = {**os.environ, "GIT_AUTHOR_DATE": f"{self.COMMIT_TIME} +0000",
+               "GIT_COMMITTER_DATE": f"{self.COMMIT_TIME} +0000"}
+        git = ["git", "-c", "user.name=t", "-c", "user.email=t@t", "-c", "commit.gpgsign=false"]
+        subprocess.run(git + ["init", "-q"], cwd=path, check=True)
+        subprocess.run(git + ["symbolic-ref", "HEAD", f"refs/heads/{branch}"], cwd=path, check=True)
+        (path / "README.md").write_text("# x\n")
+        subprocess.run(git + ["add", "."], cwd=path, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "init"], cwd=path, check=True, env=env)
+        self.age(path)
+        return path
+    
+    def age(self, path, seconds=60):
+        past = ai.time.time() - seconds
+        for name in ("HEAD", "index"):
+            os.utime(path / ".git" / name, (past, past))
+    
+    @pytest.fixture
+    def queries(self):
+        with patch('ai.query_git_info', wraps=ai.query_git_info) as mock_query:
+            yield mock_query
+    
+    def test_collects_branch_dirty_and_commit(self, tmp_path):
+        clean = self.make_repo(tmp_path / "clean")
+        dirty = self.make_repo(tmp_path / "dirty", branch="feature")
+        (dirty / "README.md").write_text("changed\n")
+        (tmp_path / "plain").mkdir()
+        
+        assert ai.collect_git_info([clean, tmp_path / "plain", dirty]) == [
+            {"branch": "main", "dirty": False, "commit_time": self.COMMIT_TIME},
+            None,
+            {"branch": "feature", "dirty": True, "commit_time": self.COMMIT_TIME},
+        ]
+    
+    def test_cached_until_head_or_index_changes(self, tmp_path, queries):
+        repo = self.make_repo(tmp_path / "repo")
+        info = ai.collect_git_info([repo])
+        assert ai.collect_git_info([repo]) == info
+        assert queries.call_count == 1
+        
+        self.age(repo, seconds=120)
+        ai.collect_git_info([repo])
+        assert queries.call_count == 2
+        # Edits that leave the index alone are picked up once the entry expires
+        ai.collect_git_info([repo], now=ai.time.time() + ai.GIT_INFO_TTL + 1)
+        assert queries.call_count == 3
+    
+    def test_recent_changes_not_cached(self, tmp_path, queries):
+        repo = self.make_repo(tmp_path / "repo")
+        (repo / ".git" / "index").touch()
+        ai.collect_git_info([repo])
+        ai.collect_git_info([repo])
+        assert queries.call_count == 2
+    
+    def test_format(self):
+        now = self.COMMIT_TIME + 3 * 86400 + 5
+        assert ai.format_git_info({"branch": "main", "dirty": True, "commit_time": self.COMMIT_TIME}, now) == \
+            "main, uncommitted changes, last commit 3d ago"
+        assert ai.format_git_info({"branch": None, "dirty": False, "commit_time": None}, now) == "detached HEAD"
+        assert ai.format_age(30) == "just now"
+    
+    def test_cli_lists_git_info(self, runner, temp_projects_dir, monkeypatch):
+        monkeypatch.setattr('ai.PROJECTS_DIR', temp_projects_dir)
+        self.make_repo(temp_projects_dir / "work" / "dashboard-web")
+        (temp_projects_dir / "work" / "dashboard-api").mkdir()
+        age_tree(temp_projects_dir)
+        age_tree(temp_projects_dir / "work")
+        
+        result = runner.invoke(app, ["open dash"])
+        assert result.exit_code == 0
+        assert "dashboard-web (confidence:" in result.stdout
+        assert "[main, last commit" in result.stdout
+        
+        monkeypatch.setenv("AI_CLI_GIT_INFO", "0")
+        result = runner.invoke(app, ["open dash"])
+        assert "[main" not in result.stdout
+
+
+class TestBatchMatch:
+    """Tests for batch_match_projects and `ai --batch`."""
+    
+    def batch_fixture(self, tmp_path, count):
+        rng = random.Random(3)
+        names = synthetic_project_names(count)
+        # Duplicate names in different categories must keep their own paths
+        names += names[:10]
+        projects = [(name, tmp_path / f"c{i % 7}" / name) for i, name in enumerate(names)]
+        queries = [make_typo(rng.choice(names).replace("-", " "), rng) for _ in range(40)]
+        queries += ["open local ai", "open", "zzz", ""]
+        return projects, queries
+    
+    @pytest.mark.parametrize("count", [50, 3000])
+    def test_same_as_fuzzy_match(self, tmp_path, count):
+        projects, queries = self.batch_fixture(tmp_path, count)
+        frecency = {str(projects[-1][1]): 20.0}
+        for scores in (None, frecency):
+            expected = [fuzzy_match_project(query, projects, scores) for query in queries]
+            assert list(ai.batch_match_projects(queries, projects, scores)) == expected
+    
+    def test_cdist_in_chunks(self, tmp_path):
+        pytest.importorskip("numpy")
+        projects, queries = self.batch_fixture(tmp_path, 500)
+        expected = [fuzzy_match_project(query, projects) for query in queries]
+        with patch('ai.BATCH_MAX_CELLS', len(projects) * 3):
+            assert list(ai.batch_match_projects(queries, projects)) == expected
+    
+    def test_read_batch_queries(self):
+        lines = ["open dashboard\n", "\n", '"local ai"\n', '{"id": 7, "query": "voice"}\n',
+                 '{"id": 8}\n', '{not json\n']
+        assert list(ai.read_batch_queries(iter(lines))) == [
+            {"query": "open dashboard"},
+            {"query": "local ai"},
+            {"id": 7, "query": "voice"},
+            {"id": 8, "query": None, "error": 'missing "query"'},
+            {"query": "{not json"},
+        ]
+    
+    def test_cli_stdin(self, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            (temp_projects_dir / "work" / "local-ai").mkdir(parents=True)
+            with patch('ai.get_existing_projects', wraps=ai.get_existing_projects) as mock_get_projects:
+                result = runner.invoke(app, ["--batch"], input='open dashboard\n{"id": 1, "query": "local ai"}\n')
+        
+        assert result.exit_code == 0
+        mock_get_projects.assert_called_once()
+        lines = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [line["match"] for line in lines] == ["dashboard", "local-ai"]
+        assert lines[0]["confident"] is True
+        assert lines[0]["path"] == str(temp_projects_dir / "work" / "dashboard")
+        assert lines[1]["id"] == 1
+        assert lines[1]["candidates"][0] == {"name": "local-ai", "score": lines[1]["score"]}
+    
+    def test_cli_file(self, runner, temp_projects_dir, tmp_path):
+        queries = tmp_path / "queries.jsonl"
+        queries.write_text('{"query": "dashboard"}\n')
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            result = runner.invoke(app, ["--batch", str(queries)])
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["match"] == "dashboard"
+    
+    def test_cli_missing_file(self, runner, tmp_path):
+        result = runner.invoke(app, ["--batch", str(tmp_path / "missing")])
+        assert result.exit_code == 1
+    
+    def test_missing_command(self, runner):
+        assert runner.invoke(app, []).exit_code == 1
+
+
+class TestProjectDB:
+    """Tests for the optional SQLite project catalog."""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = ai.ProjectDB(tmp_path / "projects.db")
+        yield db
+        db.close()
+    
+    @pytest.fixture
+    def enabled(self, monkeypatch, temp_projects_dir):
+        monkeypatch.setenv("AI_CLI_SQLITE", "1")
+        monkeypatch.setattr('ai.PROJECTS_DIR', temp_projects_dir)
+        return temp_projects_dir
+    
+    def rows(self, db):
+        return sorted(db.conn.execute("SELECT category, name FROM projects").fetchall())
+    
+    def test_sync_category(self, db, tmp_path):
+        db.sync_category(tmp_path, "work", ["dashboard", "api"], 123)
+        db.sync_category(tmp_path, "work", ["dashboard", "invoices"], 456)
+        assert self.rows(db) == [("work", "dashboard"), ("work", "invoices")]
+        assert db.category_mtimes(tmp_path) == {"work": 456}
+        db.prune_categories(tmp_path, [])
+        assert self.rows(db) == []
+        assert db.search("dashboard") == []
+    
+    def test_search_names_and_readmes(self, db, tmp_path):
+        (tmp_path / "work" / "ledger").mkdir(parents=True)
+        (tmp_path / "work" / "ledger" / "README.md").write_text("# ledger\nParses invoices from email.\n")
+        (tmp_path / "work" / "invoice-tool").mkdir()
+        db.sync_category(tmp_path, "work", ["ledger", "invoice-tool", "blog"], None)
+        assert db.index_text() == 3
+        assert db.index_text() == 0
+        
+        results = db.search("the thing that parses invoices")
+        assert sorted(name for name, _ in results) == ["invoice-tool", "ledger"]
+        assert ("ledger", tmp_path / "work" / "ledger") in results
+        assert db.search("invoices", category="fun") == []
+        assert db.search('quote" OR *') == []
+    
+    def test_concurrent_writers(self, tmp_path):
+        errors = []
+        
+        def writer(category):
+            try:
+                db = ai.ProjectDB(tmp_path / "projects.db")
+                for i in range(20):
+                    db.sync_category(tmp_path, category, [f"p{j}" for j in range(i)], i)
+                db.close()
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=writer, args=(f"c{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        db = ai.ProjectDB(tmp_path / "projects.db")
+        assert db.conn.execute("SELECT count(*) FROM projects").fetchone()[0] == 4 * 19
+        db.close()
+    
+    def test_disabled_by_default(self, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            get_existing_projects()
+        assert ai.ProjectDB.open() is None
+        assert not (get_cache_dir() / ai.DB_FILENAME).exists()
+    
+    def test_scanner_keeps_db_in_sync(self, enabled):
+        (enabled / "work" / "dashboard").mkdir(parents=True)
+        (enabled / "fun" / "game").mkdir(parents=True)
+        get_existing_projects()
+        db = ai.ProjectDB.open()
+        assert self.rows(db) == [("fun", "game"), ("work", "dashboard")]
+        
+        (enabled / "work" / "api").mkdir()
+        (enabled / "fun" / "game").rmdir()
+        (enabled / "fun").rmdir()
+        get_existing_projects()
+        assert self.rows(db) == [("work", "api"), ("work", "dashboard")]
+        db.close()
+    
+    def test_scan_closes_db_it_cannot_read(self, enabled):
+        (enabled / "work" / "dashboard").mkdir(parents=True)
+        with patch('ai.ProjectDB.category_mtimes', side_effect=sqlite3.OperationalError("locked")), \
+             patch('ai.ProjectDB.close', autospec=True, side_effect=ai.ProjectDB.close) as mock_close:
+            assert [name for name, _ in get_existing_projects()] == ["dashboard"]
+        mock_close.assert_called_once()
+    
+    def test_git_info_stored(self, enabled):
+        project_path = enabled / "work" / "dashboard"
+        (project_path / ".git").mkdir(parents=True)
+        (project_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+        get_existing_projects()
+        info = {"branch": "main", "dirty": True, "commit_time": 1_700_000_000}
+        with patch('ai.query_git_info', return_value=info):
+            assert ai.collect_git_info([project_path]) == [info]
+        
+        db = ai.ProjectDB.open()
+        assert db.conn.execute("SELECT git_branch, git_dirty, git_commit_time FROM projects").fetchone() == \
+            ("main", 1, 1_700_000_000)
+        db.close()
+    
+    @patch('subprocess.run')
+    def test_create_and_open_update_db(self, mock_run, enabled):
+        mock_run.return_value = subprocess.CompletedProcess(args=["git", "init"], returncode=0)
+        project_path = create_project("voice-audit")
+        ai.record_project_open(project_path)
+        
+        db = ai.ProjectDB.open()
+        assert db.search("voice") == [("voice-audit", project_path)]
+        assert db.conn.execute("SELECT open_count FROM projects").fetchone() == (1,)
+        db.close()
+    
+    def test_unconfident_open_lists_readme_mentions(self, enabled, runner):
+        for name in ("ledger", "accounts"):
+            (enabled / "work" / name).mkdir(parents=True)
+            (enabled / "work" / name / "README.md").write_text("Parses invoices.\n")
+        (enabled / "work" / "blog").mkdir()
+        result = runner.invoke(app, ["open the invoices thing"])
+        assert result.exit_code == 0
+        assert "README or manifest mention it" in result.stdout
+        assert "ledger" in result.stdout and "accounts" in result.stdout
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_unconfident_open_opens_clear_text_match(self, mock_open, enabled, runner):
+        (enabled / "work" / "ledger").mkdir(parents=True)
+        (enabled / "work" / "ledger" / "README.md").write_text("Parses invoices from email.\n")
+        (enabled / "work" / "blog").mkdir()
+        (enabled / "work" / "blog" / "README.md").write_text("Thoughts on invoices, mostly.\n")
+        result = runner.invoke(app, ["open the thing that parses invoices"])
+        assert result.exit_code == 0
+        assert mock_open.call_args[0][0] == enabled / "work" / "ledger"
+        assert ai.load_shortcuts()["last"] == str(enabled / "work" / "ledger")
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_text_match_respects_filters(self, mock_open, enabled, runner):
+        (enabled / "play" / "beta").mkdir(parents=True)
+        (enabled / "play" / "beta" / "README.md").write_text("Parses invoices from email.\n")
+        (enabled / "work" / "ledger").mkdir(parents=True)
+        (enabled / "work" / "ledger" / "README.md").write_text("Thoughts on invoices, mostly.\n")
+        (enabled / "work" / "blog").mkdir()
+        result = runner.invoke(app, ["open thing that parses invoices cat:work"])
+        assert result.exit_code == 0
+        assert mock_open.call_args[0][0] == enabled / "work" / "ledger"
+        
+        with patch('ai.collect_git_info', side_effect=lambda paths: [None] * len(paths)):
+            result = runner.invoke(app, ["open thing that parses invoices cat:work dirty:yes"])
+        assert mock_open.call_count == 1
+        assert "beta" not in result.stdout
+    
+    def test_search_manifests(self, db, tmp_path):
+        (tmp_path / "work" / "ledger").mkdir(parents=True)
+        (tmp_path / "work" / "ledger" / "pyproject.toml").write_text(
+            '[project]\nname = "ledger"\ndescription = "Invoice parser"\nkeywords = [\n  "billing",\n]\n'
+        )
+        (tmp_path / "work" / "site").mkdir()
+        (tmp_path / "work" / "site" / "package.json").write_text(
+            '{"name": "site",\n "keywords": ["react", "portfolio"],\n "dependencies": {"billing": "1"}}'
+        )
+        db.sync_category(tmp_path, "work", ["ledger", "site"], None)
+        db.index_text()
+        
+        assert db.search("billing") == [("ledger", tmp_path / "work" / "ledger")]
+        assert db.search("my portfolio") == [("site", tmp_path / "work" / "site")]
+    
+    def test_manifests_are_parsed(self, tmp_path):
+        pytest.importorskip("tomllib")
+        (tmp_path / "package.json").write_text('{"name":"app","description":"Say \\"hi\\"","keywords":["chat"]}')
+        (tmp_path / "pyproject.toml").write_text('[tool.poetry]\ndescription = """\nInvoice\nparser"""\n')
+        # Cut off where reading stops: fields are picked out of the text
+        (tmp_path / "Cargo.toml").write_text('[package]\nkeywords = ["cli"]\ndescription = "x' + ' ' * ai.README_MAX_BYTES)
+        assert ai.read_manifest_text(tmp_path).split("\n") == ["Invoice", "parser", 'Say "hi"', "chat", "cli"]
+    
+    def test_filler_words_do_not_match(self, db, tmp_path):
+        for name, readme in (("new-thing", "Scratch space.\n"), ("ledger", "Parses PDF invoices.\n")):
+            (tmp_path / "work" / name).mkdir(parents=True)
+            (tmp_path / "work" / name / "README.md").write_text(readme)
+        db.sync_category(tmp_path, "work", ["new-thing", "ledger"], None)
+        db.index_text()
+        assert db.search("open the thing that parses invoices") == [("ledger", tmp_path / "work" / "ledger")]
+        assert db.search("the thing") == []
+    
+    def test_old_text_index_is_rebuilt(self, tmp_path):
+        conn = sqlite3.connect(str(tmp_path / "projects.db"))
+        conn.executescript(ai.ProjectDB.SCHEMA)
+        conn.execute("CREATE VIRTUAL TABLE project_text USING fts5(name, readme)")
+        conn.execute("INSERT INTO projects (id, root, category, name, path, text_indexed) "
+                     "VALUES (1, 'r', 'work', 'ledger', 'r/work/ledger', 1)")
+        conn.execute("INSERT INTO project_text (rowid, name, readme) VALUES (1, 'ledger', 'old')")
+        conn.commit()
+        conn.close()
+        
+        db = ai.ProjectDB(tmp_path / "projects.db")
+        assert db.conn.execute("PRAGMA user_version").fetchone() == (ai.DB_SCHEMA_VERSION,)
+        assert db.search("ledger") == [("ledger", Path("r/work/ledger"))]
+        assert db.search("old") == []
+        assert db.index_text() == 1
+        db.close()
+    
+    def test_watcher_indexes_text_in_background(self, enabled, monkeypatch):
+        monkeypatch.setattr('ai.DB_TEXT_BATCH', 1)
+        monkeypatch.setattr('ai.DB_SCAN_TEXT_BATCH', 1)
+        for name in ("ledger", "blog", "notes"):
+            (enabled / "work" / name).mkdir(parents=True)
+            (enabled / "work" / name / "README.md").write_text(f"{name} parses invoices\n")
+        watcher = ai.ProjectWatcher()
+        watcher.rescan()
+        db = ai.ProjectDB.open()
+        pending = "SELECT count(*) FROM projects WHERE text_indexed = 0"
+        assert db.conn.execute(pending).fetchone() == (2,)
+        
+        assert watcher.index_text() is False
+        assert db.conn.execute(pending).fetchone() == (0,)
+        watcher.close()
+        db.close()
+
+
+class TestFrecency:
+    """Tests for the frecency store and its blend with fuzzy scores."""
+    
+    def test_record_project_open(self, tmp_path):
+        path = tmp_path / "work" / "api"
+        ai.record_project_open(path)
+        ai.record_project_open(path)
+        entry = ai.load_frecency()[str(path)]
+        assert entry["rank"] == 2
+        assert time.time() - entry["last"] < 5
+    
+    def test_recent_opens_weigh_more(self):
+        now = 1_000_000.0
+        store = {"/a": {"rank": 2, "last": now - 60}, "/b": {"rank": 2, "last": now - 30 * 86400}}
+        with patch('ai.load_frecency', return_value=store):
+            scores = ai.frecency_scores(now)
+        assert scores["/a"] == 8.0
+        assert scores["/b"] == 0.5
+    
+    def test_aging_drops_rarely_used_projects(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('ai.FRECENCY_MAX_TOTAL', 10)
+        for _ in range(10):
+            ai.record_project_open(tmp_path / "often")
+        ai.record_project_open(tmp_path / "once")
+        entries = ai.load_frecency()
+        assert str(tmp_path / "once") not in entries
+        assert entries[str(tmp_path / "often")]["rank"] == pytest.approx(9.0)
+    
+    def test_frecency_breaks_fuzzy_ties(self, tmp_path):
+        projects = [("api-client", tmp_path / "api-client"), ("api-server", tmp_path / "api-server")]
+        _, name, _, _ = fuzzy_match_project("api", projects)
+        assert name == "api-client"
+        path, name, score, top_5 = fuzzy_match_project(
+            "api", projects, frecency={str(tmp_path / "api-server"): 8.0}
+        )
+        assert name == "api-server"
+        assert path == tmp_path / "api-server"
+        assert [n for n, _ in top_5] == ["api-server", "api-client"]
+        # Scores stay the fuzzy ones
+        assert score == top_5[1][1]
+    
+    def test_frecency_resolves_duplicate_names(self, tmp_path):
+        projects = [("api", tmp_path / "old" / "api"), ("api", tmp_path / "work" / "api")]
+        path, _, _, _ = fuzzy_match_project("api", projects, frecency={str(tmp_path / "work" / "api"): 1.0})
+        assert path == tmp_path / "work" / "api"
+    
+    def test_frecency_never_lifts_past_threshold(self, tmp_path):
+        projects = [("invoice-parser", tmp_path / "invoice-parser")]
+        frecency = {str(tmp_path / "invoice-parser"): 1e9}
+        _, _, score, top_5 = fuzzy_match_project("parse", projects)
+        # Close enough that the full bonus would have cleared it
+        assert ai.CONFIDENCE_THRESHOLD - ai.FRECENCY_MAX_BONUS < score < ai.CONFIDENCE_THRESHOLD
+        assert fuzzy_match_project("parse", projects, frecency)[2:] == (score, top_5)
+    
+    def test_scores_are_whole_numbers(self, tmp_path):
+        projects = [("LocalAI", tmp_path / "LocalAI"), ("notes", tmp_path / "notes")]
+        _, _, score, top_5 = fuzzy_match_project("local ai", projects)
+        assert all(isinstance(value, int) for value in [score, *(s for _, s in top_5)])
+    
+    def test_bonus_is_capped(self, tmp_path):
+        projects = [("api", tmp_path / "api")]
+        _, _, score, _ = fuzzy_match_project("api", projects, frecency={str(tmp_path / "api"): 1e9})
+        assert score == 100
+
+
+class TestShortcuts:
+    """Tests for aliases and the last-project shortcut."""
+    
+    def test_last_project(self, tmp_path):
+        assert ai.resolve_shortcut("open last") is None
+        ai.set_last_project(tmp_path)
+        assert ai.resolve_shortcut("open last") == ("last", tmp_path)
+        assert ai.resolve_shortcut("open the last project") == ("last", tmp_path)
+    
+    def test_stale_shortcut_is_ignored(self, tmp_path):
+        ai.set_last_project(tmp_path / "deleted")
+        assert ai.resolve_shortcut("open last") is None
+    
+    def test_not_a_shortcut(self, tmp_path):
+        ai.set_last_project(tmp_path)
+        assert ai.resolve_shortcut("open last dashboard") is None
+        assert ai.resolve_shortcut("open the") is None
+
+
 class TestOpenInCursor:
     """Tests for open_in_cursor function."""
     
@@ -290,6 +1844,81 @@ class TestOpenInCursor:
         assert result == False
 
 
+class TestDetachedLaunch:
+    """Tests for launching the editor without waiting on it."""
+    
+    @patch('subprocess.run')
+    @patch('subprocess.Popen')
+    def test_detached_launch(self, mock_popen, mock_run, temp_projects_dir):
+        assert open_in_cursor(temp_projects_dir, detach=True) == True
+        mock_run.assert_not_called()
+        args, kwargs = mock_popen.call_args
+        assert args[0] == ["cursor", str(temp_projects_dir)]
+        assert kwargs["start_new_session"] == True
+        assert kwargs["stdout"] == subprocess.DEVNULL
+    
+    @patch('subprocess.Popen')
+    def test_detached_exec_failure_tries_next(self, mock_popen, temp_projects_dir):
+        mock_popen.side_effect = FileNotFoundError()
+        assert open_in_cursor(temp_projects_dir, detach=True) == False
+    
+    def test_detached_spawn_returns_immediately(self, tmp_path, monkeypatch):
+        slow_editor = tmp_path / "bin" / "cursor"
+        slow_editor.parent.mkdir()
+        slow_editor.write_text("#!/bin/sh\nsleep 5\n")
+        slow_editor.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{slow_editor.parent}{os.pathsep}{os.environ['PATH']}")
+        start = time.monotonic()
+        assert open_in_cursor(tmp_path, detach=True) == True
+        assert time.monotonic() - start < 2
+    
+    def test_launch_mode_env(self, monkeypatch):
+        assert ai.editor_launch_detached() == True
+        monkeypatch.setenv("AI_CLI_LAUNCH", "wait")
+        assert ai.editor_launch_detached() == False
+
+
+class TestLauncherCache:
+    """Tests for caching the editor launcher that worked."""
+    
+    @pytest.fixture
+    def fake_cursor(self, tmp_path, monkeypatch):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        cursor = bin_dir / "cursor"
+        cursor.write_text("#!/bin/sh\nexit 0\n")
+        cursor.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+        return cursor
+    
+    def test_successful_launcher_is_cached(self, fake_cursor, tmp_path):
+        assert open_in_cursor(tmp_path) == True
+        assert ai.load_cached_launcher() == [str(fake_cursor)]
+    
+    def test_cached_launcher_is_used_first(self, fake_cursor, tmp_path):
+        open_in_cursor(tmp_path)
+        with patch('ai._launch_editor') as mock_launch:
+            assert open_in_cursor(tmp_path) == True
+        mock_launch.assert_called_once_with([str(fake_cursor), str(tmp_path)], False)
+    
+    def test_path_change_invalidates_cache(self, fake_cursor, tmp_path, monkeypatch):
+        open_in_cursor(tmp_path)
+        monkeypatch.setenv("PATH", os.environ["PATH"] + os.pathsep + "/nonexistent")
+        assert ai.load_cached_launcher() is None
+    
+    def test_missing_binary_invalidates_cache(self, fake_cursor, tmp_path):
+        open_in_cursor(tmp_path)
+        fake_cursor.unlink()
+        assert ai.load_cached_launcher() is None
+        assert open_in_cursor(tmp_path) == False
+    
+    def test_failing_cached_launcher_is_forgotten(self, fake_cursor, tmp_path):
+        open_in_cursor(tmp_path)
+        fake_cursor.write_text("#!/bin/sh\nexit 1\n")
+        assert open_in_cursor(tmp_path) == False
+        assert not (ai.get_state_dir() / ai.LAUNCHER_FILENAME).exists()
+
+
 class TestCreateProject:
     """Tests for create_project function."""
     
@@ -342,6 +1971,211 @@ class TestCreateProject:
             assert result_path == project_path
 
 
+class TestProfiling:
+    """Tests for the per-stage StageTimer behind --profile."""
+    
+    def test_stages_and_info(self):
+        timer = ai.StageTimer()
+        with timer.stage("scan"):
+            time.sleep(0.01)
+        with timer.stage("match"):
+            pass
+        timer.annotate(flow="open", project_count=3)
+        
+        trace = timer.to_json()
+        assert [stage["name"] for stage in trace["stages"]] == ["scan", "match"]
+        assert trace["stages"][0]["duration_ms"] >= 10
+        assert trace["stages"][1]["start_ms"] >= trace["stages"][0]["duration_ms"]
+        assert trace["total_ms"] >= trace["stages"][0]["duration_ms"]
+        assert trace["info"] == {"flow": "open", "project_count": 3}
+    
+    def test_stage_recorded_on_exception(self):
+        timer = ai.StageTimer()
+        with pytest.raises(ValueError):
+            with timer.stage("open"):
+                raise ValueError("boom")
+        assert list(timer.durations_ms()) == ["open"]
+    
+    def test_chrome_trace(self):
+        timer = ai.StageTimer()
+        with timer.stage("scan"):
+            pass
+        events = timer.to_chrome_trace()["traceEvents"]
+        assert events[0]["name"] == "scan"
+        assert events[0]["ph"] == "X"
+        assert events[0]["dur"] >= 0
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_profile_open_flow(self, mock_open, runner, temp_projects_dir, tmp_path):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            output = tmp_path / "trace.json"
+            
+            result = runner.invoke(app, ["--profile", "--profile-output", str(output), "open dashboard"])
+        
+        assert result.exit_code == 0
+        trace = json.loads(output.read_text())
+        names = [stage["name"] for stage in trace["stages"]]
+        assert {"mkdir", "intent", "scan", "match", "open"} <= set(names)
+        assert trace["info"]["flow"] == "open"
+        assert trace["info"]["match"] == "dashboard"
+        assert trace["info"]["project_count"] == 1
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_profile_env_chrome_on_failure(self, mock_open, runner, temp_projects_dir, tmp_path):
+        output = tmp_path / "trace.json"
+        env = {"AI_CLI_PROFILE": "chrome", "AI_CLI_PROFILE_OUTPUT": str(output)}
+        with patch('ai.PROJECTS_DIR', temp_projects_dir), patch.dict(os.environ, env):
+            result = runner.invoke(app, ["open nothing"])
+        
+        assert result.exit_code == 1
+        events = json.loads(output.read_text())["traceEvents"]
+        assert "scan" in {event["name"] for event in events}
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_no_profile_by_default(self, mock_open, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir), patch('ai.write_profile') as mock_write:
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            result = runner.invoke(app, ["open dashboard"])
+        assert result.exit_code == 0
+        mock_write.assert_not_called()
+
+
+class TestMetrics:
+    """Tests for the metrics log and `ai stats`."""
+    
+    def make_record(self, flow="open", total=10.0, **stages):
+        return {"ts": 0, "flow": flow, "exit": 0, "total_ms": total, "stages": stages, "project_count": 50}
+    
+    def test_percentile(self):
+        values = [float(v) for v in range(1, 101)]
+        assert ai.percentile(values, 50) == pytest.approx(50.5)
+        assert ai.percentile(values, 99) == pytest.approx(99.01)
+        assert ai.percentile([7.0], 95) == 7.0
+    
+    def test_record_and_load(self):
+        timer = ai.StageTimer()
+        with timer.stage("scan"):
+            pass
+        timer.annotate(flow="open", project_count=3, match="dashboard", score=90)
+        ai.record_metrics(timer, 0)
+        
+        records = ai.load_metrics()
+        assert len(records) == 1
+        assert records[0]["flow"] == "open"
+        assert records[0]["match"] == "dashboard"
+        assert "scan" in records[0]["stages"]
+    
+    def test_rotation(self):
+        with patch('ai.METRICS_MAX_BYTES', 200):
+            timer = ai.StageTimer()
+            timer.annotate(flow="open")
+            for _ in range(20):
+                ai.record_metrics(timer, 0)
+        
+        path = ai.get_state_dir() / ai.METRICS_FILENAME
+        assert path.with_name(path.name + ".1").exists()
+        assert path.stat().st_size < 400
+        assert 0 < len(ai.load_metrics()) < 20
+    
+    def test_load_skips_garbage(self):
+        path = ai.get_state_dir() / ai.METRICS_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('not json\n{"flow": "open"}\n' + json.dumps(self.make_record(scan=1.0)) + "\n")
+        assert len(ai.load_metrics()) == 1
+    
+    def test_compute_stats_groups(self):
+        records = [self.make_record(scan=float(i), total=float(i)) for i in range(1, 101)]
+        records.append(self.make_record(flow="create", create=3.0))
+        stats = ai.compute_stats(records)
+        
+        assert stats["all"]["total"]["count"] == 101
+        assert stats["flow:open"]["scan"]["p50"] == pytest.approx(50.5)
+        assert stats["flow:open"]["scan"]["p95"] == pytest.approx(95.05)
+        assert stats["flow:create"]["create"]["count"] == 1
+        assert stats["projects:<100"]["scan"]["count"] == 100
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_cli_records_and_reports(self, mock_open, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            assert runner.invoke(app, ["open dashboard"]).exit_code == 0
+            assert runner.invoke(app, ["open zzzzqqqq"]).exit_code == 0
+            
+            result = runner.invoke(app, ["stats"])
+        
+        records = ai.load_metrics()
+        assert [record["flow"] for record in records] == ["open", "open"]
+        assert records[0]["match"] == "dashboard"
+        assert result.exit_code == 0
+        assert "2 invocations" in result.stdout
+        assert "flow:open" in result.stdout
+        assert "match" in result.stdout
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_metrics_disabled(self, mock_open, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir), patch.dict(os.environ, {"AI_CLI_METRICS": "0"}):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            assert runner.invoke(app, ["open dashboard"]).exit_code == 0
+        assert ai.load_metrics() == []
+    
+    def test_stats_without_records(self, runner):
+        result = runner.invoke(app, ["stats"])
+        assert result.exit_code == 0
+        assert "No metrics" in result.stdout
+
+
+class TestStartup:
+    """Startup-time checks, using bench_startup.py."""
+    
+    def test_heavy_modules_are_lazy(self):
+        assert bench_startup.lazy_modules_imported(bench_startup.measure_imports()) == []
+    
+    def test_create_flow_does_not_import_rapidfuzz(self, tmp_path):
+        script = (
+            "import sys, ai\n"
+            "try:\n"
+            "    ai.app(['create a project called demo'], prog_name='ai')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print('rapidfuzz' in sys.modules)\n"
+        )
+        env = dict(os.environ, HOME=str(tmp_path), PATH="/nonexistent", AI_CLI_LAUNCH="wait")
+        result = subprocess.run(
+            [ai.sys.executable, "-c", script],
+            cwd=Path(ai.__file__).parent,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        assert (tmp_path / "Desktop" / "Projects" / "NotFinishedYet" / "demo").is_dir()
+        assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+class TestBenchmarks:
+    """Smoke test for the synthetic-tree benchmark suite in bench_ai.py."""
+    
+    def test_small_run(self, tmp_path):
+        with patch.dict(os.environ):
+            document = bench_ai.run_benchmarks([10], [1, 3, 20], runs=2, workdir=tmp_path)
+        # Each create run makes its own project
+        for layout in ("projects-10-1", "projects-10-3"):
+            created = tmp_path / layout / ai.CREATE_CATEGORY
+            assert sorted(p.name for p in created.iterdir()) == ["bench-create-0", "bench-create-1"]
+        benchmarks = {row["benchmark"] for row in document["results"]}
+        assert "get_existing_projects_warm" in benchmarks
+        assert "main_open" in benchmarks
+        assert {row["categories"] for row in document["results"]} == {1, 3}
+        assert all(row["median_ms"] >= 0 for row in document["results"])
+        json.dumps(document)
+    
+    def test_queries_match_tree(self):
+        names = bench_ai.synthetic_names(100)
+        assert len(set(names)) == 100
+        for query in bench_ai.make_queries(names):
+            assert query.startswith("open ")
+
+
 class TestCLI:
     """Integration tests for the CLI."""
     
@@ -397,6 +2231,74 @@ class TestCLI:
             assert result.exit_code == 0
             assert "Not confident" in result.stdout or "matches" in result.stdout
     
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_open_records_frecency(self, mock_open, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "work" / "dashboard").mkdir(parents=True)
+            
+            result = runner.invoke(app, ["open dashboard"])
+            
+            assert result.exit_code == 0
+            assert str(temp_projects_dir / "work" / "dashboard") in ai.load_frecency()
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_exact_name_wins(self, mock_open, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            (temp_projects_dir / "a" / "local-ai").mkdir(parents=True)
+            (temp_projects_dir / "b" / "local-ai-2").mkdir(parents=True)
+            ai.record_project_open(temp_projects_dir / "b" / "local-ai-2")
+            
+            with patch('ai.fuzzy_match_project') as mock_match:
+                result = runner.invoke(app, ["open local ai"])
+        
+        assert result.exit_code == 0
+        mock_match.assert_not_called()
+        mock_open.assert_called_once_with(temp_projects_dir / "a" / "local-ai", detach=True)
+        assert "confidence: 100%" in result.stdout
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_alias_by_query_and_open(self, mock_open, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            dashboard = temp_projects_dir / "work" / "dashboard"
+            dashboard.mkdir(parents=True)
+            
+            result = runner.invoke(app, ["alias dash dashboard"])
+            assert result.exit_code == 0
+            assert ai.load_shortcuts()["aliases"] == {"dash": str(dashboard.resolve())}
+            
+            with patch('ai.get_existing_projects') as mock_get_projects:
+                result = runner.invoke(app, ["dash"])
+            assert result.exit_code == 0
+            mock_get_projects.assert_not_called()
+            mock_open.assert_called_once_with(dashboard.resolve(), detach=True)
+    
+    def test_alias_by_path_and_remove(self, runner, tmp_path):
+        result = runner.invoke(app, [f"alias scratch {tmp_path}"])
+        assert result.exit_code == 0
+        result = runner.invoke(app, ["aliases"])
+        assert "scratch" in result.stdout
+        result = runner.invoke(app, ["unalias scratch"])
+        assert result.exit_code == 0
+        assert ai.load_shortcuts()["aliases"] == {}
+    
+    def test_last_is_reserved(self, runner, tmp_path):
+        result = runner.invoke(app, [f"alias last {tmp_path}"])
+        assert result.exit_code == 1
+    
+    @patch('ai.open_in_cursor', return_value=True)
+    def test_open_last(self, mock_open, runner, temp_projects_dir):
+        with patch('ai.PROJECTS_DIR', temp_projects_dir):
+            dashboard = temp_projects_dir / "work" / "dashboard"
+            dashboard.mkdir(parents=True)
+            runner.invoke(app, ["open dashboard"])
+            mock_open.reset_mock()
+            
+            with patch('ai.get_existing_projects') as mock_get_projects:
+                result = runner.invoke(app, ["open last"])
+            assert result.exit_code == 0
+            mock_get_projects.assert_not_called()
+            mock_open.assert_called_once_with(dashboard, detach=True)
+    
     def test_no_projects_found(self, runner, temp_projects_dir):
         with patch('ai.PROJECTS_DIR', temp_projects_dir):
             with patch('ai.get_existing_projects', return_value=[]):
@@ -405,6 +2307,13 @@ class TestCLI:
                 assert result.exit_code == 1
                 assert "No projects found" in result.stdout
     
+    @patch('ai.run_daemon')
+    def test_daemon_command(self, mock_daemon, runner):
+        result = runner.invoke(app, ["daemon"])
+        
+        assert result.exit_code == 0
+        mock_daemon.assert_called_once()
+    
     def test_extract_name_failure(self, runner, temp_projects_dir):
         with patch('ai.PROJECTS_DIR', temp_projects_dir):
             with patch('ai.extract_project_name', return_value=None):